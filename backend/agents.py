@@ -1,9 +1,24 @@
 #from langchain_ollama.llms import OllamaLLM
-from langchain.prompts import ChatPromptTemplate
 from datetime import datetime, timezone, timedelta
 import google.generativeai as genai
+import asyncio
+import contextvars
+import json
 import os
 from dotenv import load_dotenv
+from backend.llm_cache import llm_cache, prompt_key
+from backend.llm_gateway import llm_gateway
+from backend.singleflight import llm_singleflight
+from backend.keywords import KeywordMatcher
+from backend.local_classifier import get_local_classifier
+from backend.prompt_registry import prompt_registry
+from backend import tracing
+from backend.tracing import span, traced, record_error
+from backend.classification import (
+    Classification, classification_from_text, parse_classification_text,
+    match_type, match_urgency, match_severity
+)
+from functools import lru_cache
 
 load_dotenv()
 # Initialize Gemini API
@@ -14,6 +29,87 @@ genai.configure(api_key=geminiapi)
 # Instantiate genai model
 llm = genai.GenerativeModel("gemini-1.5-flash-latest")
 
+# Seconds each LLM stage of the async pipeline may take before falling back to heuristics
+LLM_STAGE_TIMEOUT = float(os.getenv("LLM_STAGE_TIMEOUT", "8"))
+# Number of descriptions grouped into one batch classification prompt
+BATCH_CLASSIFY_SIZE = int(os.getenv("BATCH_CLASSIFY_SIZE", "10"))
+# Groups of one batch enriched at once; 0 sizes it so a group's calls fit the LLM gateway's burst
+BATCH_GROUP_CONCURRENCY = int(os.getenv("BATCH_GROUP_CONCURRENCY", "0"))
+# Stages reported to run_pipeline_async's on_stage callback as each one finishes
+PIPELINE_STAGES = ("classification", "routing", "authority_routing", "suggestions")
+
+def generate_text(formatted_prompt, generation_config=None):
+    """Send a prompt to Gemini through the gateway, serving repeats of the same prompt from the cache.
+
+    Concurrent callers with the same normalized prompt share one in-flight request.
+    """
+    key = prompt_key(formatted_prompt)
+    with span("llm.generate") as current:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            current.set(source="cache", response_chars=len(cached))
+            return cached
+
+        def call_llm():
+            response = llm_gateway.call(
+                lambda: llm.generate_content(formatted_prompt, generation_config=generation_config)
+            )
+            result = response.text.strip()
+            llm_cache.set(key, result)
+            return result
+
+        current.set(source="llm", prompt_chars=len(formatted_prompt))
+        result = llm_singleflight.do(key, call_llm)
+        current.set(response_chars=len(result))
+        return result
+
+# KEYWORD TABLES
+
+PROTEST_TYPE_WORDS = frozenset(["march", "protest", "demonstration", "rally", "crowd", "stampede", "blockade", "sit-in", "agitation", "dharna", "strike", "bandh"])
+ACCIDENT_TYPE_WORDS = frozenset(["accident", "crash", "collision", "hit", "injury", "fall", "roadblock", "traffic jam", "skid", "wreck", "impact", "pile up", "head on"])
+FIRE_TYPE_WORDS = frozenset(["fire", "burn", "smoke", "flame", "explosion", "blaze", "gas", "toxic", "electrocute", "synthesis", "short-circuit", "blast", "cylinder", "burnt alive"])
+WATER_TYPE_WORDS = frozenset(["flood", "water", "rain", "drainage", "waterlog", "standing water", "overflow", "tsunami", "storm", "submersion", "deep"])
+CONSTRUCTION_TYPE_WORDS = frozenset(["construction", "work", "building", "road work", "repair", "infrastructure", "pavement", "digging", "demolition", "destruction"])
+CRIME_TYPE_WORDS = frozenset(["theft", "crime", "steal", "assault", "vandal", "illegal", "robbery", "burglary", "attack", "manslaughter", "battery", "phosphorus"])
+
+HIGH_URGENCY_WORDS = frozenset(["emergency", "urgent", "critical", "danger", "stampede", "fire", "accident", "injured", "many injured", "crowd surge", "blocked", "panic", "blood", "death", "damage", "burn", "kill"])
+LOW_URGENCY_WORDS = frozenset(["minor", "small", "routine", "scheduled", "planned", "normal", "no immediate danger", "not serious", "not urgent", "not critical", "tiny", "inconvient", "miniscule"])
+
+SEVERITY_4_WORDS = frozenset(["critical", "major", "stampede", "emergency", "hundreds", "thousands", "massive", "severe", "catastrophic", "disaster"])
+SEVERITY_3_WORDS = frozenset(["serious", "significant", "blocked", "crowd", "panic", "dangerous", "explosion", "fire", "injured", "injuries"])
+SEVERITY_2_WORDS = frozenset(["minor", "small", "few", "limited", "not serious", "not critical", "not urgent", "not dangerous"])
+
+COMPLEX_SITUATION_WORDS = frozenset(["turned into", "stampede", "blocked", "many", "crowd", "emergency", "panic", "danger", "critical"])
+PUBLIC_VENUE_WORDS = frozenset(["stadium", "bridge", "hospital", "school", "market", "shopping", "mall", "airport", "public transport"])
+
+MEDICAL_WORDS = frozenset(["injured", "hurt", "ambulance", "medical", "hospital", "unconscious", "bleeding"])
+TRAFFIC_WORDS = frozenset(["blocked", "traffic", "road", "highway", "junction", "signal", "vehicle"])
+HAZARD_WORDS = frozenset(["explosion", "gas leak", "chemical", "toxic", "smoke", "burning"])
+DISASTER_WORDS = frozenset(["collapse", "building", "infrastructure", "evacuation", "rescue", "trapped"])
+SCALE_WORDS = frozenset(["100", "many", "crowd", "stampede", "mass", "multiple"])
+
+ESCALATION_WORDS = frozenset(["chemical", "toxic", "explosion", "terror", "bomb", "terrorist attack", "armed rebellion", "naxal attacks", "riots"])
+CRITICAL_SITE_WORDS = frozenset(["hospital", "school", "stadium", "mall", "airport", "railway station", "public gatherings"])
+
+CONTEXT_WORDS = frozenset(["road", "many", "crowd", "stampede", "panic", "blocked", "danger", "critical", "emergency", "multiple", "various"])
+
+# Built once at import; every heuristic reads from a single scan of the description
+keyword_matcher = KeywordMatcher(
+    PROTEST_TYPE_WORDS | ACCIDENT_TYPE_WORDS | FIRE_TYPE_WORDS | WATER_TYPE_WORDS
+    | CONSTRUCTION_TYPE_WORDS | CRIME_TYPE_WORDS | HIGH_URGENCY_WORDS | LOW_URGENCY_WORDS
+    | SEVERITY_4_WORDS | SEVERITY_3_WORDS | SEVERITY_2_WORDS | COMPLEX_SITUATION_WORDS
+    | PUBLIC_VENUE_WORDS | MEDICAL_WORDS | TRAFFIC_WORDS | HAZARD_WORDS | DISASTER_WORDS
+    | SCALE_WORDS | ESCALATION_WORDS | CRITICAL_SITE_WORDS | CONTEXT_WORDS
+)
+
+@lru_cache(maxsize=512)
+def _scan_lowered(desc_lower):
+    return keyword_matcher.scan(desc_lower)
+
+def scan_description(description):
+    """Return the KeywordHits for a description, scanning each distinct text only once"""
+    return _scan_lowered(description.lower())
+
 # INPUT AGENT
 
 def input_agent(category, location, description):
@@ -30,129 +126,130 @@ def input_agent(category, location, description):
 
 # CLASSIFICATION AGENT
 
+@traced()
 def classification_agent(parsed):
     """Classify incident type, urgency, and severity"""
+    # A confident local model answers on its own; Gemini only sees the hard cases
+    local_model = get_local_classifier()
+    if local_model is not None:
+        local_result = local_model.classify(parsed)
+        if local_result is not None:
+            return local_result
+    if not llm_gateway.available():
+        llm_gateway.record_fallback("classification")
+        return get_default_classification(parsed)
     try:
-        prompt = ChatPromptTemplate.from_template(
-            """You are an incident classification system. Analyze the following incident and classify it into ONE of these exact categories:
-
-INCIDENT CATEGORIES (choose exactly one):
-- Accident
-- Crime
-- Waterlogging
-- Construction Work in Progress
-- Fire
-- Protest / March
-- Others
-
-Incident Details:
-Description: {description}
-Category: {category}
-Location: {location}
-
-Classification Guidelines:
-- Accident: Vehicle crashes, falls, injuries, collisions
-- Crime: Theft, assault, vandalism, illegal activities
-- Waterlogging: Flooding, water accumulation, drainage issues
-- Construction Work in Progress: Road work, building construction, infrastructure development
-- Fire: Fires, smoke, burning incidents
-- Protest / March: Demonstrations, rallies, marches, crowds, stampedes
-- Others: Anything that doesn't fit the above categories
-
-Urgency Guidelines:
-- low: Minor issues, no immediate danger
-- medium: Moderate concern, some disruption
-- high: Serious situation, immediate attention needed
-
-Severity Guidelines:
-- 1: Very minor, minimal impact
-- 2: Minor, limited impact
-- 3: Moderate, noticeable impact
-- 4: Serious, significant impact
-- 5: Critical, major impact or danger
-
-Based on the incident description "{description}", provide your classification in this EXACT format:
-Type: [choose one from the categories above]
-Urgency: [low/medium/high]
-Severity: [1/2/3/4/5]"""
-        )
-        
-        formatted_prompt = prompt.format(
+        formatted_prompt = prompt_registry.render(
+            "classification",
             description=parsed["description"],
             category=parsed["category"],
             location=parsed["location"]
         )
         
-        response = llm.generate_content(prompts=[formatted_prompt])
-        result = response.text.strip()
+        result = generate_text(formatted_prompt)
         
-        # Validate and clean the response
+        # Validate and clean the response into a Classification
         result = validate_classification_response(result, parsed)
         
         return result
         
     except Exception as e:
+        llm_gateway.record_fallback("classification", e)
         return get_default_classification(parsed)
+
+# BATCH CLASSIFICATION AGENT
+
+@traced()
+def batch_classification_agent(parsed_reports):
+    """Classify several incidents with one structured-output LLM call"""
+    local_model = get_local_classifier()
+    if local_model is not None:
+        local_results = [local_model.classify(parsed) for parsed in parsed_reports]
+        uncertain = [i for i, result in enumerate(local_results) if result is None]
+        if len(uncertain) < len(parsed_reports):
+            # Only the reports the local model is unsure about go to Gemini
+            if uncertain:
+                llm_results = _batch_classify_llm([parsed_reports[i] for i in uncertain])
+                for i, result in zip(uncertain, llm_results):
+                    local_results[i] = result
+            return local_results
+    return _batch_classify_llm(parsed_reports)
+
+def _batch_classify_llm(parsed_reports):
+    if not llm_gateway.available():
+        llm_gateway.record_fallback("batch_classification")
+        return [get_default_classification(parsed) for parsed in parsed_reports]
+    try:
+        incidents = [
+            {"id": i, "description": p["description"], "category": p["category"], "location": p["location"]}
+            for i, p in enumerate(parsed_reports)
+        ]
+        formatted_prompt = prompt_registry.render(
+            "batch_classification",
+            incidents=json.dumps(incidents, ensure_ascii=False)
+        )
+
+        result = generate_text(formatted_prompt, generation_config={"response_mime_type": "application/json"})
+        items = json.loads(result)
+
+        by_id = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            # JSON mode sometimes echoes the id back as a string ("3")
+            try:
+                by_id[int(item.get("id"))] = item
+            except (TypeError, ValueError):
+                continue
+
+        classifications = []
+        for i, parsed in enumerate(parsed_reports):
+            item = by_id.get(i)
+            if item is None:
+                classifications.append(get_default_classification(parsed))
+                continue
+            classifications.append(build_classification(item, parsed))
+        return classifications
+
+    except Exception as e:
+        llm_gateway.record_fallback("batch_classification", e)
+        return [get_default_classification(parsed) for parsed in parsed_reports]
+
 # RESPONSE VALIDATION
 def validate_classification_response(response, parsed):
-    """Validate and correct classification response"""
-    valid_types = [
-        "Accident", "Crime", "Waterlogging", 
-        "Construction Work in Progress", "Fire", 
-        "Protest / March", "Others"
-    ]
-    valid_urgency = ["low", "medium", "high"]
-    valid_severity = ["1", "2", "3", "4", "5"]
-    
-    lines = response.split('\n')
-    result_type = None
-    result_urgency = None
-    result_severity = None
-    
-    # Parse the response
-    for line in lines:
-        line = line.strip()
-        if line.startswith("Type:"):
-            type_value = line.replace("Type:", "").strip()
-            for valid_type in valid_types:
-                if valid_type.lower() in type_value.lower() or type_value.lower() in valid_type.lower():
-                    result_type = valid_type
-                    break
-        elif line.startswith("Urgency:"):
-            urgency_value = line.replace("Urgency:", "").strip().lower()
-            if urgency_value in valid_urgency:
-                result_urgency = urgency_value
-        elif line.startswith("Severity:"):
-            severity_value = line.replace("Severity:", "").strip()
-            if severity_value in valid_severity:
-                result_severity = severity_value
-    
-    # Fallback logic if parsing failed
-    if not result_type:
-        result_type = infer_type_from_description(parsed["description"], parsed["category"])
-    if not result_urgency:
-        result_urgency = infer_urgency_from_description(parsed["description"])
-    if not result_severity:
-        result_severity = infer_severity_from_description(parsed["description"])
-    
-    return f"Type: {result_type}\nUrgency: {result_urgency}\nSeverity: {result_severity}"
+    """Validate and correct a text classification response"""
+    return build_classification(parse_classification_text(response), parsed)
+
+def build_classification(values, parsed):
+    """Classification from raw type/urgency/severity values, inferring invalid parts from the description"""
+    return Classification(
+        match_type(values.get("type")) or infer_type_from_description(parsed["description"], parsed["category"]),
+        match_urgency(values.get("urgency")) or infer_urgency_from_description(parsed["description"]),
+        match_severity(values.get("severity")) or infer_severity_from_description(parsed["description"])
+    )
+
+def as_classification(classification):
+    """Accept a Classification or legacy classification text (e.g. read back from a stored report)"""
+    if isinstance(classification, Classification):
+        return classification
+    return classification_from_text(classification)
 
 def infer_type_from_description(description, category):
     """Infer incident type from description and category"""
-    desc_lower = description.lower()
+    hits = scan_description(description).words
     cat_lower = category.lower() if category else ""
     
-    if any(word in desc_lower for word in ["march", "protest", "demonstration", "rally", "crowd", "stampede", "blockade", "sit-in", "agitation", "dharna", "strike", "bandh"]):
+    if not hits.isdisjoint(PROTEST_TYPE_WORDS):
         return "Protest / March"
-    elif any(word in desc_lower for word in ["accident", "crash", "collision", "hit", "injury", "fall", "roadblock", "traffic jam", "skid", "wreck", "impact", "pile up", "head on"]):
+    elif not hits.isdisjoint(ACCIDENT_TYPE_WORDS):
         return "Accident"
-    elif any(word in desc_lower for word in ["fire", "burn", "smoke", "flame", "explosion", "blaze", "gas", "toxic", "electrocute", "synthesis", "short-circuit", "blast", "cylinder", "burnt alive"]):
+    elif not hits.isdisjoint(FIRE_TYPE_WORDS):
         return "Fire"
-    elif any(word in desc_lower for word in ["flood", "water", "rain", "drainage", "waterlog", "standing water", "overflow", "tsunami", "storm", "submersion", "deep"]):
+    elif not hits.isdisjoint(WATER_TYPE_WORDS):
         return "Waterlogging"
-    elif any(word in desc_lower for word in ["construction", "work", "building", "road work", "repair", "infrastructure", "pavement", "digging", "demolition", "destruction"]):
+    elif not hits.isdisjoint(CONSTRUCTION_TYPE_WORDS):
         return "Construction Work in Progress"
-    elif any(word in desc_lower for word in ["theft", "crime", "steal", "assault", "vandal", "illegal", "robbery", "burglary", "attack", "manslaughter", "battery", "phosphorus"]):
+    elif not hits.isdisjoint(CRIME_TYPE_WORDS):
         return "Crime"
     elif "protest" in cat_lower or "march" in cat_lower:
         return "Protest / March"
@@ -161,30 +258,27 @@ def infer_type_from_description(description, category):
 
 def infer_urgency_from_description(description):
     """Infer urgency from description keywords"""
-    desc_lower = description.lower()
+    hits = scan_description(description).words
     
-    high_urgency_words = ["emergency", "urgent", "critical", "danger", "stampede", "fire", "accident", "injured", "many injured", "crowd surge", "blocked", "panic", "blood", "death", "damage", "burn", "kill"]
-    low_urgency_words = ["minor", "small", "routine", "scheduled", "planned", "normal", "no immediate danger", "not serious", "not urgent", "not critical", "tiny", "inconvient", "miniscule"]
-    
-    if any(word in desc_lower for word in high_urgency_words):
+    if not hits.isdisjoint(HIGH_URGENCY_WORDS):
         return "high"
-    elif any(word in desc_lower for word in low_urgency_words):
+    elif not hits.isdisjoint(LOW_URGENCY_WORDS):
         return "low"
     else:
         return "medium"
 
 def infer_severity_from_description(description):
     """Infer severity from description keywords"""
-    desc_lower = description.lower()
-    
-    if any(word in desc_lower for word in ["critical", "major", "stampede", "emergency", "hundreds", "thousands", "massive", "severe", "catastrophic", "disaster"]):
-        return "4"
-    elif any(word in desc_lower for word in ["serious", "significant", "blocked", "crowd", "panic", "dangerous", "explosion", "fire", "injured", "injuries"]):
-        return "3"
-    elif any(word in desc_lower for word in ["minor", "small", "few", "limited", "not serious", "not critical", "not urgent", "not dangerous"]):
-        return "2"
+    hits = scan_description(description).words
+    
+    if not hits.isdisjoint(SEVERITY_4_WORDS):
+        return 4
+    elif not hits.isdisjoint(SEVERITY_3_WORDS):
+        return 3
+    elif not hits.isdisjoint(SEVERITY_2_WORDS):
+        return 2
     else:
-        return "3"
+        return 3
 
 def get_default_classification(parsed):
     """Get appropriate default classification based on input"""
@@ -192,15 +286,16 @@ def get_default_classification(parsed):
     urgency = infer_urgency_from_description(parsed["description"])
     severity = infer_severity_from_description(parsed["description"])
     
-    return f"Type: {incident_type}\nUrgency: {urgency}\nSeverity: {severity}"
+    return Classification(incident_type, urgency, severity)
 
+@traced()
 def routing_agent(parsed, classification):
     """Determine routing based on classification"""
     try:
-        classification_data = parse_classification(classification)
-        incident_type = classification_data.get('type', '').lower()
-        urgency = classification_data.get('urgency', 'medium').lower()
-        severity = int(classification_data.get('severity', '3'))
+        classification = as_classification(classification)
+        incident_type = classification.type.lower()
+        urgency = classification.urgency
+        severity = classification.severity
         
         should_notify_authorities = determine_authority_notification(incident_type, urgency, severity)
         
@@ -212,6 +307,7 @@ def routing_agent(parsed, classification):
         return routing
         
     except Exception as e:
+        record_error(e)
         return "community push notification"
 
 def determine_authority_notification(incident_type, urgency, severity):
@@ -231,155 +327,58 @@ def determine_authority_notification(incident_type, urgency, severity):
     
     return False
 
+@traced()
 def suggestion_agent(parsed, classification):
     """Generate safety suggestions based on incident"""
     try:
-        classification_data = parse_classification(classification)
-        incident_type = classification_data.get('type', '').lower()
-        urgency = classification_data.get('urgency', 'medium').lower()
-        severity = int(classification_data.get('severity', '3'))
+        classification = as_classification(classification)
+        incident_type = classification.type.lower()
+        urgency = classification.urgency
+        severity = classification.severity
         
         # Get predefined suggestions
         predefined_suggestions = get_category_suggestions(incident_type)
         
         # Generate creative suggestions for complex cases
         if should_use_creative_suggestions(parsed, urgency, severity):
+            if not llm_gateway.available():
+                llm_gateway.record_fallback("suggestions")
+                return predefined_suggestions
             creative_suggestions = generate_creative_suggestions(parsed, classification, incident_type, urgency, severity)
             return creative_suggestions if creative_suggestions else predefined_suggestions
         
         return predefined_suggestions
         
     except Exception as e:
+        record_error(e)
         return get_default_suggestions(incident_type)
 
 def get_category_suggestions(incident_type):
     """Get predefined suggestions based on incident category"""
-    suggestions_map = {
-        "accident": [
-            "Create a safe buffer zone around the accident by parking 100 meters away if you must stop.",
-            "Turn on hazard lights and use your vehicle to protect emergency responders if directed by police.",
-            "Document the scene only if safe to do so, as it may help with traffic management.",
-            "Share traffic updates on community WhatsApp groups to help others plan alternate routes.",
-            "If you are a witness, note down key details like time, vehicle descriptions, and license plates for police.",
-            "If you are a driver involved, exchange contact and insurance details with other parties.",
-            "If you are a pedestrian, stay clear of the accident site and follow police instructions.",
-            "If you are a business owner, inform employees and customers to avoid the area until cleared."
-        ],
-        
-        "crime": [
-            "If you witnessed the incident, note down key details like time, descriptions, and vehicle numbers for police.",
-            "Inform nearby shop owners and security guards to increase vigilance in the area.",
-            "Use buddy system when traveling through the area until police presence increases.",
-            "Check on elderly neighbors who might be particularly vulnerable to similar incidents.",
-            "Avoid sharing sensitive information on social media that could compromise ongoing investigations.",
-            "If you feel unsafe, consider staying indoors until police have cleared the area.",
-            "If you are a victim, do not confront the suspect; instead, seek safety and contact police immediately.",
-            "If you are a business owner, review security camera footage and share it with police if requested."
-        ],
-        
-        "waterlogging": [
-            "Turn off electricity at the main switch if water enters your building to prevent electrocution.",
-            "Use sandbags or plastic sheets to redirect water away from building entrances.",
-            "Document water levels with photos and timestamps for insurance and municipal complaints.",
-            "Coordinate with neighbors to share pumping equipment and monitor vulnerable residents.",
-            "Avoid driving through waterlogged areas as it can damage your vehicle and create hazards.",
-            "If you must walk through water, use waterproof boots and avoid submerged electrical hazards.",
-            "Check local weather updates for further rain forecasts and prepare accordingly.",
-            "If you are a resident, keep emergency supplies like food, water, and medicines ready in case of prolonged flooding."
-        ],
-        
-        "construction work in progress": [
-            "Download offline maps before traveling to navigate if GPS signals are disrupted by construction.",
-            "Schedule important appointments for earlier in the day when construction activity is typically lower.",
-            "Contact local businesses to confirm they're accessible before visiting the area.",
-            "Report any unsafe construction practices or missing safety barriers to municipal authorities.",
-            "If you are a worker, ensure all safety gear is worn and follow site protocols to avoid accidents.",
-            "If you are a driver, follow detour signs carefully and allow extra travel time to avoid frustration.",
-            "If you are a pedestrian, use designated walkways and follow construction signage to stay safe.",
-            "If you are a resident, keep windows closed to avoid dust and noise pollution."
-        ],
-        
-        "fire": [
-            "Close all windows and doors facing the fire to prevent smoke and ember entry.",
-            "Wet down nearby structures and vegetation if you have water access and it's safe to do so.",
-            "Move vehicles away from the fire area as fuel tanks can explode and create additional hazards.",
-            "Monitor wind direction changes and be prepared to evacuate quickly if fire spreads toward you.",
-            "If you are in a building, stay low to avoid smoke inhalation and use a wet cloth over your mouth.",
-            "If trapped, signal for help from a window using a bright cloth or flashlight.",
-            "If you are a resident, check on neighbors, especially the elderly or those with mobility issues.",
-            "If you are a business owner, secure your premises and assist customers in evacuating safely."
-        ],
-        
-        "protest / march": [
-            "Monitor local news and social media for real-time updates on protest movement and road closures.",
-            "If you must pass through the area, dress neutrally and avoid carrying bags that might be searched.",
-            "Keep emergency contacts ready and share your location with family members before entering the vicinity.",
-            "If trapped in a crowd surge, protect your chest with crossed arms and move diagonally toward barriers or walls.",
-            "If you are a bystander, maintain a safe distance and avoid engaging with protesters to prevent escalation.",
-            "If you are a protester, follow organizers' instructions and avoid confrontations with police or counter-protesters.",
-            "If you are a resident, stay indoors and keep windows closed to avoid tear gas or other irritants.",
-            "If you are a business owner, secure your premises and consider temporary closures if safety is a concern."
-        ],
-        
-        "others": [
-            "Take photos or videos from a safe distance to help authorities understand the situation better.",
-            "Check if anyone needs immediate assistance but ensure your own safety first.",
-            "Share information with neighbors through community apps to keep everyone informed.",
-            "Contact local media if the incident affects public services or transportation significantly.",
-            "If you are a resident, stay indoors and avoid unnecessary travel until the situation is resolved.",
-            "If you are a business owner, inform employees and customers about the situation and any necessary precautions.",
-            "If you are a driver, follow detour signs and avoid the area until cleared.",
-            "If you are a pedestrian, stay clear of the incident site and follow any police instructions."
-        ]
-    }
-    
-    # Find matching category and return suggestions
-    for category, suggestion_list in suggestions_map.items():
-        if category in incident_type:
-            return " ".join(suggestion_list)
-    
-    return " ".join(suggestions_map["others"])
+    return prompt_registry.category_suggestions(incident_type)
 
 def should_use_creative_suggestions(parsed, urgency, severity):
     """Determine if creative suggestions should be used"""
-    description = parsed["description"].lower()
+    description = parsed["description"]
+    hits = scan_description(description)
     
     complex_indicators = [
         len(description.split()) > 15,
         urgency == "high",
         severity >= 4,
-        any(word in description for word in ["turned into", "stampede", "blocked", "many", "crowd", "emergency", "panic", "danger", "critical"]),
-        any(word in description for word in ["stadium", "bridge", "hospital", "school", "market", "shopping", "mall", "airport", "public transport"]),
-        "100" in description or any(str(i) in description for i in range(50, 1000, 50))
+        not hits.words.isdisjoint(COMPLEX_SITUATION_WORDS),
+        not hits.words.isdisjoint(PUBLIC_VENUE_WORDS),
+        hits.has_multiple_of_50
     ]
     
     return sum(complex_indicators) >= 2
 
+@traced()
 def generate_creative_suggestions(parsed, classification, incident_type, urgency, severity):
     """Generate contextual suggestions using LLM"""
     try:
-        prompt = ChatPromptTemplate.from_template(
-            """You are a safety expert providing specific, actionable advice for this incident.
-
-INCIDENT DETAILS:
-Description: {description}
-Category: {category}
-Location: {location}
-Type: {incident_type}
-Urgency: {urgency}
-Severity: {severity}
-
-Provide 3-4 specific, actionable suggestions tailored to THIS exact situation:
-1. Consider the location, scale, and unique circumstances
-2. Include both immediate safety actions and practical advice
-3. Be creative but realistic
-4. Consider different groups affected (drivers, pedestrians, residents, workers)
-5. Include communication/coordination advice if relevant
-
-Format as clear, actionable sentences separated by periods."""
-        )
-        
-        formatted_prompt = prompt.format(
+        formatted_prompt = prompt_registry.render(
+            "creative_suggestions",
             description=parsed["description"],
             category=parsed["category"],
             location=parsed["location"],
@@ -388,58 +387,59 @@ Format as clear, actionable sentences separated by periods."""
             severity=severity
         )
         
-        response = llm.generate_content(prompts=[formatted_prompt])
-        result = response.text.strip()
+        result = generate_text(formatted_prompt)
         
         enhanced_result = enhance_suggestions_with_context(result, parsed, incident_type)
         
         return enhanced_result if enhanced_result else get_category_suggestions(incident_type)
         
     except Exception as e:
+        llm_gateway.record_fallback("suggestions", e)
         return get_category_suggestions(incident_type)
 
 def enhance_suggestions_with_context(suggestions, parsed, incident_type):
     """Add contextual enhancements to generated suggestions"""
     try:
-        description = parsed["description"].lower()
+        hits = scan_description(parsed["description"])
+        words = hits.words
         context_elements = []
         
         # Location-specific additions
-        if "stadium" in description:
+        if "stadium" in words:
             context_elements.append("Stadium visitors should coordinate with event security and use designated emergency exits.")
-        elif "bridge" in description or "road" in description:
+        elif "bridge" in words or "road" in words:
             context_elements.append("Drivers should inform traffic apps like Google Maps to help others avoid the area.")
-        elif "market" in description or "shopping" in description:
+        elif "market" in words or "shopping" in words:
             context_elements.append("Shop owners should secure their premises and assist customers in finding safe exits.")
-        elif "hospital" in description or "school" in description:
+        elif "hospital" in words or "school" in words:
             context_elements.append("Hospital staff should prepare for potential patient influx and coordinate with emergency services.")
-        elif "airport" in description:
+        elif "airport" in words:
             context_elements.append("Airport staff should follow emergency protocols and assist passengers in evacuating safely.")
-        elif "public transport" in description:
+        elif "public transport" in words:
             context_elements.append("Public transport operators should halt services in the affected area and inform passengers via announcements.")
-        elif "mall" in description:
+        elif "mall" in words:
             context_elements.append("Mall management should activate emergency protocols and guide shoppers to safe exits.")
         else:
             context_elements.append("Residents should stay indoors and avoid unnecessary travel until the situation is resolved.")
         
         # Scale-specific additions
-        if any(str(i) in description for i in range(50, 1000)) or "many" in description or "crowd" in description:
+        if hits.has_number_50_to_999 or "many" in words or "crowd" in words:
             context_elements.append("If you see someone in distress, form small groups to help rather than acting alone.")
         
         # Emergency-specific additions
-        if "stampede" in description or "panic" in description:
+        if "stampede" in words or "panic" in words:
             context_elements.append("Stay low, protect your chest and head, and move diagonally toward less crowded areas.")
         
         # Communication additions
-        if "blocked" in description or "road" in description:
+        if "blocked" in words or "road" in words:
             context_elements.append("Use WhatsApp groups or local community apps to share real-time updates with neighbors.")
             
         # Urgency and severity context
-        if "danger" in description or "critical" in description:
+        if "danger" in words or "critical" in words:
             context_elements.append("If you are a bystander, maintain a safe distance and avoid engaging with protesters or emergency responders.")
             
         # Emergency response context    
-        if "emergency" in description or "critical" in description:
+        if "emergency" in words or "critical" in words:
             context_elements.append("If you are a driver, follow detour signs and avoid the area until cleared.")
         
         if context_elements:
@@ -448,65 +448,33 @@ def enhance_suggestions_with_context(suggestions, parsed, incident_type):
         return suggestions
         
     except Exception as e:
+        record_error(e)
         return suggestions
 
 def get_default_suggestions(incident_type=""):
     """Get default suggestions when other methods fail"""
-    if not incident_type:
-        return "Stay alert and follow official guidance. Report any concerning developments to authorities."
-    
-    incident_type = incident_type.lower()
-    
-    default_map = {
-        "protest": "Avoid the area and use alternative routes. Stay calm and follow police instructions if in the vicinity.",
-        "march": "Avoid the area and use alternative routes. Stay calm and follow police instructions if in the vicinity.",
-        "accident": "Avoid the accident site and allow emergency services to work. Use alternative routes.",
-        "fire": "Stay away from the fire area and report to emergency services if not already done.",
-        "crime": "Avoid the affected area and report any suspicious activities to police.",
-        "construction": "Follow detour signs and allow extra travel time. Stay alert for construction vehicles.",
-        "water": "Avoid waterlogged areas and do not attempt to walk or drive through standing water."
-    }
-    
-    for key, suggestion in default_map.items():
-        if key in incident_type:
-            return suggestion
-    
-    return "Stay alert and follow official guidance. Report any concerning developments to authorities."
+    return prompt_registry.default_suggestion(incident_type)
 
+@traced()
 def feedback_agent(parsed, classification, routing, user_feedback):
     """Process user feedback to improve classification"""
     try:
-        prompt = ChatPromptTemplate.from_template(
-            """Review and improve the incident classification based on user feedback:
-
-Original Incident: {description}
-Original Classification: {classification}
-Original Routing: {routing}
-User Feedback: {user_feedback}
-
-Available incident types: Accident, Crime, Waterlogging, Construction Work in Progress, Fire, Protest / March, Others
-
-Provide an improved classification considering the user's input. Format as:
-Type: [type]
-Urgency: [level]
-Severity: [number]
-Reasoning: [brief explanation]"""
-        )
-        
-        formatted_prompt = prompt.format(
+        formatted_prompt = prompt_registry.render(
+            "feedback",
             description=parsed["description"],
             classification=classification,
             routing=routing,
             user_feedback=user_feedback
         )
         
-        response = llm.generate_content(prompts=[formatted_prompt])
-        result = response.text.strip()
+        result = generate_text(formatted_prompt)
         return result
         
     except Exception as e:
+        llm_gateway.record_fallback("feedback", e)
         return f"Error processing feedback: {str(e)}"
 
+@traced()
 def authority_routing_agent(parsed, classification, routing):
     """Route to specific authorities when authority notification is required"""
     try:
@@ -514,10 +482,10 @@ def authority_routing_agent(parsed, classification, routing):
         if "authority email" not in routing:
             return "No authority routing required"
         
-        classification_data = parse_classification(classification)
-        incident_type = classification_data.get('type', '').lower()
-        urgency = classification_data.get('urgency', 'medium').lower()
-        severity = int(classification_data.get('severity', '3'))
+        classification = as_classification(classification)
+        incident_type = classification.type.lower()
+        urgency = classification.urgency
+        severity = classification.severity
         description = parsed["description"].lower()
         
         # Determine specific authorities based on incident type and context
@@ -525,14 +493,18 @@ def authority_routing_agent(parsed, classification, routing):
         
         # Use LLM for complex cases requiring multiple authorities
         if should_use_llm_authority_routing(incident_type, description, authorities):
-            llm_authorities = llm_authority_routing(parsed, classification, authorities)
-            if llm_authorities:
-                authorities = llm_authorities
+            if llm_gateway.available():
+                llm_authorities = llm_authority_routing(parsed, classification, authorities)
+                if llm_authorities:
+                    authorities = llm_authorities
+            else:
+                llm_gateway.record_fallback("authority_routing")
         
         return format_authority_routing(authorities)
         
     except Exception as e:
         # Fallback to police for any authority routing errors
+        record_error(e)
         return "Police Department"
 
 def determine_specific_authorities(incident_type, urgency, severity, description):
@@ -572,30 +544,26 @@ def determine_specific_authorities(incident_type, urgency, severity, description
 def get_contextual_authorities(description, urgency, severity):
     """Add authorities based on specific context clues in description"""
     additional_authorities = []
+    hits = scan_description(description).words
     
     # Medical emergency indicators
-    medical_keywords = ["injured", "hurt", "ambulance", "medical", "hospital", "unconscious", "bleeding"]
-    if any(keyword in description for keyword in medical_keywords):
+    if not hits.isdisjoint(MEDICAL_WORDS):
         additional_authorities.append("Department of Medical Emergency")
     
     # Traffic disruption indicators
-    traffic_keywords = ["blocked", "traffic", "road", "highway", "junction", "signal", "vehicle"]
-    if any(keyword in description for keyword in traffic_keywords):
+    if not hits.isdisjoint(TRAFFIC_WORDS):
         additional_authorities.append("Department of Traffic Police")
     
     # Fire/explosion indicators
-    fire_keywords = ["explosion", "gas leak", "chemical", "toxic", "smoke", "burning"]
-    if any(keyword in description for keyword in fire_keywords):
+    if not hits.isdisjoint(HAZARD_WORDS):
         additional_authorities.append("Department of Fire and Emergency Services")
     
     # Disaster/infrastructure indicators
-    disaster_keywords = ["collapse", "building", "infrastructure", "evacuation", "rescue", "trapped"]
-    if any(keyword in description for keyword in disaster_keywords):
+    if not hits.isdisjoint(DISASTER_WORDS):
         additional_authorities.append("Department of Disaster Relief")
     
     # Large scale incidents (multiple authorities needed)
-    scale_keywords = ["100", "many", "crowd", "stampede", "mass", "multiple"]
-    if any(keyword in description for keyword in scale_keywords):
+    if not hits.isdisjoint(SCALE_WORDS):
         additional_authorities.extend([
             "Department of Medical Emergency",
             "Department of Disaster Relief"
@@ -613,63 +581,40 @@ def get_contextual_authorities(description, urgency, severity):
 def should_use_llm_authority_routing(incident_type, description, current_authorities):
     """Determine if LLM should be used for complex authority routing decisions"""
     
+    hits = scan_description(description).words
+
     # Use LLM for complex scenarios
     complex_indicators = [
         len(current_authorities) >= 3,  # Multiple authorities already identified
-        "multiple" in description or "various" in description,
-        any(word in description for word in ["chemical", "toxic", "explosion", "terror", "bomb","terrorist attack","armed rebellion","naxal attacks","riots"]),
-        any(word in description for word in ["hospital", "school", "stadium", "mall", "airport","railway station","public gatherings"]),
-        "stampede" in description,
+        "multiple" in hits or "various" in hits,
+        not hits.isdisjoint(ESCALATION_WORDS),
+        not hits.isdisjoint(CRITICAL_SITE_WORDS),
+        "stampede" in hits,
         len(description.split()) > 20  # Detailed descriptions
     ]
     
     return sum(complex_indicators) >= 2
 
+@traced()
 def llm_authority_routing(parsed, classification, current_authorities):
     """Use LLM to determine optimal authority routing for complex incidents"""
     try:
-        prompt = ChatPromptTemplate.from_template(
-            """You are an emergency response coordinator. Analyze this incident and determine which specific authorities should be notified.
-
-INCIDENT DETAILS:
-Description: {description}
-Location: {location}
-Classification: {classification}
-Currently Identified Authorities: {current_authorities}
-
-AVAILABLE AUTHORITIES:
-- Police Department: General law enforcement, crime, crowd control, security
-- Department of Fire and Emergency Services: Fires, explosions, hazardous materials, technical rescue
-- Department of Traffic Police: Traffic management, road accidents, vehicle-related incidents
-- Department of Disaster Relief: Natural disasters, evacuations, large-scale emergencies, infrastructure collapse
-- Department of Medical Emergency: Medical emergencies, injuries, ambulance services, health hazards
-
-ANALYSIS REQUIREMENTS:
-1. Consider the primary nature of the incident
-2. Identify secondary risks and complications
-3. Think about resource coordination needs
-4. Consider public safety implications
-5. Account for potential escalation
-
-Based on this incident, which authorities should be notified? List them in order of priority.
-Respond with ONLY the authority names, separated by commas. Maximum 4 authorities."""
-        )
-        
-        formatted_prompt = prompt.format(
+        formatted_prompt = prompt_registry.render(
+            "authority_routing",
             description=parsed["description"],
             location=parsed["location"],
             classification=classification,
             current_authorities=", ".join(current_authorities)
         )
         
-        response = llm.generate_content(prompts=[formatted_prompt])
-        result = response.text.strip()
+        result = generate_text(formatted_prompt)
         
         # Parse and validate the LLM response
         authorities = parse_llm_authority_response(result)
         return authorities if authorities else current_authorities
         
     except Exception as e:
+        llm_gateway.record_fallback("authority_routing", e)
         return current_authorities
 
 def parse_llm_authority_response(response):
@@ -707,6 +652,7 @@ def format_authority_routing(authorities):
     else:
         return "; ".join(authorities)
 
+@traced("pipeline")
 def run_pipeline(category, location, description):
     """Execute the complete agent pipeline for Streamlit"""
     try:
@@ -727,7 +673,7 @@ def run_pipeline(category, location, description):
         
         result = {
             **parsed,
-            "classification": classification,
+            **classification.as_fields(),
             "routing": routing,
             "authority_routing": authority_routing,
             "suggestions": suggestions
@@ -737,29 +683,160 @@ def run_pipeline(category, location, description):
         
     except Exception as e:
         # Return basic structure even if pipeline fails
-        return {
-            "category": category,
-            "location": location,
-            "description": description,
-            "submitted_at": datetime.now(timezone.utc).isoformat(),
-            "classification": "Error in classification",
-            "routing": "community push notification",
-            "authority_routing": "Police Department",
-            "suggestions": "Please contact local authorities for assistance."
-        }
-
-def parse_classification(classification_text):
-    """Parse classification text into structured data"""
+        record_error(e)
+        return pipeline_error_result(category, location, description)
+
+# ASYNC PIPELINE
+
+async def _run_stage(executor, timeout, fallback, func, *args):
+    """Run a blocking agent in the executor, returning fallback() on timeout or error"""
+    loop = asyncio.get_running_loop()
+    # The stage span includes the wait for an executor thread; the agent's own span does not
+    with span(f"stage.{func.__name__}"):
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, contextvars.copy_context().run, func, *args), timeout
+            )
+        except Exception as e:
+            tracing.record_fallback(func.__name__, e)
+            return fallback()
+
+def heuristic_authority_routing(parsed, classification, routing):
+    """Keyword-only authority routing used when the LLM stage times out"""
+    if "authority email" not in routing:
+        return "No authority routing required"
+    classification = as_classification(classification)
+    authorities = determine_specific_authorities(
+        classification.type.lower(),
+        classification.urgency,
+        classification.severity,
+        parsed["description"].lower()
+    )
+    return format_authority_routing(authorities)
+
+@traced("pipeline")
+async def run_pipeline_async(category, location, description, executor=None, stage_timeout=None, on_stage=None):
+    """Execute the agent pipeline with the follow-up LLM calls running concurrently.
+
+    Classification runs first; authority routing and suggestions both only depend on
+    it, so they are started together and awaited as a pair. Each stage is bounded by
+    ``stage_timeout`` and falls back to the keyword heuristics, so the worst case is
+    roughly one classification call plus the slowest follow-up call. ``on_stage`` is
+    called with each name in PIPELINE_STAGES as that stage finishes.
+    """
+    timeout = LLM_STAGE_TIMEOUT if stage_timeout is None else stage_timeout
     try:
-        lines = classification_text.split('\n')
-        result = {}
-        for line in lines:
-            line = line.strip()
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().lower()
-                value = value.strip()
-                result[key] = value
-        return result
-    except Exception:
-        return {"type": "others", "urgency": "medium", "severity": "3"}
+        parsed = input_agent(category, location, description)
+
+        classification = await _run_stage(
+            executor, timeout, lambda: get_default_classification(parsed),
+            classification_agent, parsed
+        )
+        _report_stage(on_stage, "classification")
+        return await _enrich_async(parsed, classification, executor, timeout, on_stage)
+
+    except Exception as e:
+        record_error(e)
+        return pipeline_error_result(category, location, description)
+
+def _report_stage(on_stage, stage):
+    if on_stage is not None:
+        on_stage(stage)
+
+async def _stage(on_stage, stage, coro):
+    result = await coro
+    _report_stage(on_stage, stage)
+    return result
+
+async def _enrich_async(parsed, classification, executor, timeout, on_stage=None):
+    """Routing plus the concurrent authority and suggestion stages for a classified report"""
+    routing = routing_agent(parsed, classification)
+    _report_stage(on_stage, "routing")
+
+    incident_type = classification.type.lower()
+    authority_routing, suggestions = await asyncio.gather(
+        _stage(on_stage, "authority_routing", _run_stage(
+            executor, timeout, lambda: heuristic_authority_routing(parsed, classification, routing),
+            authority_routing_agent, parsed, classification, routing
+        )),
+        _stage(on_stage, "suggestions", _run_stage(
+            executor, timeout, lambda: get_category_suggestions(incident_type),
+            suggestion_agent, parsed, classification
+        ))
+    )
+
+    return {
+        **parsed,
+        **classification.as_fields(),
+        "routing": routing,
+        "authority_routing": authority_routing,
+        "suggestions": suggestions
+    }
+
+async def run_batch_pipeline_async(reports, executor=None, batch_size=None, stage_timeout=None):
+    """Enrich many reports, classifying them in groups with one LLM call per group.
+
+    ``reports`` is a list of dicts with category, location and description. As each
+    group finishes, yields its list of ``(index, agent_result)`` pairs, where index
+    is the report's position in ``reports``.
+    """
+    timeout = LLM_STAGE_TIMEOUT if stage_timeout is None else stage_timeout
+    size = batch_size or BATCH_CLASSIFY_SIZE
+    # Starting every group at once overran the token bucket and sent whole groups to the heuristics;
+    # a group makes one classification call plus up to one per report
+    concurrency = BATCH_GROUP_CONCURRENCY or max(1, llm_gateway.bucket.capacity // (size + 1))
+    groups_running = asyncio.Semaphore(concurrency)
+
+    async def run_group(start, group):
+        async with groups_running:
+            return await _run_group(start, group)
+
+    async def _run_group(start, group):
+        parsed_group = [input_agent(r["category"], r["location"], r["description"]) for r in group]
+        classifications = await _run_stage(
+            executor, timeout, lambda: [get_default_classification(p) for p in parsed_group],
+            batch_classification_agent, parsed_group
+        )
+        results = await asyncio.gather(*[
+            _enrich_async(parsed, classification, executor, timeout)
+            for parsed, classification in zip(parsed_group, classifications)
+        ], return_exceptions=True)
+        return [
+            (start + i, result if isinstance(result, dict) else pipeline_error_result(
+                group[i]["category"], group[i]["location"], group[i]["description"]
+            ))
+            for i, result in enumerate(results)
+        ]
+
+    tasks = [
+        asyncio.ensure_future(run_group(start, reports[start:start + size]))
+        for start in range(0, len(reports), size)
+    ]
+    for finished in asyncio.as_completed(tasks):
+        yield await finished
+
+def run_heuristic_pipeline(parsed):
+    """Keyword-only enrichment for a parsed report, with no LLM calls"""
+    classification = get_default_classification(parsed)
+    routing = routing_agent(parsed, classification)
+    incident_type = classification.type.lower()
+    return {
+        **parsed,
+        **classification.as_fields(),
+        "routing": routing,
+        "authority_routing": heuristic_authority_routing(parsed, classification, routing),
+        "suggestions": get_category_suggestions(incident_type)
+    }
+
+def pipeline_error_result(category, location, description):
+    """Basic report structure returned when the pipeline fails"""
+    return {
+        "category": category,
+        "location": location,
+        "description": description,
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
+        "classification": "Error in classification",
+        "routing": "community push notification",
+        "authority_routing": "Police Department",
+        "suggestions": "Please contact local authorities for assistance."
+    }
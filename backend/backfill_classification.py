@@ -0,0 +1,31 @@
+"""Add fields to reports stored before they existed: type/urgency/severity parsed
+from the classification text, and lat/lng/geohash from the location so older
+reports show up in /reports/nearby and the map tiles.
+
+Run once from the repository root: python -m backend.backfill_classification
+"""
+from backend.storage import report_repository
+from backend.classification import classification_from_text
+from backend.geo import geo_fields
+
+def missing_fields(data):
+    """The derived fields a stored report lacks, or {}"""
+    fields = {}
+    if "urgency" not in data and data.get("classification"):
+        fields = classification_from_text(data["classification"]).as_fields()
+        del fields["classification"]
+    if "geohash" not in data:
+        fields.update(geo_fields(data.get("location", "")))
+    return fields
+
+def backfill():
+    updates = []
+    for report_id, data in report_repository.query():
+        fields = missing_fields(data)
+        if fields:
+            updates.append((report_id, fields))
+    report_repository.update_many(updates)
+    return len(updates)
+
+if __name__ == "__main__":
+    print(f"✅ Backfilled {backfill()} reports")
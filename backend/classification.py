@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+INCIDENT_TYPES = (
+    "Accident", "Crime", "Waterlogging",
+    "Construction Work in Progress", "Fire",
+    "Protest / March", "Others"
+)
+URGENCY_LEVELS = ("low", "medium", "high")
+
+class Classification(namedtuple("Classification", ["type", "urgency", "severity"])):
+    """Validated classification: canonical type, lowercase urgency and severity as an int 1-5.
+
+    ``str()`` gives the legacy ``"Type: ...\\nUrgency: ...\\nSeverity: ..."`` text, so the
+    object can be dropped into prompts and stored next to the structured fields.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return f"Type: {self.type}\nUrgency: {self.urgency}\nSeverity: {self.severity}"
+
+    def as_fields(self):
+        """Report fields: the legacy text plus separately queryable type, urgency and severity"""
+        return {
+            "classification": str(self),
+            "type": self.type,
+            "urgency": self.urgency,
+            "severity": self.severity
+        }
+
+def match_type(value):
+    """Canonical incident type for a free-text value, or None"""
+    value = (value or "").strip().lower()
+    if not value:
+        return None
+    for incident_type in INCIDENT_TYPES:
+        if incident_type.lower() in value or value in incident_type.lower():
+            return incident_type
+    return None
+
+def match_urgency(value):
+    value = str(value or "").strip().lower()
+    return value if value in URGENCY_LEVELS else None
+
+def match_severity(value):
+    try:
+        severity = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return severity if 1 <= severity <= 5 else None
+
+def parse_classification_text(text):
+    """Raw ``{"type", "urgency", "severity"}`` values from classification text (unvalidated)"""
+    values = {}
+    for line in (text or "").split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            key = key.strip().lower()
+            if key in ("type", "urgency", "severity"):
+                values[key] = value.strip()
+    return values
+
+def classification_from_text(text, default=None):
+    """Classification from legacy text, filling unparseable parts from default (others/medium/3)"""
+    default = default or Classification("Others", "medium", 3)
+    values = parse_classification_text(text)
+    return Classification(
+        match_type(values.get("type")) or default.type,
+        match_urgency(values.get("urgency")) or default.urgency,
+        match_severity(values.get("severity")) or default.severity
+    )
@@ -0,0 +1,112 @@
+import os
+import re
+import time
+import zlib
+import random
+import threading
+from datetime import datetime
+from backend.geo import haversine_km
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+# A new report joins a cluster when it is this close, this recent and this similar
+DEDUP_RADIUS_KM = float(os.getenv("DEDUP_RADIUS_M", "300")) / 1000
+DEDUP_WINDOW_SECONDS = float(os.getenv("DEDUP_WINDOW_MINUTES", "30")) * 60
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.5"))
+MINHASH_PERMUTATIONS = 64
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_words = re.compile(r"[a-z0-9]+")
+
+def shingles(text):
+    """Word unigrams and bigrams of a description"""
+    words = _words.findall(text.lower())
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+def minhash(text):
+    """MinHash signature of a description's shingle set"""
+    hashes = [zlib.crc32(gram.encode("utf-8")) for gram in shingles(text)]
+    if not hashes:
+        return (0,) * MINHASH_PERMUTATIONS
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / MINHASH_PERMUTATIONS
+
+def report_epoch(timestamp):
+    """Epoch seconds of a stored report timestamp (IST wall clock labelled +00:00, see input_agent)"""
+    return datetime.fromisoformat(timestamp).timestamp() - 5.5 * 3600
+
+class _Cluster:
+    def __init__(self, cluster_id, lat, lng, seen_at, signature, enrichment=None):
+        self.cluster_id = cluster_id
+        self.lat = lat
+        self.lng = lng
+        self.seen_at = seen_at
+        self.signature = signature
+        self.enrichment = enrichment
+
+class IncidentDeduper:
+    """Recent incident clusters, matched by distance, time window and MinHash text similarity"""
+
+    def __init__(self):
+        self._clusters = {}
+        self._lock = threading.Lock()
+        self.stats = {"matched": 0, "new_clusters": 0}
+
+    def _prune(self, now):
+        for cluster_id in [c.cluster_id for c in self._clusters.values() if now - c.seen_at > DEDUP_WINDOW_SECONDS]:
+            del self._clusters[cluster_id]
+
+    def match(self, description, coords, now=None):
+        """Best matching cluster for a new report as (cluster_id, enrichment_or_None), or None"""
+        if not DEDUP_ENABLED or not coords:
+            return None
+        now = time.time() if now is None else now
+        signature = minhash(description)
+        with self._lock:
+            self._prune(now)
+            best, best_score = None, DEDUP_SIMILARITY
+            for cluster in self._clusters.values():
+                if haversine_km(coords[0], coords[1], cluster.lat, cluster.lng) > DEDUP_RADIUS_KM:
+                    continue
+                score = similarity(signature, cluster.signature)
+                if score >= best_score:
+                    best, best_score = cluster, score
+            if best is None:
+                return None
+            # Each attached report keeps the cluster alive for another window
+            best.seen_at = now
+            self.stats["matched"] += 1
+            return best.cluster_id, best.enrichment
+
+    def add(self, cluster_id, description, coords, enrichment=None, seen_at=None):
+        """Start a cluster whose primary report is cluster_id"""
+        if not DEDUP_ENABLED or not coords:
+            return
+        seen_at = time.time() if seen_at is None else seen_at
+        with self._lock:
+            self._clusters[cluster_id] = _Cluster(
+                cluster_id, coords[0], coords[1], seen_at, minhash(description), enrichment
+            )
+            self.stats["new_clusters"] += 1
+
+    def set_enrichment(self, cluster_id, enrichment):
+        """Record the primary's enrichment, so later matches reuse it directly"""
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is not None:
+                cluster.enrichment = enrichment
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "active_clusters": len(self._clusters)}
+
+incident_deduper = IncidentDeduper()
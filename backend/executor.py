@@ -0,0 +1,23 @@
+import os
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for short blocking disk, SQLite and Firestore calls made from async handlers
+EXECUTOR_WORKERS = int(os.getenv("REPORT_EXECUTOR_WORKERS", "16"))
+# Separate pool for agent pipeline stages, which block on Gemini for seconds at a time,
+# so a burst of slow LLM calls cannot take every thread the read endpoints need
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+
+executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="report-io")
+llm_executor = ThreadPoolExecutor(max_workers=LLM_EXECUTOR_WORKERS, thread_name_prefix="report-llm")
+
+async def run_blocking(func, *args):
+    """Run a short blocking I/O call on the shared executor without stalling the event loop.
+
+    Agent pipelines go to llm_executor instead (pass it as run_pipeline_async's executor).
+
+    The caller's context variables (the active trace and span) carry over to the thread.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, func, *args)
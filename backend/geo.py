@@ -0,0 +1,107 @@
+import re
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_coordinates = re.compile(r'\((-?\d+\.?\d*),\s*(-?\d+\.?\d*)\)')
+
+# Precision stored on each report (~5 m cells)
+GEOHASH_PRECISION = 9
+# Most cells a nearby query may fan out to before dropping to a coarser precision
+MAX_QUERY_CELLS = 16
+EARTH_RADIUS_KM = 6371.0
+
+def parse_coordinates(location_text):
+    """Extract (lat, lng) from a location string ending in "(lat, lng)", or None"""
+    match = _coordinates.search(location_text or "")
+    if not match:
+        return None
+    lat, lng = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+def geo_fields(location_text):
+    """lat, lng and geohash stored on a report, or {} when the location has no coordinates"""
+    coords = parse_coordinates(location_text)
+    if not coords:
+        return {}
+    return {"lat": coords[0], "lng": coords[1], "geohash": encode_geohash(*coords)}
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres"""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(max(0.0, min(1.0, a))))
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+def cell_size(precision):
+    """(lat_degrees, lng_degrees) spanned by a geohash cell"""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing a circle"""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+    return max(-90.0, lat - dlat), max(-180.0, lng - dlng), min(90.0, lat + dlat), min(180.0, lng + dlng)
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, precision):
+    """Geohash cells at one precision that intersect a bounding box"""
+    lat_step, lng_step = cell_size(precision)
+    cells = []
+    lat = math.floor((min_lat + 90.0) / lat_step) * lat_step - 90.0
+    while lat <= max_lat:
+        lng = math.floor((min_lng + 180.0) / lng_step) * lng_step - 180.0
+        while lng <= max_lng:
+            center_lat = min(89.999999, lat + lat_step / 2)
+            center_lng = min(179.999999, lng + lng_step / 2)
+            cell = encode_geohash(center_lat, center_lng, precision)
+            if cell not in cells:
+                cells.append(cell)
+            lng += lng_step
+        lat += lat_step
+    return cells
+
+def covering_prefixes(lat, lng, radius_km, max_cells=MAX_QUERY_CELLS):
+    """Finest geohash prefixes covering a radius using at most max_cells cells"""
+    return covering_box_prefixes(bounding_box(lat, lng, radius_km), max_cells)
+
+def covering_box_prefixes(box, max_cells=MAX_QUERY_CELLS):
+    """Finest geohash prefixes covering a (min_lat, min_lng, max_lat, max_lng) box using at most max_cells cells"""
+    best = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor((box[2] + 90.0) / lat_step) - math.floor((box[0] + 90.0) / lat_step) + 1
+        cols = math.floor((box[3] + 180.0) / lng_step) - math.floor((box[1] + 180.0) / lng_step) + 1
+        if rows * cols > max_cells:
+            break
+        best = covering_cells(*box, precision)
+    return best
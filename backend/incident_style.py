@@ -0,0 +1,73 @@
+from functools import lru_cache
+
+def get_incident_color(category):
+    """Return color based on incident category"""
+    color_map = {
+        "Accident": "red",
+        "Fire": "orange", 
+        "Protest / March": "beige",
+        "Construction Work in Progress": "yellow",
+        "Theft": "purple",
+        "Crime": "red",
+        "Waterlogging": "blue",
+        "Others": "gray"
+    }
+    return color_map.get(category, "gray")
+
+def get_incident_icon(category):
+    """Return icon based on incident category"""
+    icon_map = {
+        "Accident": "🚗",
+        "Fire": "🔥",
+        "Protest / March": "👥",
+        "Construction Work in Progress": "🚧",
+        "Theft": "🥷",
+        "Crime": "🦹",
+        "Waterlogging": "🌊",
+        "Others": "‼"
+    }
+    return icon_map.get(category, "‼")
+
+def get_urgency_color(classification_text):
+    """Extract urgency level and return appropriate color intensity"""
+    if not classification_text:
+        return 0.5
+    
+    classification_lower = classification_text.lower()
+    if "urgency: high" in classification_lower:
+        return 1.0
+    elif "urgency: medium" in classification_lower:
+        return 0.7
+    elif "urgency: low" in classification_lower:
+        return 0.4
+    return 0.5
+
+def incident_classification_info(incident):
+    """Type, urgency and severity of an incident, read from its structured fields"""
+    if incident.get('urgency'):
+        return {
+            "type": incident.get('type') or "Unknown",
+            "urgency": incident['urgency'].title(),
+            "severity": str(incident.get('severity') or 3)
+        }
+    # Reports stored before the structured fields existed
+    return parse_classification_info(incident.get('classification', ''))
+
+def parse_classification_info(classification_text):
+    """Parse classification text to extract type, urgency, and severity"""
+    # A fresh dict per call: callers add to it, and the cached parse must not change
+    return dict(_parse_classification_fields(classification_text))
+
+@lru_cache(maxsize=4096)
+def _parse_classification_fields(classification_text):
+    """(key, value) pairs of a classification text, cached as an immutable tuple"""
+    info = {"type": "Unknown", "urgency": "Medium", "severity": "3"}
+    for line in (classification_text or "").split('\n'):
+        line = line.strip()
+        if line.startswith("Type:"):
+            info["type"] = line.replace("Type:", "").strip()
+        elif line.startswith("Urgency:"):
+            info["urgency"] = line.replace("Urgency:", "").strip().title()
+        elif line.startswith("Severity:"):
+            info["severity"] = line.replace("Severity:", "").strip()
+    return tuple(info.items())
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from backend.executor import run_blocking
+
+# On-disk queue so accepted reports survive a restart before they are enriched
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "backend/jobs.db")
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "4"))
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+ENRICHMENT_RETRY_DELAY = float(os.getenv("ENRICHMENT_RETRY_DELAY", "5"))
+# Idle workers re-check the queue at least this often (jobs from other processes, retries)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# Workers renew a running job's lease while they hold it; once a lease is this old the
+# process running the job is presumed dead and any worker (in any process) may claim it again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+class JobQueue:
+    """SQLite-backed FIFO of report enrichment jobs with retry bookkeeping"""
+
+    def __init__(self, path=JOB_QUEUE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                report_id TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+
+    def enqueue(self, report_id, payload):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (report_id, payload, status, attempts, available_at, updated_at) VALUES (?, ?, 'queued', 0, ?, ?)",
+                (report_id, json.dumps(payload), now, now)
+            )
+
+    def claim(self, lease=JOB_LEASE_SECONDS):
+        """Mark the oldest ready job as running and return (report_id, payload, attempts), or None.
+
+        Ready means queued and due, or running under a lease nobody renewed for ``lease`` seconds.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, report_id, payload, attempts FROM jobs "
+                    "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND updated_at <= ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now, now - lease)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not row:
+            return None
+        try:
+            payload = json.loads(row[2])
+        except ValueError as e:
+            # Retrying cannot fix a payload that does not decode
+            self.retry_or_fail(row[1], ENRICHMENT_MAX_ATTEMPTS, f"Bad payload: {e}")
+            return None
+        return row[1], payload, row[3] + 1
+
+    def renew(self, report_id):
+        """Extend the lease of a job this process is still running"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE report_id = ? AND status = 'running'", (time.time(), report_id)
+            )
+
+    def complete(self, report_id):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE report_id = ?",
+                (time.time(), report_id)
+            )
+
+    def retry_or_fail(self, report_id, attempts, error):
+        """Requeue with exponential backoff, or mark failed after the last attempt; returns the new status"""
+        now = time.time()
+        status = "queued" if attempts < ENRICHMENT_MAX_ATTEMPTS else "failed"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, updated_at = ? WHERE report_id = ?",
+                (status, now + ENRICHMENT_RETRY_DELAY * (2 ** (attempts - 1)), error, now, report_id)
+            )
+        return status
+
+    def status(self, report_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, last_error FROM jobs WHERE report_id = ?", (report_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"status": row[0], "attempts": row[1], "last_error": row[2]}
+
+    def counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+class EnrichmentWorkers:
+    """Pool of asyncio workers draining the JobQueue with a bounded concurrency"""
+
+    def __init__(self, queue, handler, on_failed=None, concurrency=ENRICHMENT_WORKERS):
+        self.queue = queue
+        self.handler = handler
+        self.on_failed = on_failed
+        self.concurrency = concurrency
+        self._wakeup = None
+        self._tasks = []
+        self._waiters = {}
+        # Pipeline stages finished so far by jobs running in this process
+        self.progress = {}
+
+    def start(self):
+        # Jobs left running by a dead process are claimed again once their lease goes stale
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, report_id, payload):
+        """Persist a job and wake an idle worker"""
+        await run_blocking(self.queue.enqueue, report_id, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait_for(self, report_id, timeout, changed=None):
+        """Wait until this process finishes the report's job or records a stage for it; False on timeout.
+
+        ``changed`` (an async callable) is checked once the waiter is registered, so a
+        notify landing between the caller's last read and this wait is not missed.
+        """
+        event = asyncio.Event()
+        waiters = self._waiters.setdefault(report_id, set())
+        waiters.add(event)
+        try:
+            if changed is not None and await changed():
+                return True
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters.discard(event)
+            if not waiters and self._waiters.get(report_id) is waiters:
+                del self._waiters[report_id]
+
+    def notify(self, report_id):
+        for event in self._waiters.pop(report_id, ()):
+            event.set()
+
+    def record_stage(self, report_id, stage):
+        """Called by the handler as each pipeline stage of a running job finishes"""
+        self.progress.setdefault(report_id, []).append(stage)
+        self.notify(report_id)
+
+    async def _keep_leased(self, report_id):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                await run_blocking(self.queue.renew, report_id)
+            except Exception as e:
+                print(f"❌ Could not renew the lease on {report_id}: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self._step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A locked database or a bad row must not stop the queue from draining
+                print(f"❌ Enrichment worker error: {e}")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    async def _step(self):
+        """Claim and run one job, or wait for one to arrive"""
+        job = await run_blocking(self.queue.claim)
+        if job is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        report_id, payload, attempts = job
+        self.progress[report_id] = []
+        lease = asyncio.create_task(self._keep_leased(report_id))
+        try:
+            await self.handler(report_id, payload, attempts)
+            await run_blocking(self.queue.complete, report_id)
+            self.notify(report_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status = await run_blocking(self.queue.retry_or_fail, report_id, attempts, str(e))
+            if status == "failed":
+                if self.on_failed is not None:
+                    try:
+                        await self.on_failed(report_id, payload, str(e))
+                    except Exception as failed_error:
+                        print(f"❌ Failure handler for {report_id} raised: {failed_error}")
+                self.notify(report_id)
+        finally:
+            lease.cancel()
+            self.progress.pop(report_id, None)
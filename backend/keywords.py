@@ -0,0 +1,57 @@
+import re
+from collections import namedtuple
+
+# Result of one scan: every keyword found as a substring, plus the numeric checks
+# the heuristics used to do with range(50, 1000)
+KeywordHits = namedtuple("KeywordHits", ["words", "has_number_50_to_999", "has_multiple_of_50"])
+
+# str(i) in text for i in range(50, 1000) / range(50, 1000, 50)
+_number_50_to_999 = re.compile(r"[5-9]\d|[1-9]\d\d")
+_multiple_of_50 = re.compile(r"50|[1-9][05]0")
+
+def _trie_pattern(keywords):
+    """Build a prefix-shared alternation so the regex engine walks a trie instead of N branches"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Optional tail is greedy, so the longest keyword at each position wins
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+class KeywordMatcher:
+    """Finds every keyword occurring in a text with one compiled regex pass"""
+
+    def __init__(self, keywords):
+        keywords = frozenset(keywords)
+        # Zero-width lookahead so matches may overlap; each position reports its longest keyword
+        self._pattern = re.compile("(?=(" + _trie_pattern(keywords) + "))")
+        # Shorter keywords that start at the same position are substrings of the longest one
+        self._contained = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+
+    def find_all(self, text):
+        """Return the set of keywords that occur anywhere in text"""
+        found = set()
+        for keyword in self._pattern.findall(text):
+            found |= self._contained[keyword]
+        return found
+
+    def scan(self, text):
+        """Scan already-lowercased text for keywords and number mentions"""
+        return KeywordHits(
+            frozenset(self.find_all(text)),
+            _number_50_to_999.search(text) is not None,
+            _multiple_of_50.search(text) is not None
+        )
@@ -0,0 +1,98 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# In-process tier settings
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "900"))
+# Optional SQLite tier; disabled when unset
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+
+_whitespace = re.compile(r"\s+")
+
+def prompt_key(prompt):
+    """Content hash of a prompt, ignoring case and whitespace differences"""
+    normalized = _whitespace.sub(" ", prompt).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Two-tier LLM response cache: an LRU with TTL in memory and an optional SQLite table"""
+
+    def __init__(self, max_size=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, db_path=LLM_CACHE_DB):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key):
+        """Return the cached response for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    self._remember(key, row[0], row[1])
+                    self.stats["disk_hits"] += 1
+                    return row[0]
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, response):
+        """Store a response in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            self.stats["stores"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, created) VALUES (?, ?, ?)",
+                    (key, response, now)
+                )
+                self._db.commit()
+
+    def _remember(self, key, response, created):
+        self._entries[key] = (response, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def metrics(self):
+        """Counters plus current size and hit ratio"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hit_ratio = (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+            return {**self.stats, "size": len(self._entries), "hit_ratio": round(hit_ratio, 4)}
+
+llm_cache = LLMCache()
@@ -0,0 +1,198 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from backend.tracing import record_fallback
+
+# Token bucket: sustained calls per second and burst size
+LLM_RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "5"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+# Upper bound on concurrent calls; the live limit adapts between 1 and this
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+# Seconds a single call may take, and how long a caller may wait for a slot
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "8"))
+LLM_ACQUIRE_TIMEOUT = float(os.getenv("LLM_ACQUIRE_TIMEOUT", "2"))
+# Circuit breaker: consecutive failures before opening, seconds before a probe
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+class LLMUnavailable(Exception):
+    """The gateway refused or abandoned a call; callers should use their heuristic fallback"""
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate=LLM_RATE_PER_SEC, burst=LLM_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take one token, waiting up to timeout seconds; returns False if none became available"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class AdaptiveLimiter:
+    """In-flight bound that grows by one on success and halves on failure (AIMD)"""
+
+    def __init__(self, maximum=LLM_MAX_IN_FLIGHT):
+        self.maximum = maximum
+        self.limit = maximum
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, success):
+        with self._cond:
+            self.in_flight -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + 1)
+            else:
+                self.limit = max(1.0, self.limit / 2)
+            self._cond.notify_all()
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def healthy(self):
+        """True unless open and still cooling down (does not consume the probe)"""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self._opened_at >= self.reset_timeout
+            return not (self.state == "half_open" and self._probing)
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        """Give back a half-open probe that was allowed but never sent"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+class LLMGateway:
+    """Single entry point for Gemini calls: rate limit, in-flight bound, deadline and breaker"""
+
+    def __init__(self, bucket=None, limiter=None, breaker=None, deadline=LLM_CALL_DEADLINE):
+        self.bucket = bucket or TokenBucket()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.deadline = deadline
+        self._pool = ThreadPoolExecutor(max_workers=self.limiter.maximum, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self.counters = {
+            "calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+            "short_circuited": 0, "rate_limited": 0, "saturated": 0
+        }
+        self.fallbacks = {}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def available(self):
+        """Whether an LLM call is worth attempting right now"""
+        return self.breaker.healthy()
+
+    def call(self, func, *args, deadline=None):
+        """Run func(*args) under the gateway's limits, raising LLMUnavailable when refused or late"""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise LLMUnavailable("LLM circuit open")
+        if not self.bucket.acquire(LLM_ACQUIRE_TIMEOUT):
+            self._count("rate_limited")
+            self.breaker.release_probe()
+            raise LLMUnavailable("LLM rate limit reached")
+        if not self.limiter.acquire(LLM_ACQUIRE_TIMEOUT):
+            self._count("saturated")
+            self.breaker.release_probe()
+            raise LLMUnavailable("Too many LLM calls in flight")
+
+        self._count("calls")
+        future = self._pool.submit(func, *args)
+        # The slot is held until the call really returns, even if the caller stops waiting
+        future.add_done_callback(lambda f: self.limiter.release(f.exception() is None))
+        try:
+            result = future.result(timeout=self.deadline if deadline is None else deadline)
+        except FutureTimeout:
+            self._count("timeouts")
+            self.breaker.record_failure()
+            raise LLMUnavailable("LLM call exceeded its deadline")
+        except Exception:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        self._count("successes")
+        self.breaker.record_success()
+        return result
+
+    def record_fallback(self, agent, error=None):
+        """Count an agent answering from its heuristic instead of the LLM, with the exception that caused it"""
+        with self._lock:
+            self.fallbacks[agent] = self.fallbacks.get(agent, 0) + 1
+        record_fallback(agent, error)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "breaker_state": self.breaker.state,
+                "breaker_trips": self.breaker.trips,
+                "in_flight": self.limiter.in_flight,
+                "concurrency_limit": int(self.limiter.limit),
+                "fallbacks": dict(self.fallbacks)
+            }
+
+llm_gateway = LLMGateway()
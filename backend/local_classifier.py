@@ -0,0 +1,284 @@
+"""Offline first-tier classifier: hashed bag-of-words logistic regression.
+
+One linear softmax head each for type, urgency and severity over hashed word
+unigrams/bigrams of the description plus the reported category. Prediction is a
+single gather-and-sum over a few dozen weight rows, well under a millisecond.
+
+Train from the stored incident_reports (or a JSONL export) and print a held-out
+accuracy/latency report:
+
+    python -m backend.local_classifier train --out backend/models/local_classifier.npz
+    python -m backend.local_classifier train --input reports.jsonl --heuristic-labels
+    python -m backend.local_classifier evaluate --model backend/models/local_classifier.npz --input heldout.jsonl
+
+Serving picks the model up from LOCAL_CLASSIFIER_PATH; classification_agent only
+calls Gemini when the model's confidence is below LOCAL_CLASSIFIER_THRESHOLD.
+"""
+import os
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+
+import numpy as np
+
+from backend.classification import (
+    Classification, INCIDENT_TYPES, URGENCY_LEVELS, classification_from_text
+)
+from backend.dedup import shingles
+
+LOCAL_CLASSIFIER_PATH = os.getenv("LOCAL_CLASSIFIER_PATH", "")
+# Minimum confidence (lowest of the three heads' top probabilities) to skip the LLM
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.8"))
+HASH_FEATURES = 1 << 15
+
+SEVERITY_LEVELS = (1, 2, 3, 4, 5)
+HEADS = (("type", INCIDENT_TYPES), ("urgency", URGENCY_LEVELS), ("severity", SEVERITY_LEVELS))
+
+def features(description, category):
+    """Hashed feature indices of a report"""
+    grams = shingles(description or "")
+    grams.add(f"category={(category or '').lower()}")
+    return sorted({zlib.crc32(gram.encode("utf-8")) % HASH_FEATURES for gram in grams})
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class LocalClassifier:
+    """Three softmax heads sharing one hashed feature space, stacked column-wise in one matrix"""
+
+    def __init__(self, weights, bias):
+        self.weights = weights
+        self.bias = bias
+        self._slices = []
+        start = 0
+        for _, labels in HEADS:
+            self._slices.append(slice(start, start + len(labels)))
+            start += len(labels)
+        self._lock = threading.Lock()
+        self.stats = {"predictions": 0, "confident": 0}
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["weights"], data["bias"])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias)
+
+    def predict(self, description, category):
+        """(Classification, confidence) where confidence is the least certain head's top probability"""
+        idx = features(description, category)
+        logits = self.bias + self.weights[idx].sum(axis=0) / np.sqrt(max(len(idx), 1))
+        values, confidence = [], 1.0
+        for (_, labels), cols in zip(HEADS, self._slices):
+            probs = _softmax(logits[cols])
+            best = int(probs.argmax())
+            values.append(labels[best])
+            confidence = min(confidence, float(probs[best]))
+        return Classification(*values), confidence
+
+    def classify(self, parsed, threshold=None):
+        """Classification for a parsed report, or None if the model is not confident enough"""
+        threshold = LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        classification, confidence = self.predict(parsed["description"], parsed["category"])
+        with self._lock:
+            self.stats["predictions"] += 1
+            if confidence >= threshold:
+                self.stats["confident"] += 1
+        return classification if confidence >= threshold else None
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "threshold": LOCAL_CLASSIFIER_THRESHOLD}
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def get_local_classifier():
+    """The model at LOCAL_CLASSIFIER_PATH, loaded once; None when unset or unreadable"""
+    global _model, _model_loaded
+    if _model_loaded:
+        return _model
+    with _model_lock:
+        if not _model_loaded:
+            if LOCAL_CLASSIFIER_PATH:
+                try:
+                    _model = LocalClassifier.load(LOCAL_CLASSIFIER_PATH)
+                except Exception as e:
+                    print(f"❌ Could not load local classifier from {LOCAL_CLASSIFIER_PATH}: {e}")
+            _model_loaded = True
+    return _model
+
+# TRAINING
+
+def _encode(examples):
+    """Sparse (rows, cols, values) design matrix plus one label-index column per head"""
+    rows, cols, vals = [], [], []
+    labels = np.zeros((len(examples), len(HEADS)), dtype=np.int64)
+    for i, (description, category, classification) in enumerate(examples):
+        idx = features(description, category)
+        rows.extend([i] * len(idx))
+        cols.extend(idx)
+        vals.extend([1 / np.sqrt(max(len(idx), 1))] * len(idx))
+        for h, (name, head_labels) in enumerate(HEADS):
+            labels[i, h] = head_labels.index(getattr(classification, name))
+    return np.asarray(rows), np.asarray(cols), np.asarray(vals, dtype=np.float32), labels
+
+def train(examples, epochs=200, learning_rate=0.5, l2=1e-4):
+    """Fit the three heads with full-batch AdaGrad on softmax cross-entropy"""
+    rows, cols, vals, labels = _encode(examples)
+    n = len(examples)
+    width = sum(len(head_labels) for _, head_labels in HEADS)
+    weights = np.zeros((HASH_FEATURES, width), dtype=np.float32)
+    bias = np.zeros(width, dtype=np.float32)
+    targets = np.zeros((n, width), dtype=np.float32)
+    start = 0
+    for h, (_, head_labels) in enumerate(HEADS):
+        targets[np.arange(n), start + labels[:, h]] = 1
+        start += len(head_labels)
+    model = LocalClassifier(weights, bias)
+    g2_w = np.full_like(weights, 1e-8)
+    g2_b = np.full_like(bias, 1e-8)
+
+    for _ in range(epochs):
+        logits = np.tile(bias, (n, 1))
+        np.add.at(logits, rows, weights[cols] * vals[:, None])
+        grad = np.empty_like(logits)
+        for cols_slice in model._slices:
+            grad[:, cols_slice] = _softmax(logits[:, cols_slice])
+        grad = (grad - targets) / n
+        grad_w = np.zeros_like(weights)
+        np.add.at(grad_w, cols, grad[rows] * vals[:, None])
+        grad_w += l2 * weights
+        grad_b = grad.sum(axis=0)
+        g2_w += grad_w ** 2
+        g2_b += grad_b ** 2
+        weights -= learning_rate * grad_w / np.sqrt(g2_w)
+        bias -= learning_rate * grad_b / np.sqrt(g2_b)
+    return model
+
+def evaluate(model, examples, threshold=None):
+    """Held-out accuracy per head, confident-coverage and per-report latency"""
+    threshold = LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    correct = {name: 0 for name, _ in HEADS}
+    exact, confident, confident_exact = 0, 0, 0
+    latencies = []
+    for description, category, expected in examples:
+        start = time.perf_counter()
+        predicted, confidence = model.predict(description, category)
+        latencies.append(time.perf_counter() - start)
+        for name, _ in HEADS:
+            correct[name] += getattr(predicted, name) == getattr(expected, name)
+        exact += predicted == expected
+        if confidence >= threshold:
+            confident += 1
+            confident_exact += predicted == expected
+    n = max(len(examples), 1)
+    latencies_us = np.asarray(latencies or [0.0]) * 1e6
+    return {
+        "examples": len(examples),
+        "accuracy": {name: correct[name] / n for name, _ in HEADS},
+        "exact_match": exact / n,
+        "threshold": threshold,
+        "coverage": confident / n,
+        "exact_match_when_confident": confident_exact / confident if confident else None,
+        "latency_us": {
+            "p50": float(np.percentile(latencies_us, 50)),
+            "p99": float(np.percentile(latencies_us, 99)),
+            "mean": float(latencies_us.mean())
+        }
+    }
+
+def load_examples(input_path=None, heuristic_labels=False):
+    """(description, category, Classification) triples from a JSONL export or the report store.
+
+    Reports are labelled with their stored classification (which came from Gemini)
+    unless it is missing, is the pipeline's "Error in classification" placeholder
+    or ``heuristic_labels`` is set, in which case the keyword heuristics label them.
+    """
+    from backend.agents import get_default_classification
+
+    if input_path:
+        with open(input_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        from backend.storage import report_repository
+        records = [data for _, data in report_repository.query()]
+
+    examples = []
+    for record in records:
+        description, category = record.get("description"), record.get("category", "")
+        if not description:
+            continue
+        # A failed pipeline stored a placeholder, not a label; parsing it would teach Others/medium/3
+        failed = not record.get("urgency") and record.get("classification") == "Error in classification"
+        if heuristic_labels or failed or not (record.get("urgency") or record.get("classification")):
+            classification = get_default_classification({"description": description, "category": category})
+        elif record.get("urgency"):
+            classification = classification_from_text(
+                f"Type: {record.get('type')}\nUrgency: {record.get('urgency')}\nSeverity: {record.get('severity')}"
+            )
+        else:
+            classification = classification_from_text(record["classification"])
+        examples.append((description, category, classification))
+    return examples
+
+def print_report(report):
+    print(f"Held-out examples:    {report['examples']}")
+    for name, accuracy in report["accuracy"].items():
+        print(f"  {name:<9} accuracy: {accuracy:.3f}")
+    print(f"Exact match:          {report['exact_match']:.3f}")
+    when_confident = report["exact_match_when_confident"]
+    if when_confident is None:
+        print(f"Confident (>= {report['threshold']:.2f}): none")
+    else:
+        print(f"Confident (>= {report['threshold']:.2f}): {report['coverage']:.1%} of reports, exact match {when_confident:.3f}")
+    latency = report["latency_us"]
+    print(f"Latency:              p50 {latency['p50']:.0f} us, p99 {latency['p99']:.0f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the local incident classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train")
+    train_cmd.add_argument("--input", help="JSONL of reports (default: the report store)")
+    train_cmd.add_argument("--out", default="backend/models/local_classifier.npz")
+    train_cmd.add_argument("--heuristic-labels", action="store_true", help="Label with the keyword heuristics")
+    train_cmd.add_argument("--holdout", type=float, default=0.2)
+    train_cmd.add_argument("--epochs", type=int, default=200)
+    train_cmd.add_argument("--seed", type=int, default=7)
+    eval_cmd = sub.add_parser("evaluate")
+    eval_cmd.add_argument("--model", default=LOCAL_CLASSIFIER_PATH or "backend/models/local_classifier.npz")
+    eval_cmd.add_argument("--input", help="JSONL of reports (default: the report store)")
+    eval_cmd.add_argument("--heuristic-labels", action="store_true")
+    for cmd in (train_cmd, eval_cmd):
+        cmd.add_argument("--threshold", type=float, default=LOCAL_CLASSIFIER_THRESHOLD)
+        cmd.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    examples = load_examples(args.input, args.heuristic_labels)
+    if args.command == "train":
+        random.Random(args.seed).shuffle(examples)
+        split = int(len(examples) * (1 - args.holdout))
+        model = train(examples[:split], epochs=args.epochs)
+        model.save(args.out)
+        print(f"✅ Trained on {split} reports, saved to {args.out}")
+        heldout = examples[split:]
+    else:
+        model = LocalClassifier.load(args.model)
+        heldout = examples
+
+    report = evaluate(model, heldout, args.threshold)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
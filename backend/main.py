@@ -1,7 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from backend.router import router
+from backend.router import router, enrichment_workers, warm_deduper
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI()
+from backend.media import UploadLimitMiddleware
+@asynccontextmanager
+async def lifespan(app):
+    # Drain the enrichment queue for as long as the server runs
+    enrichment_workers.start()
+    try:
+        await warm_deduper()
+    except Exception as e:
+        print(f"❌ Dedup warm-up failed: {e}")
+    yield
+    await enrichment_workers.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Cut off request bodies over MAX_UPLOAD_REQUEST_BYTES while they stream in
+app.add_middleware(UploadLimitMiddleware)
 
 #Adding CORSMiddleware
 app.add_middleware(
@@ -0,0 +1,216 @@
+import os
+import uuid
+import hashlib
+from fastapi.responses import JSONResponse
+from backend.executor import run_blocking
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart before 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Caps enforced while the data arrives
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(100 * 1024 * 1024)))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(250 * 1024 * 1024)))
+# Text form fields are held in memory, so they get a small cap of their own
+MAX_FORM_FIELD_BYTES = int(os.getenv("MAX_FORM_FIELD_BYTES", str(64 * 1024)))
+
+class UploadTooLarge(Exception):
+    """An upload went over its per-file or per-request byte cap"""
+
+class MalformedForm(Exception):
+    """The body is not multipart/form-data this parser can read"""
+
+class StreamedFile:
+    """A file part already on disk: where it is, its size and SHA-256"""
+
+    __slots__ = ("filename", "path", "size", "sha256")
+
+    def __init__(self, filename, path, size, sha256):
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+class StreamingFormParser:
+    """multipart/form-data parsed as it arrives.
+
+    Text fields are kept in memory; each file part is hashed and written
+    straight to tmp_dir, so an upload is stored once and never spooled or
+    copied. Going over max_file_bytes for one file, or max_request_bytes across
+    all files, raises UploadTooLarge as soon as the offending chunk is seen.
+    """
+
+    def __init__(self, content_type, tmp_dir, max_file_bytes=MAX_UPLOAD_FILE_BYTES,
+                 max_request_bytes=MAX_UPLOAD_REQUEST_BYTES):
+        kind, params = parse_options_header(content_type or "")
+        if kind != b"multipart/form-data" or b"boundary" not in params:
+            raise MalformedForm("Expected multipart/form-data with a boundary")
+        self.tmp_dir = tmp_dir
+        self.max_file_bytes = max_file_bytes
+        self.max_request_bytes = max_request_bytes
+        self.fields = {}
+        self.files = []
+        self._total = 0
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = None
+        self._data = None
+        self._out = None
+        self._file = None
+        self._digest = None
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end
+        })
+
+    def _on_part_begin(self):
+        self._disposition = b""
+
+    def _on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MalformedForm('Content-Disposition has no "name"')
+        self._name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+            filename = os.path.basename(options[b"filename"].decode("utf-8", "replace"))
+            self._file = StreamedFile(filename, path, 0, None)
+            self._digest = hashlib.sha256()
+            self._out = open(path, "wb")
+            self.files.append((self._name, self._file))
+        else:
+            self._data = bytearray()
+
+    def _on_part_data(self, data, start, end):
+        chunk = data[start:end]
+        if self._out is None:
+            if len(self._data) + len(chunk) > MAX_FORM_FIELD_BYTES:
+                raise UploadTooLarge(f"Form field {self._name} exceeds {MAX_FORM_FIELD_BYTES} bytes")
+            self._data.extend(chunk)
+            return
+        self._file.size += len(chunk)
+        self._total += len(chunk)
+        if self._file.size > self.max_file_bytes:
+            raise UploadTooLarge(f"{self._file.filename} exceeds {self.max_file_bytes} bytes")
+        if self._total > self.max_request_bytes:
+            raise UploadTooLarge(f"Uploads exceed {self.max_request_bytes} bytes in total")
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    def _on_part_end(self):
+        if self._out is None:
+            self.fields[self._name] = self._data.decode("utf-8", "replace")
+        else:
+            self._out.close()
+            self._out = None
+            self._file.sha256 = self._digest.hexdigest()
+            if not self._file.filename and not self._file.size:
+                # A file input left empty: browsers still send the part, with filename=""
+                os.remove(self._file.path)
+                self.files.pop()
+
+    def write(self, chunk):
+        self._parser.write(chunk)
+
+    def finish(self):
+        self._parser.finalize()
+        if self._out is not None:
+            raise MalformedForm("Body ended inside a file part")
+
+    def discard(self):
+        """Close and remove every file written so far"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        for _, streamed in self.files:
+            if os.path.exists(streamed.path):
+                os.remove(streamed.path)
+
+async def read_streaming_form(request, tmp_dir, max_file_bytes=MAX_UPLOAD_FILE_BYTES,
+                              max_request_bytes=MAX_UPLOAD_REQUEST_BYTES):
+    """Parse a multipart request body chunk by chunk.
+
+    Returns ``(fields, files)``: text fields as {name: value} and file parts as
+    [(name, StreamedFile)], already stored under tmp_dir. On any error every
+    partial file is removed before the exception propagates.
+    """
+    parser = StreamingFormParser(request.headers.get("content-type"), tmp_dir, max_file_bytes, max_request_bytes)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_blocking(parser.write, chunk)
+        await run_blocking(parser.finish)
+    except BaseException:
+        await run_blocking(parser.discard)
+        raise
+    return parser.fields, parser.files
+
+class UploadLimitMiddleware:
+    """ASGI middleware rejecting request bodies over MAX_UPLOAD_REQUEST_BYTES with 413.
+
+    Checks Content-Length up front and counts bytes as they are received. Once a
+    chunked body goes over the cap the middleware sends the 413 itself, tells
+    the app the client disconnected and drops whatever the app sends after.
+    """
+
+    def __init__(self, app, max_bytes=MAX_UPLOAD_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        too_large = JSONResponse(
+            content={"error": f"Request body exceeds {self.max_bytes} bytes"}, status_code=413
+        )
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                return await too_large(scope, receive, send)
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    rejected = True
+                    if not response_started:
+                        await too_large(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, tracking_send)
@@ -0,0 +1,212 @@
+import os
+import re
+import uuid
+import asyncio
+import sqlite3
+import threading
+from PIL import Image, ImageOps
+from backend.executor import run_blocking
+
+# Content-addressed layout: objects/ab/cd/<sha256><ext>, derived/ab/cd/<sha256>_<variant>.jpg
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "backend/media")
+MEDIA_DB = os.getenv("MEDIA_DB", "backend/media.db")
+MEDIA_URL_PREFIX = "/media"
+# Longest edge in pixels of each JPEG derivative
+DERIVATIVE_SIZES = {
+    "thumb": int(os.getenv("MEDIA_THUMBNAIL_PX", "256")),
+    "preview": int(os.getenv("MEDIA_PREVIEW_PX", "1024"))
+}
+MEDIA_JPEG_QUALITY = int(os.getenv("MEDIA_JPEG_QUALITY", "80"))
+# The only types served inline, with the extension stored for each; the type is
+# sniffed from the bytes, never taken from the client, so nothing active
+# (HTML, SVG, scripts) is served as itself from the API origin
+ALLOWED_MEDIA_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "video/mp4": ".mp4",
+    "video/quicktime": ".mov",
+    "video/x-msvideo": ".avi",
+    "video/x-matroska": ".mkv",
+    "video/webm": ".webm"
+}
+UNKNOWN_MEDIA_TYPE = "application/octet-stream"
+
+_sha256 = re.compile(r"^[0-9a-f]{64}$")
+
+def is_sha256(value):
+    return bool(_sha256.match(value))
+
+def sniff_media_type(path):
+    """The allowlisted type of the file's content, or application/octet-stream"""
+    try:
+        with Image.open(path) as image:
+            mime = Image.MIME.get(image.format)
+        if mime in ALLOWED_MEDIA_TYPES:
+            return mime
+    except Exception:
+        pass
+    with open(path, "rb") as f:
+        head = f.read(64)
+    if head[4:8] == b"ftyp":
+        return "video/quicktime" if head[8:12] == b"qt  " else "video/mp4"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "video/webm" if b"webm" in head else "video/x-matroska"
+    return UNKNOWN_MEDIA_TYPE
+
+def _shard(sha256):
+    return sha256[:2], sha256[2:4]
+
+class MediaStore:
+    """Uploads stored once per SHA-256, reference-counted per report, with Pillow JPEG derivatives"""
+
+    def __init__(self, root=MEDIA_ROOT, db_path=MEDIA_DB):
+        self.root = root
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS media (
+                sha256 TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                mime TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS media_refs (sha256 TEXT NOT NULL, report_id TEXT NOT NULL, PRIMARY KEY (sha256, report_id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS media_refs_report ON media_refs (report_id)")
+        self.stats = {"stored": 0, "deduplicated": 0, "released": 0, "derivatives": 0}
+        self._pending = set()
+
+    def object_path(self, sha256, ext):
+        return os.path.join(self.root, "objects", *_shard(sha256), sha256 + ext)
+
+    def derivative_path(self, sha256, variant):
+        return os.path.join(self.root, "derived", *_shard(sha256), f"{sha256}_{variant}.jpg")
+
+    def describe(self, sha256, mime, size):
+        """The media_files entry stored on a report"""
+        entry = {"sha256": sha256, "mime": mime, "size": size, "url": f"{MEDIA_URL_PREFIX}/{sha256}"}
+        if mime.startswith("image/"):
+            entry["thumbnail_url"] = f"{MEDIA_URL_PREFIX}/{sha256}/thumb"
+            entry["preview_url"] = f"{MEDIA_URL_PREFIX}/{sha256}/preview"
+        return entry
+
+    @property
+    def tmp_dir(self):
+        """Where uploads are written while they arrive; on the same filesystem as the objects"""
+        return os.path.join(self.root, "tmp")
+
+    async def put(self, upload, report_id):
+        """Move a StreamedFile into the store and reference it from report_id; returns its media_files entry"""
+        mime = await run_blocking(self._commit, upload.path, upload.sha256, upload.size, report_id)
+        return self.describe(upload.sha256, mime, upload.size)
+
+    def _commit(self, tmp, sha256, size, report_id):
+        mime = sniff_media_type(tmp)
+        ext = ALLOWED_MEDIA_TYPES.get(mime, ".bin")
+        with self._lock:
+            row = self._db.execute("SELECT ext, mime FROM media WHERE sha256 = ?", (sha256,)).fetchone()
+            if row:
+                # Already stored: keep the first copy and drop this one
+                os.remove(tmp)
+                ext, mime = row
+                self.stats["deduplicated"] += 1
+            else:
+                path = self.object_path(sha256, ext)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+                self._db.execute(
+                    "INSERT INTO media (sha256, ext, mime, size) VALUES (?, ?, ?, ?)", (sha256, ext, mime, size)
+                )
+                self.stats["stored"] += 1
+            self._db.execute("INSERT OR IGNORE INTO media_refs (sha256, report_id) VALUES (?, ?)", (sha256, report_id))
+            self._db.execute(
+                "UPDATE media SET refcount = (SELECT COUNT(*) FROM media_refs WHERE sha256 = ?) WHERE sha256 = ?",
+                (sha256, sha256)
+            )
+        return mime
+
+    def release(self, report_id):
+        """Drop a report's references, deleting media nothing else refers to"""
+        with self._lock:
+            hashes = [row[0] for row in self._db.execute(
+                "SELECT sha256 FROM media_refs WHERE report_id = ?", (report_id,)
+            )]
+            self._db.execute("DELETE FROM media_refs WHERE report_id = ?", (report_id,))
+            for sha256 in hashes:
+                self._db.execute(
+                    "UPDATE media SET refcount = (SELECT COUNT(*) FROM media_refs WHERE sha256 = ?) WHERE sha256 = ?",
+                    (sha256, sha256)
+                )
+                row = self._db.execute("SELECT ext FROM media WHERE sha256 = ? AND refcount = 0", (sha256,)).fetchone()
+                if row:
+                    self._db.execute("DELETE FROM media WHERE sha256 = ?", (sha256,))
+                    for path in [self.object_path(sha256, row[0])] + [self.derivative_path(sha256, v) for v in DERIVATIVE_SIZES]:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    self.stats["released"] += 1
+
+    def _lookup(self, sha256):
+        with self._lock:
+            return self._db.execute("SELECT ext, mime FROM media WHERE sha256 = ?", (sha256,)).fetchone()
+
+    def make_derivatives(self, sha256):
+        """Write the JPEG thumbnail and preview of an image; False for media Pillow cannot read"""
+        row = self._lookup(sha256)
+        if not row or not row[1].startswith("image/"):
+            return False
+        try:
+            with Image.open(self.object_path(sha256, row[0])) as image:
+                image = ImageOps.exif_transpose(image).convert("RGB")
+                for variant, size in DERIVATIVE_SIZES.items():
+                    path = self.derivative_path(sha256, variant)
+                    if os.path.exists(path):
+                        continue
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    copy = image.copy()
+                    copy.thumbnail((size, size))
+                    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+                    copy.save(tmp, "JPEG", quality=MEDIA_JPEG_QUALITY, optimize=True, progressive=True)
+                    os.replace(tmp, path)
+                    with self._lock:
+                        self.stats["derivatives"] += 1
+            return True
+        except Exception as e:
+            print(f"❌ Could not make derivatives for {sha256}: {e}")
+            return False
+
+    def schedule_derivatives(self, entries):
+        """Generate derivatives for new images in the background, off the request path"""
+        for entry in entries:
+            if "thumbnail_url" in entry:
+                task = asyncio.create_task(run_blocking(self.make_derivatives, entry["sha256"]))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    def locate(self, sha256, variant=None):
+        """(path, mime) of an original or derivative, building a missing derivative on demand; None if unknown"""
+        row = self._lookup(sha256)
+        if not row:
+            return None
+        if variant is None:
+            return self.object_path(sha256, row[0]), row[1]
+        path = self.derivative_path(sha256, variant)
+        if not os.path.exists(path) and not self.make_derivatives(sha256):
+            return None
+        return path, "image/jpeg"
+
+    def metrics(self):
+        with self._lock:
+            objects, total_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM media").fetchone()
+            refs = self._db.execute("SELECT COUNT(*) FROM media_refs").fetchone()[0]
+            return {**self.stats, "objects": objects, "bytes": total_bytes, "references": refs}
+
+media_store = MediaStore()
@@ -0,0 +1,96 @@
+"""Agent prompt templates and canned safety suggestions, loaded once from a versioned file.
+
+PROMPTS_PATH points at a JSON file an operator can edit without touching code:
+
+    {
+      "version": 1,
+      "prompts": {"classification": {"variables": ["description", ...], "template": [lines]}},
+      "suggestions": {"categories": {...}, "defaults": {...}, "default_fallback": "..."}
+    }
+
+Templates use str.format placeholders (``{{`` for a literal brace). Each one is
+checked against its declared variables at load, so a typo fails at startup
+instead of on the first report that hits it. Restart the backend after editing.
+"""
+import os
+import json
+import string
+
+PROMPTS_PATH = os.getenv("PROMPTS_PATH", os.path.join(os.path.dirname(__file__), "prompts", "v1.json"))
+SUPPORTED_VERSIONS = (1,)
+# Prompts backend.agents renders; a prompts file must define all of them
+REQUIRED_PROMPTS = ("classification", "batch_classification", "creative_suggestions", "feedback", "authority_routing")
+# ChatPromptTemplate.format() prefixed this role, so prompts and LLM cache keys stay unchanged
+ROLE_PREFIX = "Human: "
+
+class PromptTemplate:
+    """One prompt, formatted with plain str.format"""
+
+    __slots__ = ("name", "variables", "_text")
+
+    def __init__(self, name, template, variables):
+        text = "\n".join(template) if isinstance(template, list) else template
+        found = {field for _, field, _, _ in string.Formatter().parse(text) if field is not None}
+        if found != set(variables):
+            raise ValueError(f"Prompt {name} uses {sorted(found)} but declares {sorted(variables)}")
+        self.name = name
+        self.variables = tuple(variables)
+        self._text = ROLE_PREFIX + text
+
+    def render(self, **values):
+        """Raises KeyError naming the first variable missing from values"""
+        return self._text.format(**values)
+
+class PromptRegistry:
+    """Compiled prompts plus the category suggestions, already joined into one string each"""
+
+    def __init__(self, data, source="<dict>"):
+        version = data.get("version")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"{source}: prompts version {version} is not one of {SUPPORTED_VERSIONS}")
+        self.version = version
+        self.source = source
+        self._prompts = {
+            name: PromptTemplate(name, spec["template"], spec.get("variables", ()))
+            for name, spec in data["prompts"].items()
+        }
+        missing = [name for name in REQUIRED_PROMPTS if name not in self._prompts]
+        if missing:
+            raise ValueError(f"{source}: missing prompts {missing}")
+
+        suggestions = data["suggestions"]
+        # Matched in file order, first category contained in the incident type wins
+        self._categories = tuple(
+            (category, " ".join(lines)) for category, lines in suggestions["categories"].items()
+        )
+        self._category_fallback = dict(self._categories).get("others", "")
+        self._defaults = tuple(suggestions.get("defaults", {}).items())
+        self._default_fallback = suggestions["default_fallback"]
+
+    @classmethod
+    def load(cls, path=PROMPTS_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), source=path)
+
+    def render(self, name, **values):
+        """The named prompt with values filled in, ready for generate_text"""
+        return self._prompts[name].render(**values)
+
+    def category_suggestions(self, incident_type):
+        """Predefined suggestions for the first category contained in a lowercase incident type"""
+        for category, joined in self._categories:
+            if category in incident_type:
+                return joined
+        return self._category_fallback
+
+    def default_suggestion(self, incident_type=""):
+        """One-line fallback advice when suggestion generation fails"""
+        if not incident_type:
+            return self._default_fallback
+        incident_type = incident_type.lower()
+        for key, suggestion in self._defaults:
+            if key in incident_type:
+                return suggestion
+        return self._default_fallback
+
+prompt_registry = PromptRegistry.load()
@@ -1,75 +1,521 @@
-from backend.firebase_config import db
-from backend.agents import run_pipeline  # ✅ Import the agent pipeline
-from datetime import datetime
+from backend.storage import report_repository, UnknownCursor
+from backend.tracing import span, trace, span_metrics, flatten_gauges
+from backend.agents import input_agent, run_pipeline_async, run_batch_pipeline_async, run_heuristic_pipeline, PIPELINE_STAGES  # ✅ Import the agent pipeline
+from backend.jobs import JobQueue, EnrichmentWorkers
+from backend.dedup import incident_deduper, report_epoch, DEDUP_WINDOW_SECONDS
+from backend.executor import llm_executor, run_blocking
+from backend.llm_cache import llm_cache
+from backend.llm_gateway import llm_gateway
+from backend.singleflight import llm_singleflight
+from backend.local_classifier import get_local_classifier
+from backend.media import UploadTooLarge, MalformedForm, read_streaming_form
+from backend.media_store import media_store, is_sha256, DERIVATIVE_SIZES, ALLOWED_MEDIA_TYPES, UNKNOWN_MEDIA_TYPE
+from backend.geo import parse_coordinates, geo_fields, covering_prefixes, covering_box_prefixes, haversine_km
+from backend.tiles import (
+    tile_cache, tile_bounds, time_bucket, bucket_cutoff, build_tile,
+    TILE_BUCKET_SECONDS, MIN_TILE_ZOOM, MAX_TILE_ZOOM, TILE_GEOHASH_MIN_ZOOM
+)
+from datetime import datetime, timezone, timedelta
+import asyncio
 import uuid
-from fastapi import APIRouter, Form, File, UploadFile
-from typing import List
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, Query
+from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
+import json
 import os
+import time
                 
 router = APIRouter()
 
-UPLOAD_FOLDER = "backend/uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Upper bound on reports accepted by one POST /reports/batch
+MAX_BATCH_REPORTS = int(os.getenv("MAX_BATCH_REPORTS", "1000"))
+
+# Page sizes for GET /reports/
+REPORTS_DEFAULT_LIMIT = int(os.getenv("REPORTS_DEFAULT_LIMIT", "100"))
+REPORTS_MAX_LIMIT = int(os.getenv("REPORTS_MAX_LIMIT", "1000"))
+
+# Longest a GET /reports/{id}/events stream waits for enrichment
+ENRICHMENT_EVENTS_TIMEOUT = float(os.getenv("ENRICHMENT_EVENTS_TIMEOUT", "120"))
+ENRICHMENT_FINAL_STATES = ("done", "failed", "deduplicated")
+
+def enrichment_fields(agent_result):
+    """The AI-derived fields of a report document"""
+    return {
+        "classification": agent_result["classification"],
+        "type": agent_result.get("type"),
+        "urgency": agent_result.get("urgency"),
+        "severity": agent_result.get("severity"),
+        "routing": agent_result["routing"],
+        "authority_routing_agent": agent_result["authority_routing"],
+        "suggestions": agent_result["suggestions"]
+    }
+
+ENRICHMENT_FIELD_NAMES = (
+    "classification", "type", "urgency", "severity", "routing", "authority_routing_agent", "suggestions"
+)
+
+def build_report_data(report_id, agent_result, media_files):
+    """Stored document for a report; agent_result may be the bare input_agent output.
+
+    ``media_files`` holds media store entries (hash, mime, size and URLs), not paths.
+    """
+    report_data = {
+        "report_id": report_id,
+        "category": agent_result["category"],
+        "location": agent_result["location"],
+        "description": agent_result["description"],
+        "media_files": media_files,
+        "media_sha256": [entry["sha256"] for entry in media_files],
+        "timestamp": agent_result["submitted_at"],
+        "status": "Pending"
+    }
+    if "classification" in agent_result:
+        report_data.update(enrichment_fields(agent_result))
+        report_data["enrichment"] = "done"
+    else:
+        report_data["enrichment"] = "queued"
+    report_data.update(geo_fields(agent_result["location"]))
+    return report_data
+
+async def run_io(name, func, *args):
+    """run_blocking inside a tracing span named for the I/O step"""
+    with span(name):
+        return await run_blocking(func, *args)
+
+def invalidate_tiles(location):
+    """Drop the cached map tiles showing a report's location"""
+    coords = parse_coordinates(location)
+    if coords:
+        tile_cache.invalidate_point(*coords)
+
+def report_time_cutoff(hours):
+    """Oldest timestamp inside the window, in the IST wall-clock format input_agent stores"""
+    ist_now = datetime.now(timezone.utc) + timedelta(hours=5, minutes=30)
+    return (ist_now - timedelta(hours=hours)).isoformat()
+
+async def enrich_report(report_id, parsed, attempts):
+    """Job handler: run the agent pipeline for an accepted report and store the result"""
+    with trace() as timings:
+        agent_result = await run_pipeline_async(
+            parsed["category"], parsed["location"], parsed["description"], executor=llm_executor,
+            on_stage=lambda stage: enrichment_workers.record_stage(report_id, stage)
+        )
+    if agent_result["classification"] == "Error in classification":
+        raise RuntimeError("Agent pipeline failed")
+    fields = enrichment_fields(agent_result)
+    await run_io("storage.update", report_repository.update, report_id, {
+        **fields, "enrichment": "done", "enrichment_timings": timings.summary()
+    })
+    invalidate_tiles(parsed["location"])
+    await finish_cluster(report_id, fields)
+
+async def mark_enrichment_failed(report_id, parsed, error):
+    """Out of retries: store the keyword-heuristic result so the report is still usable"""
+    agent_result = await run_blocking(run_heuristic_pipeline, parsed)
+    fields = enrichment_fields(agent_result)
+    await run_io("storage.update", report_repository.update, report_id, {**fields, "enrichment": "failed"})
+    invalidate_tiles(parsed["location"])
+    await finish_cluster(report_id, fields)
+
+def primary_enrichment(data):
+    """A primary report's enrichment fields once its own enrichment has finished, else None"""
+    if data and data.get("enrichment", "done") in ("done", "failed") and "classification" in data:
+        return {key: data.get(key) for key in ENRICHMENT_FIELD_NAMES}
+    return None
+
+async def copy_enrichment(members, fields):
+    """Store a primary's enrichment on cluster members and wake their event streams"""
+    if members:
+        await run_io("storage.update_many", report_repository.update_many, [(m, {**fields, "enrichment": "deduplicated"}) for m in members])
+        for member in members:
+            enrichment_workers.notify(member)
+
+async def finish_cluster(cluster_id, fields):
+    """Copy a primary report's enrichment onto the duplicates that arrived while it ran.
+
+    Members are found in the store (cluster_id set, enrichment still "clustered"),
+    so this works whichever process or restart attached them.
+    """
+    incident_deduper.set_enrichment(cluster_id, fields)
+    members = await run_io("storage.cluster_members", report_repository.cluster_members, cluster_id)
+    await copy_enrichment(members, fields)
+
+async def warm_deduper():
+    """Seed the dedup clusters with primary reports from the current window (called at startup).
+
+    Also finishes members left "clustered" when their primary completed in a
+    process that stopped before copying its result.
+    """
+    hours = DEDUP_WINDOW_SECONDS / 3600
+    reports = await run_io("storage.query", report_repository.query, report_time_cutoff(hours))
+    primaries = {}
+    for report_id, data in reports:
+        if data.get("cluster_id", report_id) != report_id:
+            continue
+        primaries[report_id] = enrichment = primary_enrichment(data)
+        incident_deduper.add(
+            report_id, data.get("description", ""), parse_coordinates(data.get("location", "")),
+            enrichment=enrichment, seen_at=report_epoch(data["timestamp"])
+        )
+    for cluster_id in {data["cluster_id"] for _, data in reports if data.get("enrichment") == "clustered"}:
+        if cluster_id not in primaries:
+            primaries[cluster_id] = primary_enrichment(await run_io("storage.get", report_repository.get, cluster_id))
+        if primaries[cluster_id]:
+            await finish_cluster(cluster_id, primaries[cluster_id])
+
+enrichment_queue = JobQueue()
+enrichment_workers = EnrichmentWorkers(enrichment_queue, enrich_report, on_failed=mark_enrichment_failed)
+
+# Multipart fields of POST /report/; "file" may repeat
+REPORT_FORM_FIELDS = ("category", "location", "description")
 
 # ✅ Final and only /report/ route
+# The body is parsed as it streams in (category, location, description and one or more "file" parts),
+# so media goes to disk once, under the size caps, instead of being spooled and copied
 @router.post("/report/")
-async def submit_report(
-    category: str = Form(...),
-    location: str = Form(...),
-    description: str = Form(...),
-    file: List[UploadFile] = File(...)
-):
+async def submit_report(request: Request):
+    report_id = str(uuid.uuid4())
+    files, stored = [], False
     try:
-        # Step 1: AI pipeline
-        agent_result = run_pipeline(category, location, description)
-
-        # Step 2: Save media
-        report_id = str(uuid.uuid4())
-        saved_files = []
-        for media in file:
-            filename = f"{report_id}_{media.filename}"
-            file_location = os.path.join(UPLOAD_FOLDER, filename)
-            with open(file_location, "wb") as buffer:
-                buffer.write(await media.read())
-            saved_files.append(file_location)
-
-        # Step 3: Store in Firestore
-        report_data = {
-            "report_id": report_id,
-            "category": agent_result["category"],
-            "location": agent_result["location"],
-            "description": agent_result["description"],
-            "classification": agent_result["classification"],
-            "routing": agent_result["routing"],
-            "authority_routing_agent": agent_result["authority_routing"],
-            "suggestions": agent_result["suggestions"],
-            "media_files": saved_files,
-            "timestamp": agent_result["submitted_at"],
-            "status": "Pending"
-        }
+        with trace() as timings:
+            # Step 1: Stream media into the content-addressed store, enforcing the size caps;
+            # identical files forwarded by many people are kept once
+            with span("media.receive") as current:
+                fields, uploads = await read_streaming_form(request, media_store.tmp_dir)
+                current.set(bytes=sum(upload.size for _, upload in uploads))
+            files = [upload for name, upload in uploads if name == "file"]
+            for name, upload in uploads:
+                if name != "file":
+                    await run_blocking(os.remove, upload.path)
+            missing = [name for name in REPORT_FORM_FIELDS if not fields.get(name)] + ([] if files else ["file"])
+            if missing:
+                for upload in files:
+                    await run_blocking(os.remove, upload.path)
+                return JSONResponse(content={"error": f"Missing form fields: {', '.join(missing)}"}, status_code=422)
+            category, location, description = (fields[name] for name in REPORT_FORM_FIELDS)
+            media_files = []
+            for upload in files:
+                with span("media.put") as current:
+                    entry = await media_store.put(upload, report_id)
+                    current.set(bytes=entry["size"])
+                media_files.append(entry)
+            media_store.schedule_derivatives(media_files)
+
+            # Step 2: Near-duplicate of a recent incident? Reuse its AI result instead of a new run
+            parsed = input_agent(category, location, description)
+            report_data = build_report_data(report_id, parsed, media_files)
+            coords = parse_coordinates(location)
+            with span("dedup.match"):
+                match = incident_deduper.match(description, coords)
+        # The write that follows is timed in /metrics but cannot be stored on the document it writes
+        report_data["ingest_timings"] = timings.summary()
+        if match:
+            cluster_id, enrichment = match
+            report_data["cluster_id"] = cluster_id
+            if enrichment:
+                report_data.update(enrichment)
+                report_data["enrichment"] = "deduplicated"
+            else:
+                report_data["enrichment"] = "clustered"
+            await run_io("storage.put", report_repository.put, report_id, report_data)
+            stored = True
+            if not enrichment:
+                # The primary may have finished, here or in another worker, since the match;
+                # checked after the put so finish_cluster either finds this report or we find its result
+                primary = await run_io("storage.get", report_repository.get, cluster_id)
+                enrichment = primary_enrichment(primary)
+                if enrichment:
+                    await copy_enrichment([report_id], enrichment)
+            await run_io("storage.increment", report_repository.increment, cluster_id, "report_count")
+            invalidate_tiles(location)
+            return {
+                "message": "Report attached to an existing incident",
+                "report_id": report_id,
+                "cluster_id": cluster_id,
+                "enrichment": "deduplicated" if enrichment else "clustered"
+            }
 
-        db.collection("incident_reports").document(report_id).set(report_data)
+        # Step 3: Store right away, unenriched
+        report_data["cluster_id"] = report_id
+        report_data["report_count"] = 1
+        await run_io("storage.put", report_repository.put, report_id, report_data)
+        stored = True
+        invalidate_tiles(location)
+        incident_deduper.add(report_id, description, coords)
+
+        # Step 4: Queue the AI pipeline; poll GET /reports/{id} or stream /reports/{id}/events
+        await enrichment_workers.submit(report_id, parsed)
 
         return {
-            "message": "Report saved with AI enrichment",
+            "message": "Report saved; AI enrichment queued",
             "report_id": report_id,
-            "ai_data": agent_result
+            "enrichment": "queued"
         }
 
+    except UploadTooLarge as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except MalformedForm as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
     except Exception as e:
+        if not stored:
+            # No report will point at the media: drop its references and any upload not yet moved in
+            await run_blocking(media_store.release, report_id)
+            for upload in files:
+                if os.path.exists(upload.path):
+                    await run_blocking(os.remove, upload.path)
         return {"error": str(e)}
 
-# ✅ Get all reports
+def parse_batch_body(body):
+    """Parse a JSON array or JSONL request body into a list of report dicts"""
+    text = body.decode("utf-8").strip()
+    if text.startswith("["):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return items
+
+# ✅ Bulk ingestion: JSON array or JSONL in, NDJSON results streamed out
+@router.post("/reports/batch")
+async def submit_reports_batch(request: Request):
+    try:
+        items = parse_batch_body(await request.body())
+    except Exception as e:
+        return JSONResponse(content={"error": f"Invalid batch body: {e}"}, status_code=400)
+    if len(items) > MAX_BATCH_REPORTS:
+        return JSONResponse(
+            content={"error": f"Batch exceeds {MAX_BATCH_REPORTS} reports"}, status_code=413
+        )
+
+    valid, invalid = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and all(isinstance(item.get(k), str) and item.get(k) for k in ("category", "location", "description")):
+            valid.append((index, item))
+        else:
+            invalid.append(index)
+
+    async def results():
+        for index in invalid:
+            yield json.dumps({"index": index, "error": "category, location and description are required"}) + "\n"
+
+        reports = [item for _, item in valid]
+        async for group in run_batch_pipeline_async(reports, executor=llm_executor):
+            rows = []
+            for position, agent_result in group:
+                report_id = str(uuid.uuid4())
+                rows.append((valid[position][0], report_id, agent_result))
+            try:
+                await run_io("storage.put_many", report_repository.put_many, [
+                    (report_id, build_report_data(report_id, agent_result, []))
+                    for _, report_id, agent_result in rows
+                ])
+                for _, _, agent_result in rows:
+                    invalidate_tiles(agent_result["location"])
+                error = None
+            except Exception as e:
+                error = str(e)
+            for index, report_id, agent_result in rows:
+                line = {"index": index, "report_id": report_id, "ai_data": agent_result}
+                if error:
+                    line["error"] = error
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+# ✅ Get reports: newest first, one JSON object per line.
+# While more reports follow, the X-Next-Cursor header holds the start_after for the next page;
+# it is absent on the last page.
+# updated_since returns reports written (created, enriched, resolved...) since then, most recent write first.
 @router.get("/reports/")
-async def get_all_reports():
+async def get_all_reports(
+    limit: int = Query(REPORTS_DEFAULT_LIMIT, ge=1, le=REPORTS_MAX_LIMIT),
+    start_after: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    urgency: Optional[str] = None,
+    severity: Optional[int] = Query(None, ge=1, le=5),
+    fields: Optional[str] = None,
+    updated_since: Optional[str] = None
+):
+    if updated_since and (since or until):
+        return JSONResponse(content={"error": "updated_since cannot be combined with since/until"}, status_code=400)
     try:
-        docs = db.collection("incident_reports").stream()
-        all_reports = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            all_reports.append(data)
-        return JSONResponse(content=all_reports)
+        projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        # Every filter runs in the store, so one page is exactly the response; the extra row says whether another follows
+        page = await run_blocking(
+            report_repository.query, since, until, category, status,
+            urgency.lower() if urgency else None, severity, projection, start_after, limit + 1, updated_since
+        )
+    except UnknownCursor:
+        return JSONResponse(content={"error": f"Unknown cursor: {start_after}"}, status_code=400)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+    headers = {}
+    if len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = page[-1][0]
+
+    async def lines():
+        for report_id, data in page:
+            data["id"] = report_id
+            yield json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
+
+# ✅ Reports within radius_km of a point from the last `hours`, nearest first
+@router.get("/reports/nearby")
+async def get_nearby_reports(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=500),
+    hours: float = Query(48, gt=0)
+):
+    try:
+        prefixes = covering_prefixes(lat, lng, radius_km)
+        cutoff = report_time_cutoff(hours)
+        cells = await asyncio.gather(*[
+            run_io("storage.geohash_prefix", report_repository.geohash_prefix, prefix, cutoff) for prefix in prefixes
+        ])
+
+        nearby = []
+        for cell in cells:
+            for report_id, data in cell:
+                if "lat" not in data:
+                    continue
+                distance = haversine_km(lat, lng, data["lat"], data["lng"])
+                if distance > radius_km:
+                    continue
+                data["id"] = report_id
+                data["distance_km"] = round(distance, 2)
+                nearby.append(data)
+
+        nearby.sort(key=lambda report: report["distance_km"])
+        return JSONResponse(content=jsonable_encoder(nearby))
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
+
+# ✅ Map tiles: recent incidents inside one z/x/y Web Mercator tile as GeoJSON.
+# Built once per time bucket and dropped early when a report inside the tile changes.
+@router.get("/tiles/{z}/{x}/{y}.geojson")
+async def get_tile(z: int, x: int, y: int, hours: float = Query(48, gt=0, le=720)):
+    if not MIN_TILE_ZOOM <= z <= MAX_TILE_ZOOM or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        return JSONResponse(content={"error": "Tile out of range"}, status_code=400)
+    try:
+        bucket = time_bucket()
+        key = (z, x, y, hours, bucket)
+        tile = tile_cache.get(key)
+        if tile is None:
+            bounds = tile_bounds(z, x, y)
+            cutoff = bucket_cutoff(bucket, hours)
+            if z >= TILE_GEOHASH_MIN_ZOOM:
+                cells = await asyncio.gather(*[
+                    run_io("storage.geohash_prefix", report_repository.geohash_prefix, prefix, cutoff)
+                    for prefix in covering_box_prefixes(bounds)
+                ])
+                reports = [report for cell in cells for report in cell]
+            else:
+                reports = await run_io("storage.query", report_repository.query, cutoff)
+            tile = build_tile(reports, bounds, cutoff)
+            tile_cache.set(key, tile)
+        max_age = max(0, int((bucket + 1) * TILE_BUCKET_SECONDS - time.time()))
+        return JSONResponse(
+            content=jsonable_encoder(tile), headers={"Cache-Control": f"public, max-age={max_age}"}
+        )
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+# ✅ Media by content hash: the original, or its "thumb" / "preview" JPEG.
+# Content never changes for a hash, so clients may cache it forever.
+@router.get("/media/{sha256}")
+@router.get("/media/{sha256}/{variant}")
+async def get_media(sha256: str, variant: Optional[str] = None):
+    if not is_sha256(sha256) or (variant is not None and variant not in DERIVATIVE_SIZES):
+        return JSONResponse(content={"error": "Media not found"}, status_code=404)
+    found = await run_blocking(media_store.locate, sha256, variant)
+    if not found:
+        return JSONResponse(content={"error": "Media not found"}, status_code=404)
+    path, mime = found
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "X-Content-Type-Options": "nosniff"}
+    # Rows stored before types were sniffed may carry a client-supplied type
+    if mime not in ALLOWED_MEDIA_TYPES:
+        mime = UNKNOWN_MEDIA_TYPE
+        headers["Content-Disposition"] = f'attachment; filename="{sha256}"'
+    return FileResponse(path, media_type=mime, headers=headers)
+
+# ✅ Single report, with the state of its enrichment job
+@router.get("/reports/{report_id}")
+async def get_report(report_id: str):
+    try:
+        data = await run_io("storage.get", report_repository.get, report_id)
+        if data is None:
+            return JSONResponse(content={"error": "Report not found"}, status_code=404)
+        data["id"] = report_id
+        data["job"] = await run_blocking(enrichment_queue.status, report_id)
+        return JSONResponse(content=jsonable_encoder(data))
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+# ✅ Server-sent events: "progress" as pipeline stages finish, then one "enrichment"
+# event once the report is enriched (or failed)
+@router.get("/reports/{report_id}/events")
+async def report_events(report_id: str):
+    async def events():
+        deadline = asyncio.get_running_loop().time() + ENRICHMENT_EVENTS_TIMEOUT
+        sent = None
+        while True:
+            data = await run_io("storage.get", report_repository.get, report_id)
+            if data is None:
+                yield "event: error\ndata: {\"error\": \"Report not found\"}\n\n"
+                return
+            if data.get("enrichment") in ENRICHMENT_FINAL_STATES:
+                data["id"] = report_id
+                yield f"event: enrichment\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+                return
+            job = await run_blocking(enrichment_queue.status, report_id)
+            progress = {
+                "job": job["status"] if job else data.get("enrichment"),
+                "stages": list(enrichment_workers.progress.get(report_id, [])),
+                "total": len(PIPELINE_STAGES)
+            }
+            if progress != sent:
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+                sent = progress
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            async def changed():
+                if enrichment_workers.progress.get(report_id, []) != progress["stages"]:
+                    return True
+                current = await run_io("storage.get", report_repository.get, report_id)
+                return current is None or current.get("enrichment") in ENRICHMENT_FINAL_STATES
+
+            # Woken as soon as a worker in this process finishes a stage or the job; re-read periodically for other workers
+            if not await enrichment_workers.wait_for(report_id, min(remaining, 5), changed):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+# ✅ Prometheus metrics: span duration histograms, fallback and error counters, component counters as gauges
+@router.get("/metrics")
+async def get_metrics():
+    gauges = flatten_gauges({**await get_llm_metrics(), "jobs": await run_blocking(enrichment_queue.counts)})
+    return PlainTextResponse(span_metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+# ✅ LLM cache and client counters
+@router.get("/llm/metrics")
+async def get_llm_metrics():
+    local_model = get_local_classifier()
+    return {
+        "cache": llm_cache.metrics(),
+        "gateway": llm_gateway.metrics(),
+        "singleflight": llm_singleflight.metrics(),
+        "dedup": incident_deduper.metrics(),
+        "tiles": tile_cache.metrics(),
+        "media": await run_blocking(media_store.metrics),
+        "local_classifier": local_model.metrics() if local_model is not None else None
+    }
@@ -0,0 +1,51 @@
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution shared by every caller"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, func):
+        """Run func() once per key at a time; callers arriving meanwhile get the same result or error"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
+
+llm_singleflight = SingleFlight()
@@ -0,0 +1,379 @@
+"""Incident report storage behind one repository interface.
+
+STORAGE_BACKEND picks the implementation:
+
+- ``firestore`` (default): the incident_reports collection, as before
+- ``sqlite``: a local embedded store at STORAGE_DB, so the whole stack runs
+  offline for load tests, profiling and benchmarks
+
+Copy the live collection into a local store with:
+
+    python -m backend.storage copy --to backend/reports.db
+"""
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore").lower()
+STORAGE_DB = os.getenv("STORAGE_DB", "backend/reports.db")
+REPORTS_COLLECTION = "incident_reports"
+# Firestore caps a write batch at 500 operations
+FIRESTORE_BATCH_SIZE = 500
+
+def updated_now():
+    """updated_at for a write: true UTC to the microsecond, so values sort as strings"""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+class UnknownCursor(Exception):
+    """start_after names a report that does not exist"""
+
+class ReportRepository(ABC):
+    """Incident reports keyed by report id, stored as plain dicts.
+
+    Every write stamps ``updated_at`` (see updated_now), so readers can poll for
+    reports changed since they last looked. Queries return ``(report_id, data)``
+    pairs, newest first.
+    """
+
+    @abstractmethod
+    def put(self, report_id, data):
+        """Store a report, replacing any with the same id"""
+
+    def put_many(self, reports):
+        """Store several (report_id, data) pairs"""
+        for report_id, data in reports:
+            self.put(report_id, data)
+
+    @abstractmethod
+    def get(self, report_id):
+        """The report's data, or None"""
+
+    @abstractmethod
+    def update(self, report_id, fields):
+        """Merge fields into a stored report"""
+
+    def update_many(self, updates):
+        """Apply several (report_id, fields) updates"""
+        for report_id, fields in updates:
+            self.update(report_id, fields)
+
+    @abstractmethod
+    def increment(self, report_id, field, amount=1):
+        """Add amount to a numeric field of a stored report"""
+
+    def set_status(self, report_id, status):
+        self.update(report_id, {"status": status})
+
+    @abstractmethod
+    def query(self, since=None, until=None, category=None, status=None, urgency=None, severity=None,
+              fields=None, start_after=None, limit=None, updated_since=None):
+        """Reports matching every given filter, newest first; ``fields`` projects the data.
+
+        With ``updated_since`` the result is the reports written at or after it,
+        most recently written first; it cannot be combined with since/until.
+        """
+
+    @abstractmethod
+    def geohash_prefix(self, prefix, since=None):
+        """Every report whose geohash starts with prefix, filed at or after ``since`` if given"""
+
+    @abstractmethod
+    def cluster_members(self, cluster_id, enrichment="clustered"):
+        """Ids of the reports attached to cluster_id whose enrichment state is `enrichment`"""
+
+class FirestoreReportRepository(ReportRepository):
+    """The incident_reports collection.
+
+    Equality filters combined with the timestamp ordering need composite indexes
+    on (category, timestamp), (status, timestamp), (urgency, timestamp) and
+    (severity, timestamp); time-bounded geohash queries need (geohash, timestamp).
+    """
+
+    def __init__(self, db=None):
+        from firebase_admin import firestore
+        if db is None:
+            from backend.firebase_config import db
+        self._firestore = firestore
+        self._db = db
+        self._collection = db.collection(REPORTS_COLLECTION)
+
+    def put(self, report_id, data):
+        self._collection.document(report_id).set({**data, "updated_at": updated_now()})
+
+    def put_many(self, reports):
+        for start in range(0, len(reports), FIRESTORE_BATCH_SIZE):
+            batch = self._db.batch()
+            for report_id, data in reports[start:start + FIRESTORE_BATCH_SIZE]:
+                batch.set(self._collection.document(report_id), {**data, "updated_at": updated_now()})
+            batch.commit()
+
+    def get(self, report_id):
+        snapshot = self._collection.document(report_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def update(self, report_id, fields):
+        self._collection.document(report_id).update({**fields, "updated_at": updated_now()})
+
+    def update_many(self, updates):
+        for start in range(0, len(updates), FIRESTORE_BATCH_SIZE):
+            batch = self._db.batch()
+            for report_id, fields in updates[start:start + FIRESTORE_BATCH_SIZE]:
+                batch.update(self._collection.document(report_id), {**fields, "updated_at": updated_now()})
+            batch.commit()
+
+    def increment(self, report_id, field, amount=1):
+        self.update(report_id, {field: self._firestore.Increment(amount)})
+
+    def query(self, since=None, until=None, category=None, status=None, urgency=None, severity=None,
+              fields=None, start_after=None, limit=None, updated_since=None):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        if updated_since and (since or until):
+            raise ValueError("updated_since cannot be combined with since/until")
+        query = self._collection
+        for field, value in (("category", category), ("status", status), ("urgency", urgency), ("severity", severity)):
+            if value:
+                query = query.where(filter=FieldFilter(field, "==", value))
+        if since:
+            query = query.where(filter=FieldFilter("timestamp", ">=", since))
+        if until:
+            query = query.where(filter=FieldFilter("timestamp", "<=", until))
+        if updated_since:
+            query = query.where(filter=FieldFilter("updated_at", ">=", updated_since))
+        order = "updated_at" if updated_since else "timestamp"
+        query = query.order_by(order, direction=self._firestore.Query.DESCENDING)
+        if fields:
+            query = query.select(fields)
+        if start_after:
+            cursor = self._collection.document(start_after).get()
+            if not cursor.exists:
+                raise UnknownCursor(start_after)
+            query = query.start_after(cursor)
+        if limit:
+            query = query.limit(limit)
+        return [(doc.id, doc.to_dict()) for doc in query.stream()]
+
+    def geohash_prefix(self, prefix, since=None):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (
+            self._collection
+            .where(filter=FieldFilter("geohash", ">=", prefix))
+            .where(filter=FieldFilter("geohash", "<", prefix + "~"))
+        )
+        if since:
+            query = query.where(filter=FieldFilter("timestamp", ">=", since))
+        return [(doc.id, doc.to_dict()) for doc in query.stream()]
+
+    def cluster_members(self, cluster_id, enrichment="clustered"):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (
+            self._collection
+            .where(filter=FieldFilter("cluster_id", "==", cluster_id))
+            .where(filter=FieldFilter("enrichment", "==", enrichment))
+        )
+        return [doc.id for doc in query.select([]).stream()]
+
+# Document fields copied into their own indexed columns
+SQLITE_COLUMNS = ("timestamp", "category", "status", "urgency", "severity", "geohash", "cluster_id", "enrichment", "updated_at")
+# Columns added after the table was first shipped, with their types; older files get them on open
+SQLITE_ADDED_COLUMNS = {"cluster_id": "TEXT", "enrichment": "TEXT", "updated_at": "TEXT"}
+
+class SQLiteReportRepository(ReportRepository):
+    """Reports as JSON documents in one SQLite table, with the queried fields as indexed columns"""
+
+    def __init__(self, path=STORAGE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reports (
+                id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL DEFAULT '',
+                category TEXT,
+                status TEXT,
+                urgency TEXT,
+                severity INTEGER,
+                geohash TEXT,
+                cluster_id TEXT,
+                enrichment TEXT,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            )"""
+        )
+        self._add_columns()
+        # Mirrors the Firestore composite indexes; (timestamp, id) is the page order
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_time ON reports (timestamp, id)")
+        for column in ("category", "status", "urgency", "severity"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS reports_{column}_time ON reports ({column}, timestamp, id)")
+        self._conn.execute("DROP INDEX IF EXISTS reports_geohash")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_geohash_time ON reports (geohash, timestamp)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_cluster ON reports (cluster_id, enrichment)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_updated ON reports (updated_at, id)")
+
+    def _add_columns(self):
+        """Add and fill columns missing from a file created by an older version"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(reports)")}
+        for column, kind in SQLITE_ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE reports ADD COLUMN {column} {kind}")
+                self._conn.execute(f"UPDATE reports SET {column} = json_extract(data, '$.{column}')")
+
+    @staticmethod
+    def _row(report_id, data):
+        data["updated_at"] = updated_now()
+        return (report_id, str(data.get("timestamp", "")), *(data.get(c) for c in SQLITE_COLUMNS[1:]),
+                json.dumps(data, ensure_ascii=False, default=str))
+
+    def _write(self, rows):
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO reports (id, {', '.join(SQLITE_COLUMNS)}, data) "
+            f"VALUES ({', '.join('?' * (len(SQLITE_COLUMNS) + 2))})", rows
+        )
+
+    def _load(self, report_id):
+        row = self._conn.execute("SELECT data FROM reports WHERE id = ?", (report_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No report {report_id}")
+        return json.loads(row[0])
+
+    def put(self, report_id, data):
+        with self._lock:
+            self._write([self._row(report_id, dict(data))])
+
+    def put_many(self, reports):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._write([self._row(report_id, dict(data)) for report_id, data in reports])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, report_id):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, report_id, fields):
+        self.update_many([(report_id, fields)])
+
+    def update_many(self, updates):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = []
+                for report_id, fields in updates:
+                    data = self._load(report_id)
+                    data.update(fields)
+                    rows.append(self._row(report_id, data))
+                self._write(rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def increment(self, report_id, field, amount=1):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                data = self._load(report_id)
+                data[field] = data.get(field, 0) + amount
+                self._write([self._row(report_id, data)])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def query(self, since=None, until=None, category=None, status=None, urgency=None, severity=None,
+              fields=None, start_after=None, limit=None, updated_since=None):
+        if updated_since and (since or until):
+            raise ValueError("updated_since cannot be combined with since/until")
+        order = "updated_at" if updated_since else "timestamp"
+        clauses, params = [], []
+        for column, value in (("category", category), ("status", status), ("urgency", urgency), ("severity", severity)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        if updated_since:
+            clauses.append("updated_at >= ?")
+            params.append(updated_since)
+        with self._lock:
+            if start_after:
+                cursor = self._conn.execute(f"SELECT {order} FROM reports WHERE id = ?", (start_after,)).fetchone()
+                if cursor is None:
+                    raise UnknownCursor(start_after)
+                clauses.append(f"({order} < ? OR ({order} = ? AND id < ?))")
+                params.extend([cursor[0], cursor[0], start_after])
+            sql = "SELECT id, data FROM reports"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY {order} DESC, id DESC"
+            if limit:
+                sql += " LIMIT ?"
+                params.append(limit)
+            rows = self._conn.execute(sql, params).fetchall()
+        reports = [(report_id, json.loads(data)) for report_id, data in rows]
+        if fields:
+            reports = [(report_id, {k: data[k] for k in fields if k in data}) for report_id, data in reports]
+        return reports
+
+    def geohash_prefix(self, prefix, since=None):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, data FROM reports WHERE geohash >= ? AND geohash < ? AND timestamp >= ?",
+                (prefix, prefix + "~", since or "")
+            ).fetchall()
+        return [(report_id, json.loads(data)) for report_id, data in rows]
+
+    def cluster_members(self, cluster_id, enrichment="clustered"):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM reports WHERE cluster_id = ? AND enrichment = ?", (cluster_id, enrichment)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+def open_report_repository(backend=STORAGE_BACKEND):
+    if backend == "firestore":
+        return FirestoreReportRepository()
+    if backend == "sqlite":
+        return SQLiteReportRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+report_repository = open_report_repository()
+
+def copy_reports(source, target, page_size=FIRESTORE_BATCH_SIZE):
+    """Copy every report from one repository into another; returns the number copied"""
+    copied, cursor = 0, None
+    while True:
+        page = source.query(start_after=cursor, limit=page_size)
+        if not page:
+            return copied
+        target.put_many(page)
+        copied += len(page)
+        cursor = page[-1][0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy incident reports between storage backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    copy_cmd = sub.add_parser("copy", help="Copy the Firestore collection into a local SQLite store")
+    copy_cmd.add_argument("--to", default=STORAGE_DB, help="SQLite file to fill")
+    args = parser.parse_args()
+    copied = copy_reports(FirestoreReportRepository(), SQLiteReportRepository(args.to))
+    print(f"✅ Copied {copied} reports to {args.to}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+
+from backend.incident_style import get_incident_color, get_incident_icon, incident_classification_info
+
+# Tiles are built once per time bucket; a report arriving inside the bucket invalidates its tiles
+TILE_BUCKET_SECONDS = float(os.getenv("TILE_BUCKET_SECONDS", "60"))
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "2048"))
+MIN_TILE_ZOOM = 3
+MAX_TILE_ZOOM = 20
+# Below this zoom a tile is too large for a geohash cover; read by time window instead
+TILE_GEOHASH_MIN_ZOOM = 8
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lng, max_lat, max_lng) of a Web Mercator (slippy map) tile"""
+    n = 1 << z
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+def tile_for(lat, lng, z):
+    """(x, y) of the tile containing a point at zoom z"""
+    n = 1 << z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def time_bucket(now=None):
+    return int((time.time() if now is None else now) // TILE_BUCKET_SECONDS)
+
+def bucket_cutoff(bucket, hours):
+    """Oldest timestamp in a tile built for this bucket, in the IST wall-clock format input_agent stores"""
+    start = datetime.fromtimestamp(bucket * TILE_BUCKET_SECONDS, timezone.utc)
+    return (start + timedelta(hours=5, minutes=30) - timedelta(hours=hours)).isoformat()
+
+def incident_feature(report_id, data):
+    """GeoJSON point for a report, styled like the Streamlit map markers"""
+    category = data.get("category", "Others")
+    class_info = incident_classification_info(data)
+    return {
+        "type": "Feature",
+        "id": report_id,
+        "geometry": {"type": "Point", "coordinates": [data["lng"], data["lat"]]},
+        "properties": {
+            "category": category,
+            "color": get_incident_color(category),
+            "icon": get_incident_icon(category),
+            "type": class_info["type"],
+            "urgency": class_info["urgency"],
+            "severity": class_info["severity"],
+            "status": data.get("status", "Pending"),
+            "report_count": data.get("report_count", 1),
+            "timestamp": data.get("timestamp", "")
+        }
+    }
+
+def build_tile(reports, bounds, cutoff):
+    """FeatureCollection of the cluster-primary reports inside bounds and newer than cutoff"""
+    min_lat, min_lng, max_lat, max_lng = bounds
+    features = []
+    for report_id, data in reports:
+        if "lat" not in data or str(data.get("timestamp", "")) < cutoff:
+            continue
+        if data.get("cluster_id", report_id) != report_id:
+            continue
+        if min_lat <= data["lat"] < max_lat and min_lng <= data["lng"] < max_lng:
+            features.append(incident_feature(report_id, data))
+    return {"type": "FeatureCollection", "features": features}
+
+class TileCache:
+    """LRU of built tiles keyed by (z, x, y, hours, bucket), invalidated per point"""
+
+    def __init__(self, max_size=TILE_CACHE_SIZE):
+        self.max_size = max_size
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.stats["misses"] += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.stats["hits"] += 1
+            return tile
+
+    def set(self, key, tile):
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_size:
+                self._tiles.popitem(last=False)
+
+    def invalidate_point(self, lat, lng):
+        """Drop every cached tile, at any zoom, that contains this point"""
+        with self._lock:
+            containing = {(z, *tile_for(lat, lng, z)) for z in range(MIN_TILE_ZOOM, MAX_TILE_ZOOM + 1)}
+            stale = [key for key in self._tiles if key[:3] in containing]
+            for key in stale:
+                del self._tiles[key]
+            self.stats["invalidations"] += len(stale)
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "size": len(self._tiles)}
+
+tile_cache = TileCache()
@@ -0,0 +1,246 @@
+"""Spans around agents and I/O steps, exported as Prometheus metrics and optionally OpenTelemetry.
+
+    with span("storage.put"):
+        ...
+
+    @traced()
+    def classification_agent(parsed): ...
+
+Every span feeds the duration histograms behind GET /metrics. Inside a
+``with trace() as t:`` block the spans are also collected so ``t.summary()``
+can be stored on the report. When OTEL_EXPORTER_OTLP_ENDPOINT is set and the
+opentelemetry SDK is installed, spans are exported to that collector as well.
+"""
+import os
+import re
+import time
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Standard OpenTelemetry variables; export is off unless an endpoint is given
+OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "suraksha-setu-backend")
+METRICS_PREFIX = "suraksha"
+# Histogram buckets in seconds, from a cache hit to a slow LLM call
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_current_span = ContextVar("tracing_span", default=None)
+_current_trace = ContextVar("tracing_trace", default=None)
+
+class Span:
+    """One timed step; attributes hold sizes, the LLM/fallback path taken and any error"""
+
+    __slots__ = ("name", "attributes", "duration")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+class Trace:
+    """Spans finished while this trace was current, from any task or executor thread"""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, finished):
+        with self._lock:
+            self.spans.append(finished)
+
+    def summary(self):
+        """Per-span total milliseconds plus LLM usage, fallbacks and errors, for the report document"""
+        with self._lock:
+            spans = list(self.spans)
+        timings = {}
+        for s in spans:
+            timings[s.name] = round(timings.get(s.name, 0.0) + s.duration * 1000, 2)
+        llm = [s for s in spans if s.name == "llm.generate"]
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "spans_ms": timings,
+            "llm_calls": sum(1 for s in llm if s.attributes.get("source") == "llm"),
+            "llm_cache_hits": sum(1 for s in llm if s.attributes.get("source") == "cache"),
+            "prompt_chars": sum(s.attributes.get("prompt_chars", 0) for s in llm),
+            "response_chars": sum(s.attributes.get("response_chars", 0) for s in llm),
+            "fallbacks": sorted({s.attributes["fallback"] for s in spans if "fallback" in s.attributes}),
+            "errors": [f"{s.name}: {s.attributes['error']}" for s in spans if "error" in s.attributes]
+        }
+
+class SpanMetrics:
+    """Prometheus histograms of span durations plus error, fallback and LLM size counters"""
+
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._fallbacks = {}
+        self._llm_chars = {"prompt": 0, "response": 0}
+
+    def observe(self, finished):
+        with self._lock:
+            histogram = self._histograms.get(finished.name)
+            if histogram is None:
+                histogram = self._histograms[finished.name] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if finished.duration <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += finished.duration
+            histogram[2] += 1
+            if "error" in finished.attributes:
+                self._errors[finished.name] = self._errors.get(finished.name, 0) + 1
+            self._llm_chars["prompt"] += finished.attributes.get("prompt_chars", 0)
+            self._llm_chars["response"] += finished.attributes.get("response_chars", 0)
+
+    def count_fallback(self, stage):
+        with self._lock:
+            self._fallbacks[stage] = self._fallbacks.get(stage, 0) + 1
+
+    def render(self, gauges=None):
+        """Prometheus text exposition; ``gauges`` adds component counters as {name: number}"""
+        p = METRICS_PREFIX
+        lines = [
+            f"# HELP {p}_span_duration_seconds Duration of traced agent and I/O steps",
+            f"# TYPE {p}_span_duration_seconds histogram"
+        ]
+        with self._lock:
+            for name, (counts, total, count) in sorted(self._histograms.items()):
+                label = _label(name)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{p}_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {bucket_count}')
+                lines.append(f'{p}_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+                lines.append(f'{p}_span_duration_seconds_sum{{span="{label}"}} {total}')
+                lines.append(f'{p}_span_duration_seconds_count{{span="{label}"}} {count}')
+            lines += [f"# HELP {p}_span_errors_total Spans that raised or recorded a swallowed exception",
+                      f"# TYPE {p}_span_errors_total counter"]
+            lines += [f'{p}_span_errors_total{{span="{_label(n)}"}} {c}' for n, c in sorted(self._errors.items())]
+            lines += [f"# HELP {p}_agent_fallbacks_total Agents answering from heuristics instead of the LLM",
+                      f"# TYPE {p}_agent_fallbacks_total counter"]
+            lines += [f'{p}_agent_fallbacks_total{{stage="{_label(n)}"}} {c}' for n, c in sorted(self._fallbacks.items())]
+            lines += [f"# HELP {p}_llm_chars_total Characters sent to and received from the LLM",
+                      f"# TYPE {p}_llm_chars_total counter"]
+            lines += [f'{p}_llm_chars_total{{direction="{d}"}} {c}' for d, c in self._llm_chars.items()]
+        for name, value in sorted((gauges or {}).items()):
+            metric = f"{p}_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def _metric_name(value):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", value)
+
+def flatten_gauges(components):
+    """{"cache": {"hits": 3}} -> {"cache_hits": 3}; non-numeric values are skipped"""
+    gauges = {}
+    for prefix, value in components.items():
+        if isinstance(value, dict):
+            for name, child in flatten_gauges(value).items():
+                gauges[f"{prefix}_{name}"] = child
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            gauges[prefix] = value
+    return gauges
+
+span_metrics = SpanMetrics()
+
+def _start_otel():
+    if not OTEL_ENDPOINT:
+        return None
+    try:
+        from opentelemetry import trace as otel_trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        print(f"❌ OpenTelemetry export disabled, SDK not installed: {e}")
+        return None
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    # The exporter reads OTEL_EXPORTER_OTLP_ENDPOINT itself
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+    return otel_trace.get_tracer("backend.tracing")
+
+_otel_tracer = _start_otel()
+
+def _otel_attributes(attributes):
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in attributes.items()}
+
+@contextmanager
+def span(name, **attributes):
+    """Time a step; exceptions are recorded on the span and re-raised"""
+    current = Span(name, attributes)
+    token = _current_span.set(current)
+    otel = _otel_tracer.start_as_current_span(name) if _otel_tracer else nullcontext()
+    start = time.perf_counter()
+    try:
+        with otel as otel_span:
+            try:
+                yield current
+            except BaseException as e:
+                current.set(error=f"{type(e).__name__}: {e}")
+                raise
+            finally:
+                if otel_span is not None:
+                    otel_span.set_attributes(_otel_attributes(current.attributes))
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        span_metrics.observe(current)
+        active = _current_trace.get()
+        if active is not None:
+            active.add(current)
+
+def traced(name=None):
+    """Decorator running a sync or async function inside span(name or the function's name)"""
+    def decorate(func):
+        span_name = name or func.__name__
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def trace():
+    """Collect every span finished inside this block, including those on executor threads"""
+    collected = Trace()
+    token = _current_trace.set(collected)
+    try:
+        yield collected
+    finally:
+        _current_trace.reset(token)
+
+def annotate(**attributes):
+    """Set attributes on the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+def record_error(error):
+    """Mark the current span as failed for an exception that is handled rather than raised"""
+    annotate(error=f"{type(error).__name__}: {error}")
+
+def record_fallback(stage, error=None):
+    """Count a heuristic fallback and tag the current span with it"""
+    span_metrics.count_fallback(stage)
+    annotate(fallback=stage)
+    if error is not None:
+        record_error(error)
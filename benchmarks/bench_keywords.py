@@ -0,0 +1,96 @@
+"""Microbenchmark: per-report cost of the keyword heuristics before and after the shared matcher.
+
+    python benchmarks/bench_keywords.py --reports 2000
+
+"Before" re-implements the original per-function linear scans (including the
+range(50, 1000) stringification); "after" calls the functions in backend.agents,
+which share one scan per description: a single regex built from a trie of the
+keywords, run as an overlapping lookahead (backend/keywords.py).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import agents
+
+WORDS = (
+    "a crowd gathered near the market and the road is blocked with heavy traffic after a bus "
+    "collision injured many people there is smoke from a shop fire and police are trying to "
+    "control the panic near the stadium bridge hospital school 150 people 300 vehicles minor "
+    "small water flooding after rain construction work demolition theft robbery"
+).split()
+
+
+def legacy_heuristics(description):
+    """The original scans, as they ran once per report"""
+    d = description.lower()
+    any(w in d for w in ["march", "protest", "demonstration", "rally", "crowd", "stampede", "blockade", "sit-in", "agitation", "dharna", "strike", "bandh"])
+    any(w in d for w in ["accident", "crash", "collision", "hit", "injury", "fall", "roadblock", "traffic jam", "skid", "wreck", "impact", "pile up", "head on"])
+    any(w in d for w in ["fire", "burn", "smoke", "flame", "explosion", "blaze", "gas", "toxic", "electrocute", "synthesis", "short-circuit", "blast", "cylinder", "burnt alive"])
+    any(w in d for w in ["flood", "water", "rain", "drainage", "waterlog", "standing water", "overflow", "tsunami", "storm", "submersion", "deep"])
+    any(w in d for w in ["construction", "work", "building", "road work", "repair", "infrastructure", "pavement", "digging", "demolition", "destruction"])
+    any(w in d for w in ["theft", "crime", "steal", "assault", "vandal", "illegal", "robbery", "burglary", "attack", "manslaughter", "battery", "phosphorus"])
+    any(w in d for w in ["emergency", "urgent", "critical", "danger", "stampede", "fire", "accident", "injured", "many injured", "crowd surge", "blocked", "panic", "blood", "death", "damage", "burn", "kill"])
+    any(w in d for w in ["minor", "small", "routine", "scheduled", "planned", "normal", "no immediate danger", "not serious", "not urgent", "not critical", "tiny", "inconvient", "miniscule"])
+    any(w in d for w in ["critical", "major", "stampede", "emergency", "hundreds", "thousands", "massive", "severe", "catastrophic", "disaster"])
+    any(w in d for w in ["serious", "significant", "blocked", "crowd", "panic", "dangerous", "explosion", "fire", "injured", "injuries"])
+    any(w in d for w in ["minor", "small", "few", "limited", "not serious", "not critical", "not urgent", "not dangerous"])
+    any(w in d for w in ["turned into", "stampede", "blocked", "many", "crowd", "emergency", "panic", "danger", "critical"])
+    any(w in d for w in ["stadium", "bridge", "hospital", "school", "market", "shopping", "mall", "airport", "public transport"])
+    "100" in d or any(str(i) in d for i in range(50, 1000, 50))
+    for w in ["stadium", "bridge", "road", "market", "shopping", "hospital", "school", "airport", "public transport", "mall"]:
+        w in d
+    any(str(i) in d for i in range(50, 1000)) or "many" in d or "crowd" in d
+    for w in ["stampede", "panic", "blocked", "road", "danger", "critical", "emergency"]:
+        w in d
+    for group in (["injured", "hurt", "ambulance", "medical", "hospital", "unconscious", "bleeding"],
+                  ["blocked", "traffic", "road", "highway", "junction", "signal", "vehicle"],
+                  ["explosion", "gas leak", "chemical", "toxic", "smoke", "burning"],
+                  ["collapse", "building", "infrastructure", "evacuation", "rescue", "trapped"],
+                  ["100", "many", "crowd", "stampede", "mass", "multiple"],
+                  ["chemical", "toxic", "explosion", "terror", "bomb", "terrorist attack", "armed rebellion", "naxal attacks", "riots"],
+                  ["hospital", "school", "stadium", "mall", "airport", "railway station", "public gatherings"]):
+        any(w in d for w in group)
+
+
+def current_heuristics(description):
+    """The same decisions through backend.agents"""
+    parsed = {"description": description, "category": "Others", "location": ""}
+    agents.infer_type_from_description(description, "Others")
+    agents.infer_urgency_from_description(description)
+    agents.infer_severity_from_description(description)
+    agents.should_use_creative_suggestions(parsed, "medium", 3)
+    agents.enhance_suggestions_with_context("", parsed, "others")
+    agents.get_contextual_authorities(description.lower(), "medium", 3)
+    agents.should_use_llm_authority_routing("others", description.lower(), [])
+
+
+def bench(func, descriptions):
+    start = time.perf_counter()
+    for description in descriptions:
+        func(description)
+    return (time.perf_counter() - start) / len(descriptions) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    descriptions = [" ".join(rng.choice(WORDS) for _ in range(args.words)) + f" #{i}" for i in range(args.reports)]
+
+    before = bench(legacy_heuristics, descriptions)
+    agents._scan_lowered.cache_clear()
+    after = bench(current_heuristics, descriptions)
+    print(f"before: {before:8.1f} us/report")
+    print(f"after:  {after:8.1f} us/report  ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: proximity and time filtering for the map view at 1k, 10k and 100k incidents.
+
+    python benchmarks/bench_map_filter.py
+
+"loop" is the original per-incident regex + haversine + fromisoformat pass run
+on every rerun; "frame build" happens once per data fetch and "vectorized" is
+the per-rerun cost afterwards.
+"""
+import math
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+
+from incident_frame import build_incident_frame, filter_incident_frame
+
+KOLKATA = (22.5726, 88.3639)
+
+
+def synthetic_incidents(count, seed=11):
+    rng = random.Random(seed)
+    now = datetime.now()
+    incidents = []
+    for i in range(count):
+        lat = KOLKATA[0] + rng.uniform(-0.6, 0.6)
+        lng = KOLKATA[1] + rng.uniform(-0.6, 0.6)
+        ts = now - timedelta(hours=rng.uniform(0, 96))
+        incidents.append({
+            "id": str(i),
+            "location": f"Near point {i} ({lat:.6f}, {lng:.6f})",
+            "timestamp": ts.isoformat() + "+00:00",
+        })
+    return incidents
+
+
+def loop_filter(incidents, user_coords, max_distance_km=25, max_hours=48):
+    """The original scalar implementation"""
+    result = []
+    for incident in incidents:
+        match = re.search(r'\((-?\d+\.?\d*),\s*(-?\d+\.?\d*)\)', incident.get('location', ''))
+        if not match:
+            continue
+        lat2, lon2 = float(match.group(1)), float(match.group(2))
+        lat1, lon1 = user_coords
+        dlat = math.radians(lat2 - lat1)
+        dlon = math.radians(lon2 - lon1)
+        a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+        distance = 6371.0 * 2 * math.asin(math.sqrt(max(0, min(1, a))))
+        if distance > max_distance_km:
+            continue
+        ts = incident['timestamp'].split('+')[0].split('Z')[0]
+        if (datetime.now() - datetime.fromisoformat(ts)).total_seconds() > max_hours * 3600:
+            continue
+        result.append((incident, round(distance, 2)))
+    result.sort(key=lambda pair: pair[1])
+    return result
+
+
+def timed(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, value
+
+
+def main():
+    print(f"{'incidents':>10} {'loop ms':>10} {'frame build ms':>15} {'vectorized ms':>14} {'speedup':>8}")
+    for count in (1_000, 10_000, 100_000):
+        incidents = synthetic_incidents(count)
+        loop_ms, expected = timed(loop_filter, incidents, KOLKATA)
+        build_ms, frame = timed(build_incident_frame, incidents, repeat=1)
+        vec_ms, (rows, _) = timed(filter_incident_frame, frame, KOLKATA, 25, 48)
+        assert len(rows) == len(expected)
+        print(f"{count:>10} {loop_ms:>10.2f} {build_ms:>15.2f} {vec_ms:>14.2f} {loop_ms / vec_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
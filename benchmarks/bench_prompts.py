@@ -0,0 +1,93 @@
+"""Microbenchmark: per-call cost of building agent prompts and suggestions before and after the prompt registry.
+
+    python benchmarks/bench_prompts.py --calls 20000
+
+"Before" re-creates what backend.agents did on every call: a fresh
+ChatPromptTemplate.from_template(...).format(...) per prompt (only measured when
+langchain is installed) and the category suggestion map rebuilt and joined per
+report. "After" calls backend.prompt_registry, which compiled the templates and
+joined the suggestions once at load. Both sides are checked to produce
+identical text.
+"""
+import argparse
+import json
+import os
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.prompt_registry import PROMPTS_PATH, prompt_registry
+
+INCIDENT_TYPES = ("accident", "fire", "protest / march", "waterlogging", "construction work in progress", "crime", "others", "unknown")
+
+
+def chat_prompt_template():
+    try:
+        from langchain_core.prompts import ChatPromptTemplate
+    except ImportError:
+        try:
+            from langchain.prompts import ChatPromptTemplate
+        except ImportError:
+            return None
+    return ChatPromptTemplate
+
+
+def sample_values(spec):
+    text = "\n".join(spec["template"])
+    return {field: f"sample {field}" for _, field, _, _ in string.Formatter().parse(text) if field}
+
+
+def legacy_suggestions(categories, incident_type):
+    """The original per-call map: fresh lists, then a join of the match"""
+    suggestions_map = {category: list(lines) for category, lines in categories.items()}
+    for category, suggestion_list in suggestions_map.items():
+        if category in incident_type:
+            return " ".join(suggestion_list)
+    return " ".join(suggestions_map["others"])
+
+
+def bench(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def report(name, before, after):
+    if before is None:
+        print(f"{name:<22} before:      n/a (langchain not installed)  after: {after:8.2f} us/call")
+    else:
+        print(f"{name:<22} before: {before:8.2f} us/call  after: {after:8.2f} us/call  ({before / after:.0f}x faster)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    with open(PROMPTS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    ChatPromptTemplate = chat_prompt_template()
+
+    for name, spec in data["prompts"].items():
+        text = "\n".join(spec["template"])
+        values = sample_values(spec)
+        before = None
+        if ChatPromptTemplate is not None:
+            assert ChatPromptTemplate.from_template(text).format(**values) == prompt_registry.render(name, **values)
+            before = bench(lambda i: ChatPromptTemplate.from_template(text).format(**values), args.calls)
+        after = bench(lambda i: prompt_registry.render(name, **values), args.calls)
+        report(name, before, after)
+
+    categories = data["suggestions"]["categories"]
+    for incident_type in INCIDENT_TYPES:
+        assert legacy_suggestions(categories, incident_type) == prompt_registry.category_suggestions(incident_type)
+    before = bench(lambda i: legacy_suggestions(categories, INCIDENT_TYPES[i % len(INCIDENT_TYPES)]), args.calls)
+    after = bench(lambda i: prompt_registry.category_suggestions(INCIDENT_TYPES[i % len(INCIDENT_TYPES)]), args.calls)
+    report("category_suggestions", before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""End-to-end benchmarks for the report pipeline, runnable offline.
+
+    python benchmarks/bench_suite.py run
+    python benchmarks/bench_suite.py run --quick --out before.json
+    python benchmarks/bench_suite.py compare before.json after.json
+
+Everything runs against a throwaway directory: reports go to the SQLite storage
+backend, Gemini is replaced by the stub in stub_llm.py (median latency, jitter,
+error and timeout rates are flags) and reports are synthetic ones around
+Kolkata. The suite measures:
+
+- pipeline: run_pipeline throughput and latency at --concurrency threads
+- submit:   POST /report/ latency against a uvicorn server, plus the time until
+            every queued enrichment has finished
+- list:     GET /reports/ latency for a mix of filters over a store seeded
+            with --seed-reports reports
+- frontend: incident frame build and map filter time as the dataset grows
+
+The gateway, cache and dedup settings are read from the environment as usual
+(LLM_RATE_PER_SEC, LLM_CACHE_SIZE, DEDUP_ENABLED, ...), so the figures reflect
+the configuration being tested. Results are written as JSON, tagged with the
+commit, for comparing runs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from stub_llm import StubLLM, install
+from synthetic import KOLKATA, synthetic_reports, synthetic_documents
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def configure_environment(workdir):
+    """Point every on-disk store at workdir; must run before backend modules are imported"""
+    os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+    os.environ.setdefault("STORAGE_DB", os.path.join(workdir, "reports.db"))
+    os.environ.setdefault("JOB_QUEUE_DB", os.path.join(workdir, "jobs.db"))
+    os.environ.setdefault("MEDIA_ROOT", os.path.join(workdir, "media"))
+    os.environ.setdefault("MEDIA_DB", os.path.join(workdir, "media.db"))
+    os.environ.setdefault("GEMINI_API_KEY", "stub")
+
+
+def stub_from_args(args):
+    return StubLLM(
+        latency_ms=args.llm_latency_ms, jitter=args.llm_jitter,
+        error_rate=args.llm_error_rate, timeout_rate=args.llm_timeout_rate
+    )
+
+
+def summarize(latencies):
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(latencies or [0.0]) * 1000
+    return {
+        "count": len(latencies),
+        "p50": round(float(np.percentile(ms, 50)), 3),
+        "p95": round(float(np.percentile(ms, 95)), 3),
+        "p99": round(float(np.percentile(ms, 99)), 3),
+        "mean": round(float(ms.mean()), 3),
+        "max": round(float(ms.max()), 3)
+    }
+
+
+def run_concurrent(func, items, concurrency):
+    """Call func on every item from `concurrency` threads; returns (latencies, results, errors, wall seconds)"""
+    latencies, results, errors = [], [], []
+    lock = threading.Lock()
+
+    def one(item):
+        start = time.perf_counter()
+        try:
+            result = func(item)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            results.append(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, items))
+    return latencies, results, errors, time.perf_counter() - start
+
+
+# PIPELINE
+
+def bench_pipeline(args):
+    from backend import agents
+    from backend.llm_gateway import llm_gateway
+
+    stub = install(stub_from_args(args))
+    reports = synthetic_reports(args.pipeline_reports, seed=1)
+    latencies, _, errors, wall = run_concurrent(
+        lambda r: agents.run_pipeline(r["category"], r["location"], r["description"]),
+        reports, args.concurrency
+    )
+    return {
+        "reports": len(reports),
+        "concurrency": args.concurrency,
+        "throughput_per_s": round(len(latencies) / wall, 3),
+        "latency_ms": summarize(latencies),
+        "errors": len(errors),
+        "llm": stub.metrics(),
+        "gateway": llm_gateway.metrics()
+    }
+
+
+# API
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args):
+    """Launch `serve` in a subprocess with the stub LLM; returns (process, base url)"""
+    port = free_port()
+    command = [
+        sys.executable, os.path.abspath(__file__), "serve", "--port", str(port),
+        "--llm-latency-ms", str(args.llm_latency_ms), "--llm-jitter", str(args.llm_jitter),
+        "--llm-error-rate", str(args.llm_error_rate), "--llm-timeout-rate", str(args.llm_timeout_rate)
+    ]
+    process = subprocess.Popen(command, cwd=ROOT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            if requests.get(f"{url}/llm/metrics", timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Benchmark server did not start within 60 s")
+
+
+def seed_store(count):
+    from backend.storage import report_repository
+
+    documents = synthetic_documents(count, seed=2)
+    start = time.perf_counter()
+    for offset in range(0, len(documents), 1000):
+        report_repository.put_many(documents[offset:offset + 1000])
+    return {"reports": count, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def bench_submit(url, args):
+    reports = synthetic_reports(args.submit_reports, seed=3)
+
+    def submit(report):
+        # Distinct bytes per report, so the media store writes every upload
+        response = requests.post(
+            f"{url}/report/", data=report,
+            files={"file": ("evidence.bin", os.urandom(args.media_bytes), "application/octet-stream")}, timeout=120
+        )
+        response.raise_for_status()
+        return response.json()
+
+    latencies, results, errors, wall = run_concurrent(submit, reports, args.concurrency)
+    pending = {r["report_id"] for r in results if r.get("enrichment") in ("queued", "clustered")}
+
+    # Time until the enrichment workers have drained everything this phase queued
+    start = time.perf_counter()
+    deadline = start + args.drain_timeout
+    while pending and time.perf_counter() < deadline:
+        for report_id in list(pending):
+            data = requests.get(f"{url}/reports/{report_id}", timeout=30).json()
+            if data.get("enrichment") in ("done", "failed", "deduplicated"):
+                pending.discard(report_id)
+        if pending:
+            time.sleep(0.5)
+    return {
+        "reports": len(reports),
+        "concurrency": args.concurrency,
+        "media_bytes": args.media_bytes,
+        "throughput_per_s": round(len(latencies) / wall, 3),
+        "latency_ms": summarize(latencies),
+        "errors": len(errors),
+        "enrichment_drain_s": round(time.perf_counter() - start, 3),
+        "enrichment_unfinished": len(pending)
+    }
+
+
+def list_queries():
+    """Named GET /reports/ query mixes, as the frontend and API clients issue them"""
+    ist_now = datetime.now(timezone.utc) + timedelta(hours=5, minutes=30)
+    since = (ist_now - timedelta(hours=24)).isoformat()
+    return {
+        "latest": {"limit": 100},
+        "category": {"limit": 100, "category": "Fire"},
+        "last_24h": {"limit": 100, "since": since},
+        "urgency": {"limit": 100, "urgency": "high"},
+        "projection": {"limit": 1000, "fields": "category,timestamp,location,status"}
+    }
+
+
+def bench_list(url, args):
+    queries = list_queries()
+    rng = random.Random(4)
+    plan = [rng.choice(list(queries)) for _ in range(args.list_requests)]
+
+    def fetch(name):
+        response = requests.get(f"{url}/reports/", params=queries[name], timeout=60)
+        response.raise_for_status()
+        return name, response.text.count("\n")
+
+    latencies, results, errors, wall = run_concurrent(fetch, plan, args.concurrency)
+    by_query = {}
+    for (name, _), latency in zip(results, latencies):
+        by_query.setdefault(name, []).append(latency)
+    return {
+        "requests": len(plan),
+        "concurrency": args.concurrency,
+        "throughput_per_s": round(len(latencies) / wall, 3),
+        "latency_ms": summarize(latencies),
+        "by_query": {name: summarize(samples) for name, samples in sorted(by_query.items())},
+        "errors": len(errors)
+    }
+
+
+# FRONTEND
+
+def bench_frontend(args):
+    from incident_frame import build_incident_frame, filter_incident_frame
+
+    rows = []
+    for size in args.frontend_sizes:
+        incidents = []
+        for report_id, data in synthetic_documents(size, seed=5):
+            data["id"] = report_id
+            incidents.append(data)
+        builds, filters = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            frame = build_incident_frame(incidents)
+            builds.append(time.perf_counter() - start)
+        for _ in range(args.repeats * 10):
+            start = time.perf_counter()
+            filter_incident_frame(frame, KOLKATA, 20, 48)
+            filters.append(time.perf_counter() - start)
+        rows.append({"incidents": size, "frame_build_ms": summarize(builds), "filter_ms": summarize(filters)})
+    return rows
+
+
+# RUN / COMPARE
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "") if commit else None
+    except OSError:
+        return None
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="suraksha-bench-")
+    configure_environment(workdir)
+    suites = set(args.only.split(",")) if args.only else {"pipeline", "submit", "list", "frontend"}
+    results = {}
+    try:
+        if "pipeline" in suites:
+            print("⏱ pipeline")
+            results["pipeline"] = bench_pipeline(args)
+        if suites & {"submit", "list"}:
+            print(f"⏱ seeding {args.seed_reports} reports")
+            results["seed"] = seed_store(args.seed_reports)
+            process, url = start_server(args)
+            try:
+                if "list" in suites:
+                    print("⏱ list")
+                    results["list"] = bench_list(url, args)
+                if "submit" in suites:
+                    print("⏱ submit")
+                    results["submit"] = bench_submit(url, args)
+                results["server_metrics"] = requests.get(f"{url}/llm/metrics", timeout=10).json()
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        if "frontend" in suites:
+            print("⏱ frontend")
+            results["frontend"] = bench_frontend(args)
+    finally:
+        if args.keep:
+            print(f"Kept benchmark data in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "func"},
+        "results": results
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_summary(results)
+    print(f"✅ Results written to {out}")
+
+
+def print_summary(results):
+    for name in ("pipeline", "submit", "list"):
+        if name in results:
+            r = results[name]
+            lat = r["latency_ms"]
+            print(f"{name:<9} {r['throughput_per_s']:>9.1f}/s  p50 {lat['p50']:>9.2f} ms  p95 {lat['p95']:>9.2f} ms  p99 {lat['p99']:>9.2f} ms  errors {r['errors']}")
+    for row in results.get("frontend", []):
+        print(f"frontend  {row['incidents']:>9} incidents  build p50 {row['frame_build_ms']['p50']:>9.2f} ms  filter p50 {row['filter_ms']['p50']:>7.2f} ms")
+
+
+def flatten(value, prefix=""):
+    """Numeric leaves of a results tree as {dotted.path: number}; frontend rows keyed by size"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = ((str(v.get("incidents", i)) if isinstance(v, dict) else str(i), v) for i, v in enumerate(value))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    else:
+        return {}
+    flat = {}
+    for key, child in items:
+        flat.update(flatten(child, f"{prefix}.{key}" if prefix else key))
+    return flat
+
+
+def compare(args):
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+    old, new = flatten(before["results"]), flatten(after["results"])
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    for key in sorted(old.keys() & new.keys()):
+        if args.filter and args.filter not in key:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else float("nan")
+        print(f"{key:<60} {old[key]:>12.3f} {new[key]:>12.3f} {change:>+8.1f}%")
+
+
+def serve(args):
+    """Run the backend with the stub LLM (started by `run` in a subprocess)"""
+    import uvicorn
+
+    install(stub_from_args(args))
+    from backend.main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="Median stub LLM latency")
+    parser.add_argument("--llm-jitter", type=float, default=0.5, help="Sigma of the log-normal latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--llm-timeout-rate", type=float, default=0.0, help="Share of calls that hang for 30 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks for the report pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="Run the suite and write JSON results")
+    add_stub_arguments(run_cmd)
+    run_cmd.add_argument("--only", help="Comma-separated subset of pipeline,submit,list,frontend")
+    run_cmd.add_argument("--quick", action="store_true", help="Small sizes for a smoke run")
+    run_cmd.add_argument("--concurrency", type=int, default=16)
+    run_cmd.add_argument("--pipeline-reports", type=int, default=200)
+    run_cmd.add_argument("--seed-reports", type=int, default=10_000)
+    run_cmd.add_argument("--submit-reports", type=int, default=200)
+    run_cmd.add_argument("--list-requests", type=int, default=500)
+    run_cmd.add_argument("--media-bytes", type=int, default=64 * 1024)
+    run_cmd.add_argument("--drain-timeout", type=float, default=300)
+    run_cmd.add_argument("--frontend-sizes", type=lambda s: [int(n) for n in s.split(",")], default=[1_000, 10_000, 100_000])
+    run_cmd.add_argument("--repeats", type=int, default=5)
+    run_cmd.add_argument("--out", help=f"Results file (default: {os.path.relpath(RESULTS_DIR, ROOT)}/<time>-<commit>.json)")
+    run_cmd.add_argument("--keep", action="store_true", help="Keep the temporary stores")
+    run_cmd.set_defaults(func=run)
+
+    serve_cmd = sub.add_parser("serve", help=argparse.SUPPRESS)
+    add_stub_arguments(serve_cmd)
+    serve_cmd.add_argument("--port", type=int, required=True)
+    serve_cmd.set_defaults(func=serve)
+
+    compare_cmd = sub.add_parser("compare", help="Show the change in every figure between two result files")
+    compare_cmd.add_argument("before")
+    compare_cmd.add_argument("after")
+    compare_cmd.add_argument("--filter", help="Only keys containing this text, e.g. p95")
+    compare_cmd.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    if getattr(args, "quick", False):
+        args.pipeline_reports, args.seed_reports, args.submit_reports = 40, 1_000, 40
+        args.list_requests, args.frontend_sizes, args.repeats = 100, [1_000, 10_000], 3
+        args.llm_latency_ms = min(args.llm_latency_ms, 100)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Load test: GET /reports/ latency while report enrichment keeps the LLM busy.
+
+    python benchmarks/load_reports.py --reads 200 --writers 8 --llm-latency-ms 1500
+
+Starts the backend in a subprocess on a throwaway SQLite store, with Gemini
+replaced by the stub in stub_llm.py at the given latency (the same server
+bench_suite.py uses). Pass --url to target a server you started yourself.
+
+The first phase measures GET /reports/ alone. The second repeats it while
+``--writers`` clients keep POSTing distinct synthetic reports (different
+descriptions and locations, so neither the LLM cache nor dedup folds them
+away). POST /report/ returns once the job is queued; the enrichment workers
+then run classification, suggestions and routing against the slow stub. With
+the LLM calls on their own executor, the loaded read figures should stay close
+to the baseline while the gateway reports calls in flight.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_suite import add_stub_arguments, configure_environment, seed_store, start_server, summarize
+from synthetic import synthetic_report
+
+
+def read_phase(url, reads, concurrency):
+    """Issue `reads` GET /reports/ calls; returns (requests per second, latency summary)"""
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        requests.get(f"{url}/reports/", params={"limit": 100}, timeout=120).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(reads)))
+    return reads / (time.perf_counter() - start), summarize(latencies)
+
+
+def writer(url, stop, seed, submitted):
+    """Keep submitting distinct reports until `stop` is set"""
+    rng = random.Random(seed)
+    index = 0
+    while not stop.is_set():
+        report = synthetic_report(rng, f"{seed}-{index}")
+        index += 1
+        response = requests.post(
+            f"{url}/report/", data=report,
+            files=[("file", ("load.txt", os.urandom(256), "text/plain"))], timeout=300
+        )
+        if response.ok:
+            submitted.append(response.json().get("report_id"))
+
+
+def gateway_metrics(url):
+    return requests.get(f"{url}/llm/metrics", timeout=30).json()["gateway"]
+
+
+def print_reads(label, rate, latency):
+    print(f"{label:<34} {rate:8.1f} req/s  p50 {latency['p50']:8.2f} ms  p95 {latency['p95']:8.2f} ms")
+
+
+def load_test(url, args):
+    baseline, baseline_latency = read_phase(url, args.reads, args.concurrency)
+    print_reads("GET /reports/ alone:", baseline, baseline_latency)
+
+    stop = threading.Event()
+    submitted = []
+    threads = [
+        threading.Thread(target=writer, args=(url, stop, seed, submitted), daemon=True)
+        for seed in range(args.writers)
+    ]
+    for t in threads:
+        t.start()
+    # Let the queue fill so the workers are inside LLM calls before reads start
+    time.sleep(args.warmup)
+    during = gateway_metrics(url)
+    loaded, loaded_latency = read_phase(url, args.reads, args.concurrency)
+    after = gateway_metrics(url)
+    stop.set()
+    for t in threads:
+        t.join(timeout=60)
+
+    print_reads(f"GET /reports/ with {args.writers} writers:", loaded, loaded_latency)
+    print(f"{'':<34} {loaded / baseline:.0%} of baseline throughput")
+    print(f"Reports submitted: {len(submitted)}")
+    print(
+        f"LLM calls during reads: {after['calls'] - during['calls']}  "
+        f"in flight: {during['in_flight']} -> {after['in_flight']} (limit {after['concurrency_limit']})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_stub_arguments(parser)
+    parser.add_argument("--url", help="Existing backend to load instead of starting one")
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seed-reports", type=int, default=2_000)
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of writes before the loaded read phase")
+    args = parser.parse_args()
+
+    if args.url:
+        load_test(args.url, args)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="suraksha-load-")
+    configure_environment(workdir)
+    try:
+        seed_store(args.seed_reports)
+        process, url = start_server(args)
+        try:
+            load_test(url, args)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
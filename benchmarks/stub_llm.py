@@ -0,0 +1,113 @@
+"""Stand-in for the Gemini model used by backend.agents, for offline benchmarks.
+
+Answers every prompt the agents send in the format they parse, after a
+log-normally distributed delay, and fails a configurable share of calls:
+
+    from stub_llm import StubLLM, install
+    install(StubLLM(latency_ms=800, error_rate=0.02))
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+
+TYPES = ("Accident", "Crime", "Waterlogging", "Construction Work in Progress", "Fire", "Protest / March", "Others")
+URGENCIES = ("low", "medium", "high")
+AUTHORITIES = (
+    "Police Department", "Department of Fire and Emergency Services", "Department of Traffic Police",
+    "Department of Disaster Relief", "Department of Medical Emergency"
+)
+
+_incidents = re.compile(r"Incidents \(JSON\):\s*(\[.*?\])\s*\n\s*Respond", re.S)
+_description = re.compile(r"Description: (.*)")
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubLLM:
+    """generate_content() with a latency distribution and an error rate.
+
+    ``latency_ms`` is the median delay and ``jitter`` the sigma of the log-normal
+    around it; ``error_rate`` of calls raise, and ``timeout_rate`` of calls hang
+    for ``timeout_ms`` first (so the gateway deadline and stage timeouts fire).
+    """
+
+    def __init__(self, latency_ms=800, jitter=0.5, error_rate=0.0, timeout_rate=0.0, timeout_ms=30000, seed=7):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_ms = timeout_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            delay = self.latency_ms * math.exp(self._rng.gauss(0, self.jitter)) if self.jitter else self.latency_ms
+        if roll < self.timeout_rate:
+            return self.timeout_ms / 1000, False
+        return delay / 1000, roll < self.timeout_rate + self.error_rate
+
+    def generate_content(self, prompt, generation_config=None):
+        delay, fail = self._draw()
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.errors += 1
+            raise RuntimeError("stub LLM error")
+        return StubResponse(answer(prompt))
+
+    def metrics(self):
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors}
+
+
+def _pick(options, text):
+    return options[zlib.crc32(text.encode("utf-8")) % len(options)]
+
+
+def classify(description):
+    """The stub's type/urgency/severity for a description"""
+    return {
+        "type": _pick(TYPES, description),
+        "urgency": _pick(URGENCIES, description[::-1]),
+        "severity": 1 + zlib.crc32(description.encode("utf-8")) % 5
+    }
+
+
+def answer(prompt):
+    """A well-formed reply for each kind of prompt in backend.agents, chosen deterministically"""
+    batch = _incidents.search(prompt)
+    if batch:
+        incidents = json.loads(batch.group(1))
+        return json.dumps([{"id": item["id"], **classify(item["description"])} for item in incidents])
+    match = _description.search(prompt)
+    description = match.group(1) if match else prompt
+    if "EXACT format" in prompt:
+        c = classify(description)
+        return f"Type: {c['type']}\nUrgency: {c['urgency']}\nSeverity: {c['severity']}"
+    if "emergency response coordinator" in prompt:
+        first = AUTHORITIES.index(_pick(AUTHORITIES, description))
+        return ", ".join(AUTHORITIES[first:first + 2] or AUTHORITIES[:2])
+    return (
+        "Keep a safe distance from the affected area. Follow instructions from officials on site. "
+        "Use alternate routes and inform neighbours. Call the emergency helpline if anyone is hurt."
+    )
+
+
+def install(stub):
+    """Route backend.agents' model calls to the stub; returns the stub"""
+    import backend.agents
+
+    backend.agents.llm = stub
+    return stub
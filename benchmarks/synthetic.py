@@ -0,0 +1,108 @@
+"""Synthetic incident reports around Kolkata for benchmarks.
+
+Reports look like the ones the Streamlit form submits: a category from the
+form's list, a location ending in "(lat, lng)" and a free-text description.
+"""
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+KOLKATA = (22.5726, 88.3639)
+CATEGORIES = ["Accident", "Fire", "Protest / March", "Construction Work in Progress", "Theft", "Crime", "Waterlogging", "Others"]
+PLACES = [
+    "Park Street", "Esplanade", "Howrah Bridge", "Salt Lake Sector V", "Gariahat", "New Market",
+    "Sealdah Station", "Shyambazar", "Behala", "Dum Dum", "Ballygunge", "Tollygunge", "EM Bypass", "Rajarhat"
+]
+DESCRIPTIONS = {
+    "Accident": [
+        "Two cars collided near {place}, {count} people injured and traffic is blocked",
+        "A bike skidded on the wet road at {place}, rider hurt and lying on the road",
+        "Bus hit a pedestrian crossing at {place}, ambulance needed urgently"
+    ],
+    "Fire": [
+        "Fire broke out in a shop at {place}, thick smoke spreading to nearby buildings",
+        "Gas cylinder blast in a restaurant kitchen at {place}, {count} people trapped",
+        "Small fire in a garbage dump near {place}, smoke but no one hurt"
+    ],
+    "Protest / March": [
+        "Large rally of around {count}00 people at {place}, roads blocked",
+        "Protest march moving from {place}, heavy crowd and slow traffic",
+        "Dharna outside the municipal office at {place}, peaceful so far"
+    ],
+    "Construction Work in Progress": [
+        "Road digging at {place} has left a deep open trench without barricades",
+        "Metro construction near {place} narrowing the road to one lane",
+        "Scaffolding at a building site in {place} looks unstable"
+    ],
+    "Theft": [
+        "Phone snatched from a commuter at {place} by two men on a scooter",
+        "Shop burglary reported overnight at {place}, shutter broken",
+        "Pickpockets active in the crowd at {place}"
+    ],
+    "Crime": [
+        "Fight between two groups at {place}, {count} people hurt",
+        "Suspicious man harassing passers-by near {place}",
+        "Vandalism of parked cars reported at {place}"
+    ],
+    "Waterlogging": [
+        "Knee-deep water at {place} after the rain, cars stalled",
+        "Drain overflow at {place}, standing water on the main road",
+        "Heavy waterlogging near {place}, buses not running"
+    ],
+    "Others": [
+        "Streetlights not working along {place} for {count} days",
+        "Stray dogs chasing people near {place}",
+        "Fallen tree branch partly blocking the footpath at {place}"
+    ]
+}
+
+
+def random_point(rng, center=KOLKATA, radius_km=25):
+    """A uniformly distributed point within radius_km of center"""
+    distance = radius_km * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    lat = center[0] + distance / 111.32 * math.cos(bearing)
+    lng = center[1] + distance / (111.32 * math.cos(math.radians(center[0]))) * math.sin(bearing)
+    return lat, lng
+
+
+def synthetic_report(rng, index=0):
+    """Form fields for one report: category, location and description"""
+    category = rng.choice(CATEGORIES)
+    place = rng.choice(PLACES)
+    lat, lng = random_point(rng)
+    description = rng.choice(DESCRIPTIONS[category]).format(place=place, count=rng.randint(2, 9))
+    # The suffix keeps descriptions distinct, so the LLM cache and dedup see realistic traffic
+    return {
+        "category": category,
+        "location": f"{place}, Kolkata ({lat:.6f}, {lng:.6f})",
+        "description": f"{description} (ref {index})"
+    }
+
+
+def synthetic_reports(count, seed=11):
+    rng = random.Random(seed)
+    return [synthetic_report(rng, i) for i in range(count)]
+
+
+def synthetic_documents(count, seed=11, hours=96):
+    """(report_id, document) pairs as the backend stores them once enriched, spread over the last `hours`"""
+    from backend.classification import Classification
+    from backend.router import build_report_data
+    from stub_llm import classify
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc) + timedelta(hours=5, minutes=30)
+    documents = []
+    for i, report in enumerate(synthetic_reports(count, seed)):
+        submitted = now - timedelta(hours=rng.uniform(0, hours))
+        parsed = {**report, "submitted_at": submitted.isoformat()}
+        report_id = f"bench-{i:07d}"
+        data = build_report_data(report_id, parsed, [])
+        data.update(Classification(**classify(report["description"])).as_fields())
+        data["enrichment"] = "done"
+        data["status"] = rng.choice(["Pending", "Pending", "Resolved"])
+        data["cluster_id"] = report_id
+        data["report_count"] = 1
+        documents.append((report_id, data))
+    return documents
@@ -6,17 +6,31 @@ import pandas as pd
 from io import StringIO
 from streamlit_geolocation import streamlit_geolocation
 import requests
+import io
+from urllib3 import encode_multipart_formdata
 import re
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
-import math
 import json
+import sys
 import time
+# The repository root, for the incident styling shared with the backend's map tiles
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.incident_style import get_incident_icon, incident_classification_info
+from incident_frame import filter_incident_frame, is_cluster_primary
+from incident_store import IncidentStore, FirestoreReports, BackendReports
+from map_layers import build_incident_layer, find_clicked_cluster, map_layer_css
 
 
 # adding deployed backend url 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
+# Must match the backend: "firestore" reads Firestore directly, anything else reads through the backend API
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore").lower()
+# Share of the submit progress bar given to the upload; the AI stages fill the rest
+UPLOAD_PROGRESS_SHARE = 40
+# User locations are rounded to this many decimals (~1 km) when deciding to rebuild the map
+MAP_LOCATION_DECIMALS = 2
 
 # Initialize Streamlit app
 st.set_page_config(page_title="🛡️ Suraksha Setu - Community Safety Reporting System",layout='wide', initial_sidebar_state='expanded')
@@ -35,9 +49,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
  # Clear any previous content
 st.markdown("<h1 style='text-align: center;'>🛡️ Suraksha Setu - Community Safety Reporting System</h1>", unsafe_allow_html=True)
-# Initialize Firebase (only if not already initialized)
+# Initialize Firebase (only if not already initialized, and only when reports live in Firestore)
 
-if not firebase_admin._apps:
+if STORAGE_BACKEND == "firestore" and not firebase_admin._apps:
     try:
         firebase_creds = os.getenv("FIREBASE_CREDENTIALS")
 
@@ -71,23 +85,20 @@ if not firebase_admin._apps:
         st.error(f"❌ Firebase initialization error: {e}")
         st.stop()
 
-# Initialize Firestore client
-db = firestore.client()
-
-@st.cache_data(ttl=30)  # Cache for 30 seconds to improve performance
-def fetch_incidents_from_firebase():
-    """Fetch all incidents directly from Firebase Firestore"""
-    try:
-        docs = db.collection("incident_reports").stream()
-        incidents = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            incidents.append(data)
-        return incidents
-    except Exception as e:
-        st.error(f"Error fetching incidents from Firebase: {e}")
-        return []
+@st.cache_resource  # One store per server process, shared by every session
+def get_incident_store():
+    """Start the shared incident store: a Firestore listener, or polling the backend API for other stores"""
+    if STORAGE_BACKEND == "firestore":
+        return IncidentStore(FirestoreReports(firestore.client())).start()
+    return IncidentStore(BackendReports(BACKEND_URL)).start()
+
+def load_incidents():
+    """Current incidents and their columnar frame from the shared store"""
+    store = get_incident_store()
+    store.refresh()
+    if store.error:
+        st.error(f"Error syncing incidents: {store.error}")
+    return store.incidents_and_frame()
 
 def extract_coordinates_from_location(location_text):
     """Extract latitude and longitude from location text"""
@@ -102,153 +113,179 @@ def extract_coordinates_from_location(location_text):
         pass
     return None
 
-def calculate_distance(coord1, coord2):
-    """
-    Calculate the distance between two coordinates using Haversine formula
-    Returns distance in kilometers
-    """
-    # Unpack coordinates
-    lat1, lon1 = coord1
-    lat2, lon2 = coord2
-
-    # Radius of Earth in km
-    R = 6371.0
-
-    # Convert degrees to radians
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-
-    lat1 = math.radians(lat1)
-    lat2 = math.radians(lat2)
-
-    # Haversine formula
-    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-    a = max(0, min(1, a))  # Clamp a to [0, 1]
-    c = 2 * math.asin(math.sqrt(a))
-
-    distance = R * c
-    return distance
-
-
-def is_within_time_limit(timestamp_str, hours_limit=48):
+def filter_incidents_by_proximity_and_time(incidents, frame, user_coords, max_distance_km=20, max_hours=48):
     """
-    Check if the incident timestamp is within the specified hours limit
-    """
-    try:
-        # Parse the timestamp
-        if isinstance(timestamp_str, str):
-            # Handle ISO format with timezone
-            if 'T' in timestamp_str:
-                # Remove timezone info for parsing if present
-                clean_timestamp = timestamp_str.split('+')[0].split('Z')[0]
-                incident_time = datetime.fromisoformat(clean_timestamp)
-            else:
-                incident_time = datetime.fromisoformat(timestamp_str)
-        else:
-            return False
-        
-        # Calculate time difference
-        current_time = datetime.now()
-        time_diff = current_time - incident_time
-        
-        # Check if within the time limit
-        return time_diff.total_seconds() <= (hours_limit * 3600)
-    
-    except Exception as e:
-        # If we can't parse the timestamp, assume it's old
-        return False
-
-def filter_incidents_by_proximity_and_time(incidents, user_coords, max_distance_km=20, max_hours=48):
-    """
-    Filter incidents based on proximity to user location and time since reported
+    Filter incidents based on proximity to user location and time since reported,
+    nearest first, using one vectorized pass over the incident frame
     """
     if not user_coords:
-        return incidents  # Return all incidents if no user location
+        return [i for i in incidents if is_cluster_primary(i)]  # Return all incidents if no user location
     
-    filtered_incidents = []
+    rows, distances = filter_incident_frame(frame, user_coords, max_distance_km, max_hours)
     
-    for incident in incidents:
-        # Check coordinates
-        incident_coords = extract_coordinates_from_location(incident.get('location', ''))
-        if not incident_coords:
-            continue
-        
-        # Check distance
-        distance = calculate_distance(user_coords, incident_coords)
-        if distance > max_distance_km:
-            continue
-        
-        # Check time
-        timestamp = incident.get('timestamp', '')
-        if not is_within_time_limit(timestamp, max_hours):
-            continue
-        
+    filtered_incidents = []
+    for row, distance in zip(rows.tolist(), distances.tolist()):
+        # Copy: the incident dicts are shared with every other session
+        incident = dict(incidents[row])
         # Add distance info to incident for display
         incident['distance_km'] = round(distance, 2)
         filtered_incidents.append(incident)
     
     return filtered_incidents
 
-def get_incident_color(category):
-    """Return color based on incident category"""
-    color_map = {
-        "Accident": "red",
-        "Fire": "orange", 
-        "Protest / March": "beige",
-        "Construction Work in Progress": "yellow",
-        "Theft": "purple",
-        "Crime": "red",
-        "Waterlogging": "blue",
-        "Others": "gray"
-    }
-    return color_map.get(category, "gray")
-
-def get_incident_icon(category):
-    """Return icon based on incident category"""
-    icon_map = {
-        "Accident": "🚗",
-        "Fire": "🔥",
-        "Protest / March": "👥",
-        "Construction Work in Progress": "🚧",
-        "Theft": "🥷",
-        "Crime": "🦹",
-        "Waterlogging": "🌊",
-        "Others": "‼"
-    }
-    return icon_map.get(category, "‼")
-
-def get_urgency_color(classification_text):
-    """Extract urgency level and return appropriate color intensity"""
-    if not classification_text:
-        return 0.5
+def build_map(map_center, user_coords, incidents, coords, zoom):
+    """Base map with the user's location plus the clustered incident layer and its clusters"""
+    # Base map: only the user's location, so it stays identical across reruns
+    m = folium.Map(location=map_center, zoom_start=15 if user_coords else 12)
+    m.get_root().header.add_child(map_layer_css())
+    
+    # Add user's current location marker if available
+    if user_coords:
+        folium.Marker(
+            user_coords,
+            popup=folium.Popup("📍 Your Current Location", max_width=400),
+            tooltip="Your Location",
+            icon=folium.Icon(color="pink", icon="user", prefix='fa')
+        ).add_to(m)
+        
+        # Add a circle to show the 25 km radius
+        folium.Circle(
+            user_coords,
+            radius=25000,  # 25km in meters
+            popup="25 km radius filter",
+            color="blue",
+            fillColor="cadetblue",
+            fillOpacity=0.1,
+            weight=2,
+            dashArray="5, 5"
+        ).add_to(m)
+
+    incident_layer, incident_clusters = build_incident_layer(incidents, coords, zoom)
+    return m, incident_layer, incident_clusters
+
+def show_incident_details(incident, container=None, heading=True):
+    """Full details of one incident, shown in the sidebar when its marker is clicked"""
+    container = container or st.sidebar
+    if heading:
+        container.markdown("### 📋 Selected Incident Details")
+    container.markdown(f"🏷 Category:** {incident.get('category', 'Unknown')}")
+    container.markdown(f"⏰ Reported:** {format_time_ago(incident.get('timestamp', ''))}")
+    if incident.get('report_count', 1) > 1:
+        container.markdown(f"👥 Reports:** {incident['report_count']} people reported this")
+    container.markdown(f"📏 Distance:** {incident.get('distance_km', 0)}km away")
+    container.markdown(f"📅 Time:** {incident.get('timestamp', 'Unknown')}")
+    container.markdown(f"📍 Location:** {incident.get('location', 'Unknown')}")
+    container.markdown(f"📝 Description:** {incident.get('description', 'No description')}")
+    # Older reports stored bare upload paths; newer ones carry media store URLs
+    thumbnails = [
+        f"{BACKEND_URL}{entry['thumbnail_url']}" for entry in incident.get('media_files', [])
+        if isinstance(entry, dict) and entry.get('thumbnail_url')
+    ]
+    if thumbnails:
+        container.image(thumbnails, width=120)
+    
+    class_info = incident_classification_info(incident)
+    if incident.get('classification'):
+        container.markdown("🤖 AI Analysis:")
+        container.markdown(f"🏷 Classification:** {class_info['type']}")
+        container.markdown(f"⚡ Urgency:** {class_info['urgency']} | 📊 Severity:** {class_info['severity']}/5")
     
-    classification_lower = classification_text.lower()
-    if "urgency: high" in classification_lower:
-        return 1.0
-    elif "urgency: medium" in classification_lower:
-        return 0.7
-    elif "urgency: low" in classification_lower:
-        return 0.4
-    return 0.5
-
-def parse_classification_info(classification_text):
-    """Parse classification text to extract type, urgency, and severity"""
-    if not classification_text:
-        return {"type": "Unknown", "urgency": "Medium", "severity": "3"}
+    routing = incident.get('routing', '')
+    if routing:
+        container.markdown(f"🎯 Routing:** {routing}")
     
-    info = {"type": "Unknown", "urgency": "Medium", "severity": "3"}
-    lines = classification_text.split('\n')
+    authority_routing = incident.get('authority_routing_agent') or incident.get('authority_routing', '')
+    if authority_routing and authority_routing != "No authority routing required":
+        container.markdown(f"🏛 Authorities Notified:** {authority_routing}")
     
-    for line in lines:
-        line = line.strip()
-        if line.startswith("Type:"):
-            info["type"] = line.replace("Type:", "").strip()
-        elif line.startswith("Urgency:"):
-            info["urgency"] = line.replace("Urgency:", "").strip().title()
-        elif line.startswith("Severity:"):
-            info["severity"] = line.replace("Severity:", "").strip()
+    suggestions = incident.get('suggestions', '')
+    if suggestions:
+        container.markdown("💡 AI Safety Suggestions:")
+        container.write(suggestions[:300] + "..." if len(suggestions) > 300 else suggestions)
     
-    return info
+    status = incident.get('status', 'Pending')
+    container.markdown(f"📈 Status:** {status}")
+
+class UploadProgress:
+    """Request body that reports (bytes_sent, total) as requests streams it to the backend"""
+
+    def __init__(self, body, on_progress):
+        self._body = io.BytesIO(body)
+        self._total = len(body)
+        self._on_progress = on_progress
+        self._last_percent = -1
+
+    def __len__(self):
+        return self._total
+
+    def read(self, size=-1):
+        chunk = self._body.read(size)
+        sent = self._body.tell()
+        percent = sent * 100 // max(self._total, 1)
+        # Only redraw when the whole percentage moves; reads come in 8 KB blocks
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self._on_progress(sent, self._total)
+        return chunk
+
+STAGE_LABELS = {
+    "classification": "🏷 Classified",
+    "routing": "🎯 Routed",
+    "authority_routing": "🏛 Authorities chosen",
+    "suggestions": "💡 Safety suggestions ready"
+}
+
+def show_enrichment_progress(prg, progress):
+    """Advance the submit progress bar from a backend "progress" event"""
+    stages = progress.get("stages", [])
+    total = max(progress.get("total", 1), 1)
+    value = UPLOAD_PROGRESS_SHARE + int((100 - UPLOAD_PROGRESS_SHARE) * len(stages) / total)
+    if stages:
+        text = f"🤖 {STAGE_LABELS.get(stages[-1], stages[-1])} ({len(stages)}/{total})"
+    elif progress.get("job") == "running":
+        text = "🤖 Running AI analysis..."
+    else:
+        text = "🤖 Waiting for an AI worker..."
+    prg.progress(min(value, 99), text=text)
+
+def follow_enrichment(report_id, on_progress, timeout=120):
+    """Follow the report's server-sent events until it is enriched; returns the report or None"""
+    deadline = time.time() + timeout
+    try:
+        # The backend sends a keep-alive at least every 5 s, so a longer silence means the stream is stuck
+        with requests.get(f"{BACKEND_URL}/reports/{report_id}/events", stream=True, timeout=(10, 15)) as response:
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "progress":
+                        on_progress(data)
+                    elif event == "enrichment":
+                        return data
+                    else:
+                        return None
+                if time.time() >= deadline:
+                    return None
+    except Exception:
+        # Event stream unavailable (e.g. a proxy buffering it): fall back to polling
+        pass
+    # The stream failed or closed early: poll for whatever is left of the same deadline
+    return wait_for_enrichment(report_id, deadline - time.time())
+
+def wait_for_enrichment(report_id, timeout=60):
+    """Poll the backend until the report's AI enrichment has finished; returns the report or None"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            report = requests.get(f"{BACKEND_URL}/reports/{report_id}", timeout=10).json()
+            if report.get("enrichment") in ("done", "failed", "deduplicated"):
+                return report
+        except Exception:
+            pass
+        time.sleep(1)
+    return None
 
 def format_time_ago(timestamp_str):
     """Format timestamp to show how long ago the incident was reported"""
@@ -364,7 +401,7 @@ with right_col:
     
     # Fetch incidents from Firebase
     with st.spinner("🔄 Loading incident data from database..."):
-        all_incidents = fetch_incidents_from_firebase()
+        all_incidents, incident_frame = load_incidents()
     
     location_data = streamlit_geolocation()
 
@@ -386,117 +423,51 @@ with right_col:
     # Filter incidents based on proximity and time
     if user_coords:
         filtered_incidents = filter_incidents_by_proximity_and_time(
-            all_incidents, user_coords, max_distance_km=25, max_hours=48
+            all_incidents, incident_frame, user_coords, max_distance_km=25, max_hours=48
         )
         
     else:
-        filtered_incidents = all_incidents
+        filtered_incidents = filter_incidents_by_proximity_and_time(all_incidents, incident_frame, None)
         st.info("📍 Enable location access to see filtered nearby incidents (within 25 km, last 48 hours)")
 
     st.header(f"🗺 Live Incident Map ({len(filtered_incidents)} Recent Nearby Incidents)")
     
-    # Add legend and statistics
-    m = folium.Map(location=map_center, zoom_start=15 if user_coords else 12)
-    
-    # Add user's current location marker if available
-    m = folium.Map(location=map_center, zoom_start=15 if user_coords else 12)
-        
-        # Add user's current location marker if available
-    if user_coords:
-            folium.Marker(
-                user_coords,
-                popup=folium.Popup("📍 Your Current Location", max_width=400),
-                tooltip="Your Location",
-                icon=folium.Icon(color="pink", icon="user", prefix='fa')
-            ).add_to(m)
-            
-            # Add a circle to show the 15 km radius
-            folium.Circle(
-                user_coords,
-                radius=25000,  # 15km in meters
-                popup="25 km radius filter",
-                color="blue",
-                fillColor="cadetblue",
-                fillOpacity=0.1,
-                weight=2,
-                dashArray="5, 5"
-            ).add_to(m)
-
-    # Add filtered incident markers
-    incident_count = 0
-
-    if filtered_incidents:
-            for incident in filtered_incidents:
-                coords = extract_coordinates_from_location(incident.get('location', ''))
-                if coords:
-                    incident_count += 1
-                    category = incident.get('category', 'Others')
-                    description = incident.get('description', 'No description')
-                    timestamp = incident.get('timestamp', 'Unknown time')
-                    classification = incident.get('classification', '')
-                    routing = incident.get('routing', '')
-                    suggestions = incident.get('suggestions', '')
-                    status = incident.get('status', 'Pending')
-                    distance = incident.get('distance_km', 0)
-                    time_ago = format_time_ago(timestamp)
-                    
-                    # Parse classification info
-                    class_info = parse_classification_info(classification)
-                    
-                    # Create detailed popup content with distance and time info
-                    popup_content = f"""
-                    <div style="width: 300px; max-height: 450px; overflow-y: auto;">
-                        <h4 style="color: {get_incident_color(category)}; margin-bottom: 10px;">
-                            {category} 
-                            <span style="background-color: {'#ff4444' if class_info['urgency'] == 'High' else '#ffa500' if class_info['urgency'] == 'Medium' else '#90EE90'}; 
-                                         color: white; padding: 2px 6px; border-radius: 3px; font-size: 10px;">
-                                {class_info['urgency'].upper()}
-                            </span>
-                        </h4>
-                        <p><b>⏰ Reported:</b> {time_ago}</p>
-                        <p><b>📏 Distance:</b> {distance}km away</p>
-                        <p><b>📅 Time:</b> {timestamp[:19] if len(timestamp) > 19 else timestamp}</p>
-                        <p><b>📍 Location:</b> {coords[0]:.4f}, {coords[1]:.4f}</p>
-                        <p><b>📝 Description:</b> {description[:150]}{'...' if len(description) > 150 else ''}</p>
-                        <p><b>🏷 Classification:</b> {class_info['type']}</p>
-                        <p><b>⚡ Urgency:</b> {class_info['urgency']} | <b>📊 Severity:</b> {class_info['severity']}/5</p>
-                        <p><b>📈 Status:</b> <span style="color: {'green' if status == 'Resolved' else 'orange'};">{status}</span></p>
-                        {f'<p><b>🎯 Routing:</b> {routing}</p>' if routing else ''}
-                        {f'<p><b>💡 AI Suggestions:</b> {suggestions[:100]}{"..." if len(suggestions) > 100 else ""}</p>' if suggestions else ''}
-                    </div>
-                    """
-                    
-                    # Add incident marker with enhanced styling
-                    emoji = get_incident_icon(category)
-                    color = get_incident_color(category)
-
-                    # Define the HTML for the custom emoji icon
-                    icon_html = f"""
-                    <div style="
-                        font-size: 1.5rem;
-                        background-color: {color};
-                        width: 2.5rem;
-                        height: 2.5rem;
-                        border-radius: 50%;
-                        text-align: center;
-                        line-height: 2.5rem;
-                        color: white;
-                        border: 2px solid white;
-                        box-shadow: 0 0 5px rgba(0,0,0,0.5);
-                        ">
-                        {emoji}
-                    </div>
-                    """
-
-                    # Add the marker to the map using folium.DivIcon
-                    folium.Marker(
-                        coords,
-                        popup=folium.Popup(popup_content, max_width=320),
-                        tooltip=f"{category} - {class_info['urgency']} Priority - {time_ago} - {distance}km away",
-                        icon=folium.DivIcon(html=icon_html)
-                    ).add_to(m)
-        
-    map_data = st_folium(m,width=2000, height=640, returned_objects=["last_object_clicked"])
+    # Incident markers, clustered on a screen-space grid for the zoom the map was last shown at
+    mapped_incidents, mapped_coords = [], []
+    for incident in filtered_incidents:
+        coords = extract_coordinates_from_location(incident.get('location', ''))
+        if coords:
+            mapped_incidents.append(incident)
+            mapped_coords.append(coords)
+    incident_count = len(mapped_incidents)
+    previous_view = st.session_state.get("incident_map") or {}
+    map_zoom = previous_view.get("zoom") or (15 if user_coords else 12)
+
+    # Rebuild only when what the map shows changes, not on every form keystroke.
+    # The store version covers in-place changes (enrichment, status) to the same ids.
+    location_bucket = (round(user_coords[0], MAP_LOCATION_DECIMALS), round(user_coords[1], MAP_LOCATION_DECIMALS)) if user_coords else None
+    map_key = (
+        tuple(incident.get('id') for incident in mapped_incidents),
+        location_bucket, map_zoom, get_incident_store().version
+    )
+    build_start = time.perf_counter()
+    cached_map = st.session_state.get("map_cache")
+    if cached_map and cached_map[0] == map_key:
+        m, incident_layer, incident_clusters = cached_map[1]
+        map_build_note = "reused"
+    else:
+        m, incident_layer, incident_clusters = build_map(map_center, user_coords, mapped_incidents, mapped_coords, map_zoom)
+        st.session_state.map_cache = (map_key, (m, incident_layer, incident_clusters))
+        map_build_note = "built"
+    map_build_ms = (time.perf_counter() - build_start) * 1000
+
+    # The layer is sent separately so zooming and new data don't rebuild the whole map
+    map_data = st_folium(
+        m, width=2000, height=640, key="incident_map",
+        feature_group_to_add=incident_layer,
+        returned_objects=["last_object_clicked", "zoom"]
+    )
+    st.caption(f"⏱ Map {map_build_note} in {map_build_ms:.1f} ms")
 
     if filtered_incidents:
         # Calculate statistics
@@ -507,8 +478,7 @@ with right_col:
             category = incident.get('category', 'Others')
             category_counts[category] = category_counts.get(category, 0) + 1
 
-            classification = parse_classification_info(incident.get('classification', ''))
-            urgency = classification.get('urgency', 'Medium')
+            urgency = incident_classification_info(incident).get('urgency', 'Medium')
             urgency_counts[urgency] = urgency_counts.get(urgency, 0) + 1
 
         # Calculate average distance if user location is available
@@ -596,48 +566,23 @@ with right_col:
 
     # Auto-refresh button
     if st.button("🔄 Refresh Map Data", key="refresh_map"):
-        st.cache_data.clear()
+        get_incident_store().refresh()
         st.rerun()
 
-    # Display clicked incident details in sidebar
-    if map_data["last_object_clicked"]:
-        clicked_data = map_data["last_object_clicked"]
-        if clicked_data and "lat" in clicked_data and "lng" in clicked_data:
-            clicked_coords = [clicked_data["lat"], clicked_data["lng"]]
-            
-            # Find the incident that matches these coordinates
-            for incident in filtered_incidents:
-                incident_coords = extract_coordinates_from_location(incident.get('location', ''))
-                if incident_coords and abs(incident_coords[0] - clicked_coords[0]) < 0.001 and abs(incident_coords[1] - clicked_coords[1]) < 0.001:
-                    st.sidebar.markdown("### 📋 Selected Incident Details")
-                    st.sidebar.markdown(f"🏷 Category:** {incident.get('category', 'Unknown')}")
-                    st.sidebar.markdown(f"⏰ Reported:** {format_time_ago(incident.get('timestamp', ''))}")
-                    st.sidebar.markdown(f"📏 Distance:** {incident.get('distance_km', 0)}km away")
-                    st.sidebar.markdown(f"📅 Time:** {incident.get('timestamp', 'Unknown')}")
-                    st.sidebar.markdown(f"📍 Location:** {incident.get('location', 'Unknown')}")
-                    st.sidebar.markdown(f"📝 Description:** {incident.get('description', 'No description')}")
-                    
-                    classification = incident.get('classification', '')
-                    if classification:
-                        st.sidebar.markdown("🤖 AI Analysis:")
-                        st.sidebar.code(classification)
-                    
-                    routing = incident.get('routing', '')
-                    if routing:
-                        st.sidebar.markdown(f"🎯 Routing:** {routing}")
-                    
-                    authority_routing = incident.get('authority_routing', '')
-                    if authority_routing and authority_routing != "No authority routing required":
-                        st.sidebar.markdown(f"🏛 Authorities Notified:** {authority_routing}")
-                    
-                    suggestions = incident.get('suggestions', '')
-                    if suggestions:
-                        st.sidebar.markdown("💡 AI Safety Suggestions:")
-                        st.sidebar.write(suggestions[:300] + "..." if len(suggestions) > 300 else suggestions)
-                    
-                    status = incident.get('status', 'Pending')
-                    st.sidebar.markdown(f"📈 Status:** {status}")
-                    break
+    # Display clicked incident details in sidebar, loaded only for the clicked marker
+    clicked_data = map_data.get("last_object_clicked") if map_data else None
+    if clicked_data and "lat" in clicked_data and "lng" in clicked_data:
+        cluster = find_clicked_cluster(incident_clusters, clicked_data["lat"], clicked_data["lng"])
+        if cluster:
+            cluster_incidents = cluster[2]
+            if len(cluster_incidents) == 1:
+                show_incident_details(cluster_incidents[0])
+            else:
+                st.sidebar.markdown(f"### 📋 {len(cluster_incidents)} Incidents Here")
+                st.sidebar.caption("Zoom in to see them as separate markers")
+                for incident in cluster_incidents:
+                    with st.sidebar.expander(f"{get_incident_icon(incident.get('category', 'Others'))} {incident.get('category', 'Unknown')} - {format_time_ago(incident.get('timestamp', ''))}"):
+                        show_incident_details(incident, container=st, heading=False)
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -679,13 +624,13 @@ with left_col:
         st.markdown("### 🔍 Recent Nearby Incidents")
         user_coords = st.session_state.location_coords
         
-        # Sort by distance
-        nearby_sorted = sorted(filtered_incidents, key=lambda x: x.get('distance_km', 0))
+        # Already sorted by distance by the vectorized filter
+        nearby_sorted = filtered_incidents
         
         if nearby_sorted:
             st.info(f"Found {len(nearby_sorted)} recent incidents within 30 km (last 48 hours)")
             for i, incident in enumerate(nearby_sorted[:3]):  # Show top 3 nearby
-                class_info = parse_classification_info(incident.get('classification', ''))
+                class_info = incident_classification_info(incident)
                 urgency_emoji = "🔥" if class_info['urgency'] == 'High' else "⚡" if class_info['urgency'] == 'Medium' else "📝"
                 time_ago = format_time_ago(incident.get('timestamp', ''))
                 distance = incident.get('distance_km', 0)
@@ -707,35 +652,46 @@ if submit:
         st.warning("⚠ Please complete all fields and ensure location is enabled before submitting.")
     else:
         try:
-            #for prgress bar
+            # Progress follows the real work: upload bytes, then the backend's pipeline stages
             st.markdown("### 🚀 Submitting your report...")
-            prg = st.progress(0)
-
-            for i in range(100):
-                time.sleep(1.8)
-                prg.progress(i+1)
-            files = []
-            for media in uploaded_media:
-                files.append(("file", (media.name, media, media.type)))
+            prg = st.progress(0, text="📤 Uploading...")
+
+            files = [("file", (media.name, media.getvalue(), media.type)) for media in uploaded_media]
+            body, content_type = encode_multipart_formdata([
+                ("category", incident_type),
+                ("location", f"{location_text} ({latlng[0]}, {latlng[1]})"),
+                ("description", description),
+                *files
+            ])
+            upload = UploadProgress(
+                body, lambda sent, total: prg.progress(int(UPLOAD_PROGRESS_SHARE * sent / total), text=f"📤 Uploading... {sent // 1024} / {total // 1024} KB")
+            )
             # storing the input data to backend using fastapi
             response = requests.post(
                 f"{BACKEND_URL}/report/",
-                data={
-                    "category": incident_type,
-                    "location": f"{location_text} ({latlng[0]}, {latlng[1]})",
-                    "description": description
-                },
-                files=files
+                data=upload,
+                headers={"Content-Type": content_type, "Content-Length": str(len(upload))}
             )
 
-
             if response.status_code == 200:
                 st.success("✅ Incident reported successfully and saved to database!")
                 response_data = response.json()
                 
+                # AI enrichment runs in the background; wait for it to land on the report
+                ai_data = None
+                if response_data.get("cluster_id", response_data.get("report_id")) != response_data.get("report_id"):
+                    st.info("👥 This looks like an incident already reported nearby; your report was added to it.")
+                if "report_id" in response_data:
+                    prg.progress(UPLOAD_PROGRESS_SHARE, text="🤖 Report saved, AI analysis queued...")
+                    report = follow_enrichment(response_data["report_id"], lambda progress: show_enrichment_progress(prg, progress))
+                    if report:
+                        prg.progress(100, text="✅ AI analysis complete")
+                        ai_data = {**report, "authority_routing": report.get("authority_routing_agent", "")}
+                    else:
+                        st.info("🤖 AI analysis is still running; it will appear on the map when ready.")
+                
                 # Display AI analysis results
-                if "ai_data" in response_data:
-                    ai_data = response_data["ai_data"]
+                if ai_data:
                     st.markdown("### 🤖 AI Analysis Results")
                     
                     col1, col2 = st.columns(2)
@@ -756,7 +712,7 @@ if submit:
                 
                 # Auto-refresh to show new incident
                
-                st.cache_data.clear()  # Clear cache to show new data
+                get_incident_store().refresh()  # Pick up the new report without a full reload
                 if st.button("🔄 Refresh Map to See Your Report"):
                     st.rerun()
                 
@@ -0,0 +1,72 @@
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+_coordinates = re.compile(r'\((-?\d+\.?\d*),\s*(-?\d+\.?\d*)\)')
+
+def parse_timestamp_epoch(timestamp_str):
+    """Epoch seconds of a stored timestamp, read as local wall-clock time; NaN if unparseable"""
+    if not isinstance(timestamp_str, str):
+        return np.nan
+    try:
+        if 'T' in timestamp_str:
+            # Timezone suffixes are dropped, matching how the map has always compared times
+            timestamp_str = timestamp_str.split('+')[0].split('Z')[0]
+        incident_time = datetime.fromisoformat(timestamp_str)
+        if incident_time.tzinfo is not None:
+            return np.nan
+        return incident_time.timestamp()
+    except Exception:
+        return np.nan
+
+def is_cluster_primary(incident):
+    """False for near-duplicate reports folded into another incident's cluster"""
+    return incident.get('cluster_id', incident.get('id')) == incident.get('id')
+
+def build_incident_frame(incidents):
+    """Columnar view of the cluster-primary incidents that carry coordinates, built once per data fetch.
+
+    Returns a dict of equal-length arrays: ``row`` (position in ``incidents``),
+    ``lat``, ``lng`` (degrees) and ``epoch`` (seconds, NaN when unknown).
+    """
+    rows, lats, lngs, epochs = [], [], [], []
+    for row, incident in enumerate(incidents):
+        if not is_cluster_primary(incident):
+            continue
+        match = _coordinates.search(incident.get('location') or '')
+        if not match:
+            continue
+        rows.append(row)
+        lats.append(float(match.group(1)))
+        lngs.append(float(match.group(2)))
+        epochs.append(parse_timestamp_epoch(incident.get('timestamp', '')))
+    return {
+        "row": np.asarray(rows, dtype=np.int64),
+        "lat": np.asarray(lats, dtype=np.float64),
+        "lng": np.asarray(lngs, dtype=np.float64),
+        "epoch": np.asarray(epochs, dtype=np.float64),
+    }
+
+def haversine_km(lat, lng, lats, lngs):
+    """Distances in km from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs - lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def filter_incident_frame(frame, user_coords, max_distance_km=20, max_hours=48, now=None):
+    """Rows within range and time window, nearest first.
+
+    Returns ``(rows, distances_km)`` where ``rows`` index the original incident list.
+    """
+    now = time.time() if now is None else now
+    distances = haversine_km(user_coords[0], user_coords[1], frame["lat"], frame["lng"])
+    # NaN epochs compare False, so unparseable timestamps are treated as old
+    keep = (distances <= max_distance_km) & (now - frame["epoch"] <= max_hours * 3600)
+    order = np.argsort(distances[keep], kind="stable")
+    return frame["row"][keep][order], distances[keep][order]
@@ -0,0 +1,188 @@
+import os
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from incident_frame import build_incident_frame
+
+# How long the first snapshot may take before the page renders with what it has
+INITIAL_LOAD_TIMEOUT = float(os.getenv("INCIDENT_INITIAL_LOAD_TIMEOUT", "20"))
+# Delta-poll mode only: seconds between full resyncs that pick up deletions
+RESYNC_SECONDS = float(os.getenv("INCIDENT_RESYNC_SECONDS", "300"))
+# Delta polls re-read this much before the newest updated_at seen, for clock skew between writers
+DELTA_OVERLAP_SECONDS = float(os.getenv("INCIDENT_DELTA_OVERLAP_SECONDS", "30"))
+# Page size when reading through the backend API
+BACKEND_PAGE_SIZE = 1000
+
+class FirestoreReports:
+    """Reports straight from the incident_reports collection, with a live listener"""
+
+    def __init__(self, db, collection="incident_reports"):
+        self._collection = db.collection(collection)
+
+    def listen(self, callback):
+        """Start an on_snapshot listener; returns the watch to unsubscribe"""
+        return self._collection.on_snapshot(callback)
+
+    @staticmethod
+    def listening(watch):
+        """False once the watch's stream has died and it will deliver no more snapshots"""
+        return watch.is_active
+
+    def fetch(self, updated_since=None):
+        """(report_id, data) of every report, or of those written at or after ``updated_since``"""
+        query = self._collection.where("updated_at", ">=", updated_since) if updated_since else self._collection
+        for doc in query.stream():
+            yield doc.id, doc.to_dict()
+
+class BackendReports:
+    """Reports read page by page from the backend's GET /reports/, whatever store it runs on"""
+
+    def __init__(self, backend_url, page_size=BACKEND_PAGE_SIZE):
+        self._url = f"{backend_url}/reports/"
+        self._page_size = page_size
+
+    def fetch(self, updated_since=None):
+        """(report_id, data) of every report, or of those written at or after ``updated_since``"""
+        params = {"limit": self._page_size}
+        if updated_since:
+            params["updated_since"] = updated_since
+        while True:
+            response = requests.get(self._url, params=params, timeout=30)
+            response.raise_for_status()
+            page = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+            for data in page:
+                yield data["id"], data
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return
+            params["start_after"] = cursor
+
+def delta_start(last_seen):
+    """Lower bound for the next delta poll, DELTA_OVERLAP_SECONDS before last_seen"""
+    if not last_seen:
+        return None
+    try:
+        return (datetime.fromisoformat(last_seen) - timedelta(seconds=DELTA_OVERLAP_SECONDS)).isoformat(timespec="microseconds")
+    except ValueError:
+        return last_seen
+
+class IncidentStore:
+    """Process-wide copy of the incident reports.
+
+    Filled once, then kept current by the source's listener (Firestore
+    ``on_snapshot``) so each change (new report, Pending -> Resolved, deletion)
+    is applied in place. If the source has no listener, it cannot be started or
+    it dies later, the store falls back to delta queries for reports written since the newest
+    ``updated_at`` it has seen (enrichment, status changes and cluster
+    attachment included), with a periodic full resync for deletions.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._docs = {}
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._watch = None
+        self._last_seen = ""
+        self._last_resync = 0.0
+        self._frame = None
+        self.version = 0
+        self.error = None
+
+    def start(self):
+        """Attach the snapshot listener, or do a full load for delta polling"""
+        if hasattr(self._source, "listen"):
+            try:
+                self._watch = self._source.listen(self._on_snapshot)
+                self._loaded.wait(INITIAL_LOAD_TIMEOUT)
+                return self
+            except Exception as e:
+                self.error = e
+                self._watch = None
+        try:
+            self._resync()
+        except Exception as e:
+            self.error = e
+        return self
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                if change.type.name == "REMOVED":
+                    self._docs.pop(doc.id, None)
+                else:
+                    data = doc.to_dict()
+                    data["id"] = doc.id
+                    self._docs[doc.id] = data
+            if changes:
+                self.version += 1
+            self.error = None
+        self._loaded.set()
+
+    def _resync(self):
+        docs = {}
+        for report_id, data in self._source.fetch():
+            data["id"] = report_id
+            docs[report_id] = data
+        with self._lock:
+            self._docs = docs
+            self._last_seen = max((str(d.get("updated_at", "")) for d in docs.values()), default="")
+            self._last_resync = time.time()
+            self.version += 1
+            self.error = None
+        self._loaded.set()
+
+    def refresh(self):
+        """Pull changes when running without a listener; a no-op while the listener is live"""
+        if self._watch is not None:
+            if self._source.listening(self._watch):
+                return
+            # The watch stream died and will not reconnect; poll from here on
+            print("❌ Incident listener stopped, falling back to delta polling")
+            try:
+                self._watch.unsubscribe()
+            except Exception:
+                pass
+            self._watch = None
+            # Resync first: the listener may have missed deletions as well as writes
+            self._last_resync = 0.0
+        try:
+            if time.time() - self._last_resync >= RESYNC_SECONDS:
+                self._resync()
+                return
+            changed = False
+            for report_id, data in self._source.fetch(delta_start(self._last_seen)):
+                data["id"] = report_id
+                with self._lock:
+                    # The overlap (and the inclusive bound) returns recent reports unchanged
+                    if self._docs.get(report_id) == data:
+                        continue
+                    self._docs[report_id] = data
+                    self._last_seen = max(self._last_seen, str(data.get("updated_at", "")))
+                changed = True
+            with self._lock:
+                if changed:
+                    self.version += 1
+                self.error = None
+        except Exception as e:
+            self.error = e
+
+    def incidents_and_frame(self):
+        """Current incidents plus their columnar frame, rebuilt only when the data changed"""
+        with self._lock:
+            frame = self._frame
+            if frame is None or frame[0] != self.version:
+                incidents = list(self._docs.values())
+                frame = (self.version, incidents, build_incident_frame(incidents))
+                self._frame = frame
+        return frame[1], frame[2]
+
+    def close(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
@@ -0,0 +1,112 @@
+import os
+import html
+import math
+
+import folium
+import numpy as np
+
+from backend.incident_style import get_incident_color, get_incident_icon, incident_classification_info
+
+# Grid cell size in screen pixels used to merge nearby incidents at the current zoom
+CLUSTER_CELL_PX = int(os.getenv("MAP_CLUSTER_CELL_PX", "60"))
+# From this zoom level on every incident gets its own marker
+CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", "17"))
+URGENCY_RANK = {"High": 3, "Medium": 2, "Low": 1}
+URGENCY_COLORS = {"High": "#ff4444", "Medium": "#ffa500", "Low": "#4caf50"}
+
+def map_layer_css():
+    """Styles for the marker icons, added once to the base map instead of inlined per marker"""
+    return folium.Element("""
+    <style>
+        .incident-pin {
+            font-size: 1.5rem; width: 2.5rem; height: 2.5rem; border-radius: 50%;
+            text-align: center; line-height: 2.5rem; color: white;
+            border: 2px solid white; box-shadow: 0 0 5px rgba(0,0,0,0.5);
+        }
+        .incident-cluster {
+            border-radius: 50%; text-align: center; color: white; font-weight: bold;
+            border: 3px solid rgba(255,255,255,0.8); box-shadow: 0 0 6px rgba(0,0,0,0.5);
+        }
+    </style>
+    """)
+
+def grid_clusters(lats, lngs, zoom):
+    """Group points sharing a screen-space grid cell at this zoom; returns a list of index arrays"""
+    if len(lats) == 0:
+        return []
+    if zoom >= CLUSTER_MAX_ZOOM:
+        return [np.array([i]) for i in range(len(lats))]
+    # Web Mercator: one 256 px tile spans 360 / 2**zoom degrees of longitude
+    cell_deg = CLUSTER_CELL_PX * 360.0 / (256 * 2 ** zoom)
+    # Shrink cells away from the equator so they stay square on screen
+    lat_cell = cell_deg * math.cos(math.radians(float(np.mean(lats))))
+    keys = np.stack([np.floor(lats / lat_cell), np.floor(lngs / cell_deg)], axis=1)
+    _, labels = np.unique(keys, axis=0, return_inverse=True)
+    labels = labels.ravel()
+    order = np.argsort(labels, kind="stable")
+    splits = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, splits)
+
+def _marker(incident, coords, class_info):
+    category = incident.get('category', 'Others')
+    icon_html = (
+        f'<div class="incident-pin" style="background-color: {get_incident_color(category)};">'
+        f'{get_incident_icon(category)}</div>'
+    )
+    reports = incident.get('report_count', 1)
+    tooltip = f"{category} - {class_info['urgency']} Priority - {incident.get('distance_km', 0)}km away"
+    if reports > 1:
+        tooltip += f" - {reports} reports"
+    return folium.Marker(
+        coords,
+        tooltip=html.escape(tooltip),
+        icon=folium.DivIcon(html=icon_html, icon_size=(40, 40), icon_anchor=(20, 20))
+    )
+
+def _cluster_marker(lat, lng, members, urgencies):
+    top = max(urgencies, key=lambda u: URGENCY_RANK.get(u, 2))
+    size = min(64, 28 + 6 * int(math.log2(len(members))))
+    icon_html = (
+        f'<div class="incident-cluster" style="background-color: {URGENCY_COLORS.get(top, "#ffa500")}; '
+        f'width: {size}px; height: {size}px; line-height: {size - 6}px;">{len(members)}</div>'
+    )
+    return folium.Marker(
+        [lat, lng],
+        tooltip=f"{len(members)} incidents (highest priority: {top}) - click to list them",
+        icon=folium.DivIcon(html=icon_html, icon_size=(size, size), icon_anchor=(size // 2, size // 2))
+    )
+
+def build_incident_layer(incidents, coords, zoom):
+    """Clustered marker layer for incidents with known coords.
+
+    Markers carry only an icon and a one-line tooltip; the details are shown in the
+    sidebar when a marker is clicked. Returns ``(feature_group, clusters)``, where
+    each cluster is ``(lat, lng, [incident, ...])`` at the marker's position so a
+    click can be mapped back to its incidents.
+    """
+    layer = folium.FeatureGroup(name="Incidents")
+    clusters = []
+    if not incidents:
+        return layer, clusters
+    lats = np.array([c[0] for c in coords], dtype=np.float64)
+    lngs = np.array([c[1] for c in coords], dtype=np.float64)
+    for members in grid_clusters(lats, lngs, zoom):
+        member_incidents = [incidents[i] for i in members.tolist()]
+        infos = [incident_classification_info(incident) for incident in member_incidents]
+        if len(members) == 1:
+            lat, lng = coords[members[0]]
+            _marker(member_incidents[0], [lat, lng], infos[0]).add_to(layer)
+        else:
+            lat, lng = float(lats[members].mean()), float(lngs[members].mean())
+            _cluster_marker(lat, lng, member_incidents, [info['urgency'] for info in infos]).add_to(layer)
+        clusters.append((lat, lng, member_incidents))
+    return layer, clusters
+
+def find_clicked_cluster(clusters, lat, lng, tolerance=1e-4):
+    """The cluster whose marker sits at the clicked position, if any"""
+    best, best_distance = None, tolerance
+    for cluster in clusters:
+        distance = max(abs(cluster[0] - lat), abs(cluster[1] - lng))
+        if distance <= best_distance:
+            best, best_distance = cluster, distance
+    return best
@@ -0,0 +1,43 @@
+"""Shared setup: every on-disk store goes to a throwaway directory.
+
+Several backend modules open their store at import, so the environment is set
+here, before any test module imports them.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="suraksha-tests-")
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("STORAGE_DB", os.path.join(_workdir, "reports.db"))
+os.environ.setdefault("JOB_QUEUE_DB", os.path.join(_workdir, "jobs.db"))
+os.environ.setdefault("MEDIA_ROOT", os.path.join(_workdir, "media"))
+os.environ.setdefault("MEDIA_DB", os.path.join(_workdir, "media.db"))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """TestClient for the backend on a fresh SQLite store, with Gemini replaced by the offline stub"""
+    pytest.importorskip("google.generativeai")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from stub_llm import StubLLM, install
+    from backend import router
+    from backend.dedup import IncidentDeduper
+    from backend.jobs import JobQueue
+    from backend.storage import SQLiteReportRepository
+
+    install(StubLLM(latency_ms=0, jitter=0))
+    monkeypatch.setattr(router, "report_repository", SQLiteReportRepository(str(tmp_path / "reports.db")))
+    monkeypatch.setattr(router, "incident_deduper", IncidentDeduper())
+    monkeypatch.setattr(router.enrichment_workers, "queue", JobQueue(str(tmp_path / "jobs.db")))
+    from backend.main import app
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from backend import agents
+from backend.classification import Classification
+
+REPORTS = [
+    {"category": "Fire", "location": "Park Street, Kolkata (22.5526, 88.3520)", "description": "Fire in a shop with thick smoke"},
+    {"category": "Others", "location": "Salt Lake, Kolkata (22.5800, 88.4100)", "description": "Water logging after heavy rain"},
+    {"category": "Crime", "location": "Howrah (22.5958, 88.2636)", "description": "Phone theft reported at the station"}
+]
+
+
+def parsed_reports():
+    return [agents.input_agent(r["category"], r["location"], r["description"]) for r in REPORTS]
+
+
+def answer(monkeypatch, text):
+    prompts = []
+
+    def generate_text(prompt, generation_config=None):
+        prompts.append(prompt)
+        return text
+
+    monkeypatch.setattr(agents, "generate_text", generate_text)
+    return prompts
+
+
+def test_batch_classification_maps_ids_including_strings(monkeypatch):
+    prompts = answer(monkeypatch, json.dumps([
+        {"id": "2", "type": "Crime", "urgency": "low", "severity": 2},
+        {"id": 0, "type": "Fire", "urgency": "high", "severity": 5},
+        {"id": 1, "type": "Waterlogging", "urgency": "medium", "severity": "3"}
+    ]))
+    assert agents._batch_classify_llm(parsed_reports()) == [
+        Classification("Fire", "high", 5), Classification("Waterlogging", "medium", 3), Classification("Crime", "low", 2)
+    ]
+    assert len(prompts) == 1
+
+
+def test_missing_or_unusable_ids_get_the_heuristic_classification(monkeypatch):
+    answer(monkeypatch, json.dumps([
+        {"id": 0, "type": "Fire", "urgency": "high", "severity": 5},
+        {"id": "two", "type": "Crime", "urgency": "low", "severity": 2},
+        {"type": "Crime", "urgency": "low", "severity": 2},
+        "not an object"
+    ]))
+    parsed = parsed_reports()
+    result = agents._batch_classify_llm(parsed)
+    assert result[0] == Classification("Fire", "high", 5)
+    assert result[1:] == [agents.get_default_classification(p) for p in parsed[1:]]
+
+
+@pytest.mark.parametrize("text", ["not json", json.dumps({"id": 0, "type": "Fire"})])
+def test_unusable_response_falls_back_for_every_report(monkeypatch, text):
+    answer(monkeypatch, text)
+    parsed = parsed_reports()
+    assert agents._batch_classify_llm(parsed) == [agents.get_default_classification(p) for p in parsed]
+
+
+def test_batch_pipeline_yields_one_list_per_group(monkeypatch):
+    monkeypatch.setattr(agents, "generate_text", lambda prompt, generation_config=None: "[]")
+    reports = REPORTS * 3
+
+    async def collect():
+        return [group async for group in agents.run_batch_pipeline_async(reports, batch_size=2, stage_timeout=5)]
+
+    groups = asyncio.run(collect())
+    assert sorted(len(group) for group in groups) == [1, 2, 2, 2, 2]
+    indexes = sorted(index for group in groups for index, _ in group)
+    assert indexes == list(range(len(reports)))
+    for group in groups:
+        for index, result in group:
+            assert result["description"] == reports[index]["description"]
+            assert "classification" in result
+
+
+def test_batch_endpoint_streams_ndjson(client, monkeypatch):
+    from backend import router
+
+    monkeypatch.setattr(agents, "BATCH_CLASSIFY_SIZE", 2)
+    body = "\n".join(json.dumps(r) for r in REPORTS + [{"category": "Fire"}] + REPORTS[:1])
+    response = client.post("/reports/batch", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # Invalid items are reported first, then each group's results as it finishes
+    assert lines[0] == {"index": 3, "error": "category, location and description are required"}
+    results = lines[1:]
+    assert sorted(line["index"] for line in results) == [0, 1, 2, 4]
+    for line in results:
+        stored = router.report_repository.get(line["report_id"])
+        assert stored["enrichment"] == "done"
+        assert stored["description"] == line["ai_data"]["description"]
+
+
+def test_batch_endpoint_rejects_bad_bodies(client, monkeypatch):
+    from backend import router
+
+    assert client.post("/reports/batch", content="[{").status_code == 400
+    monkeypatch.setattr(router, "MAX_BATCH_REPORTS", 2)
+    assert client.post("/reports/batch", content=json.dumps(REPORTS)).status_code == 413
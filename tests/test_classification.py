@@ -0,0 +1,85 @@
+import pytest
+
+from backend.classification import (
+    Classification, classification_from_text, match_severity, match_type, match_urgency, parse_classification_text
+)
+
+DEFAULT = Classification("Others", "medium", 3)
+
+
+def test_str_and_fields_round_trip():
+    classification = Classification("Fire", "high", 4)
+    assert str(classification) == "Type: Fire\nUrgency: high\nSeverity: 4"
+    assert classification_from_text(str(classification)) == classification
+    assert classification.as_fields() == {
+        "classification": "Type: Fire\nUrgency: high\nSeverity: 4", "type": "Fire", "urgency": "high", "severity": 4
+    }
+
+
+def test_parse_ignores_chatter_and_unknown_keys():
+    text = "Sure! Here is the result:\n  TYPE: Fire  \nNotes: smoke: heavy\nurgency:HIGH\nSeverity: 4\n"
+    assert parse_classification_text(text) == {"type": "Fire", "urgency": "HIGH", "severity": "4"}
+    assert parse_classification_text("") == {}
+    assert parse_classification_text(None) == {}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Type: Fire\nUrgency: High\nSeverity: 4", Classification("Fire", "high", 4)),
+    ("Type: fire outbreak\nUrgency:  LOW \nSeverity: 2 ", Classification("Fire", "low", 2)),
+    ("Type: protest\nUrgency: medium\nSeverity: 3", Classification("Protest / March", "medium", 3)),
+    # Partial output keeps what parsed and defaults the rest
+    ("Type: Accident", Classification("Accident", "medium", 3)),
+    ("Urgency: high", Classification("Others", "high", 3)),
+    # Malformed values fall back field by field
+    ("Type: alien invasion\nUrgency: extreme\nSeverity: four", DEFAULT),
+    ("The model refused to answer", DEFAULT),
+    ("", DEFAULT),
+    ("Error in classification", DEFAULT),
+])
+def test_classification_from_text(text, expected):
+    assert classification_from_text(text) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", 1), ("5", 5), (" 3 ", 3), (4, 4),
+    ("0", None), ("6", None), ("-2", None), ("10", None), ("3.5", None), ("high", None), (None, None)
+])
+def test_severity_is_bounded_to_one_to_five(value, expected):
+    assert match_severity(value) == expected
+
+
+def test_out_of_range_severity_uses_the_default():
+    assert classification_from_text("Type: Fire\nUrgency: high\nSeverity: 9").severity == 3
+    assert classification_from_text("Severity: 0", default=Classification("Crime", "low", 2)).severity == 2
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("high", "high"), ("HIGH", "high"), (" Medium ", "medium"), ("low", "low"),
+    ("urgent", None), ("", None), (None, None)
+])
+def test_urgency_is_normalized(value, expected):
+    assert match_urgency(value) == expected
+
+
+def test_match_type():
+    assert match_type("Construction") == "Construction Work in Progress"
+    assert match_type("waterlogging near the school") == "Waterlogging"
+    assert match_type("alien invasion") is None
+    assert match_type("water") == "Waterlogging"
+    assert match_type("") is None
+
+
+def test_as_classification_accepts_objects_and_legacy_text():
+    pytest.importorskip("google.generativeai")
+    from backend.agents import as_classification, validate_classification_response
+
+    classification = Classification("Crime", "low", 2)
+    assert as_classification(classification) is classification
+    assert as_classification("Type: Crime\nUrgency: low\nSeverity: 2") == classification
+
+    # Invalid LLM fields are inferred from the description rather than defaulted
+    parsed = {"description": "Huge fire and smoke, people injured", "category": "Fire"}
+    result = validate_classification_response("Type: ???\nUrgency: whenever\nSeverity: 11", parsed)
+    assert result.type == "Fire"
+    assert result.urgency == "high"
+    assert 1 <= result.severity <= 5
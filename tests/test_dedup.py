@@ -0,0 +1,72 @@
+from backend import dedup
+from backend.dedup import IncidentDeduper, minhash, report_epoch, shingles, similarity
+
+HERE = (22.5726, 88.3639)
+# About 110 m and 1.1 km north of HERE
+NEAR = (22.5736, 88.3639)
+FAR = (22.5826, 88.3639)
+NOW = 1_700_000_000.0
+
+FIRE = "Huge fire in the market building near the bus stand, smoke everywhere"
+
+
+def test_shingles_are_unigrams_and_bigrams():
+    assert shingles("Road blocked, road BLOCKED") == {"road", "blocked", "road blocked", "blocked road"}
+
+
+def test_similarity_thresholds():
+    assert similarity(minhash(FIRE), minhash(FIRE.upper() + "!")) == 1.0
+    close = similarity(minhash(FIRE), minhash(FIRE + " and people running"))
+    unrelated = similarity(minhash(FIRE), minhash("Waterlogging on the highway after heavy rain"))
+    assert close >= dedup.DEDUP_SIMILARITY
+    assert unrelated < 0.1
+
+
+def test_report_epoch_reads_ist_timestamps():
+    assert report_epoch("2024-01-01T05:30:00+00:00") == report_epoch("2024-01-01T00:00:00+00:00") + 5.5 * 3600
+    assert report_epoch("2024-01-01T05:30:00+00:00") == 1704067200
+
+
+def test_match_within_radius_window_and_similarity():
+    deduper = IncidentDeduper()
+    deduper.add("primary", FIRE, HERE, seen_at=NOW)
+    assert deduper.match(FIRE + " and people running", NEAR, now=NOW + 60) == ("primary", None)
+    assert deduper.match(FIRE, FAR, now=NOW + 60) is None
+    assert deduper.match("Waterlogging on the highway after heavy rain", HERE, now=NOW + 60) is None
+    assert deduper.match(FIRE, None, now=NOW + 60) is None
+    assert deduper.metrics() == {"matched": 1, "new_clusters": 1, "active_clusters": 1}
+
+
+def test_clusters_expire_unless_kept_alive():
+    window = dedup.DEDUP_WINDOW_SECONDS
+    deduper = IncidentDeduper()
+    deduper.add("primary", FIRE, HERE, seen_at=NOW)
+    # Each match extends the cluster by another window
+    assert deduper.match(FIRE, HERE, now=NOW + window - 1) is not None
+    assert deduper.match(FIRE, HERE, now=NOW + 2 * window - 2) is not None
+    assert deduper.match(FIRE, HERE, now=NOW + 3 * window) is None
+    assert deduper.metrics()["active_clusters"] == 0
+
+
+def test_best_match_wins():
+    deduper = IncidentDeduper()
+    deduper.add("loose", FIRE + " shops closed traffic diverted via the main road", HERE, seen_at=NOW)
+    deduper.add("exact", FIRE, HERE, seen_at=NOW)
+    assert deduper.match(FIRE, HERE, now=NOW)[0] == "exact"
+
+
+def test_set_enrichment_is_returned_by_later_matches():
+    deduper = IncidentDeduper()
+    deduper.add("primary", FIRE, HERE, seen_at=NOW)
+    enrichment = {"incident_type": "fire", "severity": "high"}
+    deduper.set_enrichment("primary", enrichment)
+    deduper.set_enrichment("unknown", {"ignored": True})
+    assert deduper.match(FIRE, HERE, now=NOW) == ("primary", enrichment)
+
+
+def test_disabled_deduper_never_matches(monkeypatch):
+    monkeypatch.setattr(dedup, "DEDUP_ENABLED", False)
+    deduper = IncidentDeduper()
+    deduper.add("primary", FIRE, HERE, seen_at=NOW)
+    assert deduper.match(FIRE, HERE, now=NOW) is None
+    assert deduper.metrics()["active_clusters"] == 0
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from backend.geo import (
+    bounding_box, covering_prefixes, encode_geohash, geo_fields, haversine_km, parse_coordinates
+)
+
+
+def test_encode_geohash_known_values():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(22.5726, 88.3639, 5) == "tunb6"
+    assert len(encode_geohash(22.5726, 88.3639)) == 9
+
+
+def test_parse_coordinates():
+    assert parse_coordinates("Park Street, Kolkata (22.5726, 88.3639)") == (22.5726, 88.3639)
+    assert parse_coordinates("somewhere (-33.86, 151.2)") == (-33.86, 151.2)
+    assert parse_coordinates("Park Street") is None
+    assert parse_coordinates(None) is None
+    assert parse_coordinates("bad (95.0, 10.0)") is None
+
+
+def test_geo_fields():
+    assert geo_fields("Kolkata (22.5726, 88.3639)") == {
+        "lat": 22.5726, "lng": 88.3639, "geohash": encode_geohash(22.5726, 88.3639)
+    }
+    assert geo_fields("no coordinates") == {}
+
+
+def test_haversine_km():
+    assert haversine_km(22.5726, 88.3639, 22.5726, 88.3639) == 0
+    # One degree of latitude is about 111 km
+    assert haversine_km(0, 0, 1, 0) == pytest.approx(111.19, abs=0.01)
+
+
+@pytest.mark.parametrize("radius_km", [0.05, 0.5, 2, 10, 50])
+def test_covering_prefixes_contain_every_point_in_radius(radius_km):
+    rng = random.Random(radius_km)
+    lat, lng = 22.5726, 88.3639
+    prefixes = covering_prefixes(lat, lng, radius_km)
+    assert 1 <= len(prefixes) <= 16
+    min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+    for _ in range(200):
+        point = (rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng))
+        if haversine_km(lat, lng, *point) <= radius_km:
+            assert any(encode_geohash(*point).startswith(prefix) for prefix in prefixes)
+
+
+def test_covering_prefixes_respects_max_cells():
+    for max_cells in (1, 4, 9):
+        assert len(covering_prefixes(22.5726, 88.3639, 3, max_cells=max_cells)) <= max_cells
+    # A huge radius falls back to a single empty prefix that matches everything
+    assert covering_prefixes(0, 0, 20000, max_cells=1) == [""]
@@ -0,0 +1,120 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "frontend"))
+
+from incident_store import IncidentStore
+
+
+class PollingSource:
+    """fetch() over an in-memory dict, failing while `down` is set"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.down = False
+
+    def fetch(self, updated_since=None):
+        if self.down:
+            raise ConnectionError("backend unreachable")
+        return [(report_id, dict(data)) for report_id, data in self.docs.items()
+                if not updated_since or data["updated_at"] >= updated_since]
+
+
+class Watch:
+    def __init__(self):
+        self.is_active = True
+        self.unsubscribed = False
+
+    def unsubscribe(self):
+        self.unsubscribed = True
+
+
+class ListeningSource(PollingSource):
+    def __init__(self, docs):
+        super().__init__(docs)
+        self.watch = Watch()
+        self.callback = None
+
+    def listen(self, callback):
+        self.callback = callback
+        return self.watch
+
+    @staticmethod
+    def listening(watch):
+        return watch.is_active
+
+
+def change(report_id, data, kind="ADDED"):
+    document = SimpleNamespace(id=report_id, to_dict=lambda: dict(data))
+    return SimpleNamespace(document=document, type=SimpleNamespace(name=kind))
+
+
+def ids(store):
+    return sorted(incident["id"] for incident in store._docs.values())
+
+
+def test_polling_error_clears_after_a_successful_refresh():
+    source = PollingSource({"a": {"updated_at": "2024-01-01T00:00:00.000000+00:00"}})
+    store = IncidentStore(source).start()
+    source.down = True
+    store.refresh()
+    assert isinstance(store.error, ConnectionError)
+    source.down = False
+    source.docs["b"] = {"updated_at": "2024-01-01T00:01:00.000000+00:00"}
+    store.refresh()
+    assert store.error is None
+    assert ids(store) == ["a", "b"]
+
+
+def test_snapshot_clears_error():
+    source = ListeningSource({})
+    store = IncidentStore(source)
+    store._watch = source.listen(store._on_snapshot)
+    store.error = RuntimeError("earlier failure")
+    source.callback(None, [change("a", {"updated_at": "x"})], None)
+    assert store.error is None
+    assert ids(store) == ["a"]
+
+
+def test_dead_listener_falls_back_to_delta_polling():
+    source = ListeningSource({"a": {"updated_at": "2024-01-01T00:00:00.000000+00:00"}})
+    store = IncidentStore(source)
+    store._watch = source.listen(store._on_snapshot)
+    source.callback(None, [change("a", source.docs["a"]), change("gone", {"updated_at": ""})], None)
+    # A live listener makes refresh a no-op
+    store.refresh()
+    assert ids(store) == ["a", "gone"]
+
+    source.watch.is_active = False
+    source.docs["b"] = {"updated_at": "2024-01-01T00:05:00.000000+00:00"}
+    store.refresh()
+    assert source.watch.unsubscribed
+    assert store._watch is None
+    # The resync also drops the report deleted while the listener was dead
+    assert ids(store) == ["a", "b"]
+
+    source.docs["c"] = {"updated_at": "2024-01-01T00:06:00.000000+00:00"}
+    store.refresh()
+    assert ids(store) == ["a", "b", "c"]
+
+
+def test_backend_reports_follow_the_next_cursor(monkeypatch):
+    import incident_store
+
+    pages = {None: (["r4", "r3"], "r3"), "r3": (["r2", "r1"], "r1"), "r1": (["r0"], None)}
+    requested = []
+
+    def get(url, params, timeout):
+        requested.append(params.get("start_after"))
+        page_ids, cursor = pages[params.get("start_after")]
+        return SimpleNamespace(
+            text="\n".join(f'{{"id": "{i}"}}' for i in page_ids),
+            headers={"X-Next-Cursor": cursor} if cursor else {},
+            raise_for_status=lambda: None
+        )
+
+    monkeypatch.setattr(incident_store.requests, "get", get)
+    source = incident_store.BackendReports("http://backend", page_size=2)
+    assert [report_id for report_id, _ in source.fetch()] == ["r4", "r3", "r2", "r1", "r0"]
+    assert requested == [None, "r3", "r1"]
@@ -0,0 +1,21 @@
+from backend.incident_style import incident_classification_info, parse_classification_info
+
+
+def test_structured_fields_win_over_text():
+    info = incident_classification_info({"urgency": "high", "type": "Fire", "severity": 5, "classification": "Type: Crime"})
+    assert info == {"type": "Fire", "urgency": "High", "severity": "5"}
+
+
+def test_legacy_classification_text():
+    text = "Type: Accident\nUrgency: low\nSeverity: 2"
+    assert parse_classification_info(text) == {"type": "Accident", "urgency": "Low", "severity": "2"}
+    assert parse_classification_info("") == {"type": "Unknown", "urgency": "Medium", "severity": "3"}
+    assert parse_classification_info(None) == {"type": "Unknown", "urgency": "Medium", "severity": "3"}
+
+
+def test_callers_cannot_corrupt_the_parse_cache():
+    text = "Type: Fire\nUrgency: high\nSeverity: 4"
+    info = incident_classification_info({"classification": text})
+    info["urgency"] = "Low"
+    info["extra"] = True
+    assert incident_classification_info({"classification": text}) == {"type": "Fire", "urgency": "High", "severity": "4"}
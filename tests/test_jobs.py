@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from backend import jobs
+from backend.jobs import EnrichmentWorkers, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(jobs.time, "time", lambda: now[0])
+    return now
+
+
+def test_claim_is_fifo_and_counts_attempts(queue):
+    queue.enqueue("a", {"n": 1})
+    queue.enqueue("b", {"n": 2})
+    assert queue.claim() == ("a", {"n": 1}, 1)
+    assert queue.claim() == ("b", {"n": 2}, 1)
+    assert queue.claim() is None
+    assert queue.counts() == {"running": 2}
+
+
+def test_retry_backs_off_exponentially_then_fails(queue, clock, monkeypatch):
+    monkeypatch.setattr(jobs, "ENRICHMENT_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs, "ENRICHMENT_RETRY_DELAY", 5)
+    queue.enqueue("a", {})
+    for attempt, delay in ((1, 5), (2, 10)):
+        assert queue.claim()[2] == attempt
+        assert queue.retry_or_fail("a", attempt, "boom") == "queued"
+        clock[0] += delay - 0.5
+        assert queue.claim() is None
+        clock[0] += 0.5
+    assert queue.claim()[2] == 3
+    assert queue.retry_or_fail("a", 3, "boom") == "failed"
+    assert queue.status("a") == {"status": "failed", "attempts": 3, "last_error": "boom"}
+    clock[0] += 3600
+    assert queue.claim() is None
+
+
+def test_stale_lease_is_reclaimed_but_renewed_lease_is_not(queue, clock):
+    queue.enqueue("a", {})
+    assert queue.claim(lease=60)[2] == 1
+    clock[0] += 50
+    queue.renew("a")
+    clock[0] += 50
+    assert queue.claim(lease=60) is None
+    clock[0] += 10
+    assert queue.claim(lease=60) == ("a", {}, 2)
+
+
+def test_complete_and_enqueue_again(queue):
+    queue.enqueue("a", {})
+    queue.claim()
+    queue.complete("a")
+    assert queue.status("a") == {"status": "done", "attempts": 1, "last_error": None}
+    assert queue.claim() is None
+    queue.enqueue("a", {"again": True})
+    assert queue.claim() == ("a", {"again": True}, 1)
+    assert queue.status("missing") is None
+
+
+def test_bad_payload_is_marked_failed(queue):
+    queue.enqueue("a", {})
+    queue._conn.execute("UPDATE jobs SET payload = 'not json' WHERE report_id = 'a'")
+    assert queue.claim() is None
+    status = queue.status("a")
+    assert status["status"] == "failed"
+    assert status["last_error"].startswith("Bad payload")
+
+
+def test_workers_retry_then_complete(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "ENRICHMENT_RETRY_DELAY", 0)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    calls = []
+
+    async def handler(report_id, payload, attempts):
+        calls.append(attempts)
+        if attempts == 1:
+            raise RuntimeError("transient")
+
+    async def main():
+        workers = EnrichmentWorkers(queue, handler, concurrency=2)
+        workers.start()
+        await workers.submit("a", {})
+        assert await workers.wait_for("a", 5)
+        await workers.stop()
+
+    asyncio.run(main())
+    assert calls == [1, 2]
+    assert queue.status("a")["status"] == "done"
+
+
+def test_workers_call_on_failed_after_last_attempt(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "ENRICHMENT_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(jobs, "ENRICHMENT_RETRY_DELAY", 0)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    failed = []
+
+    async def handler(report_id, payload, attempts):
+        raise RuntimeError(f"attempt {attempts}")
+
+    async def on_failed(report_id, payload, error):
+        failed.append((report_id, error))
+        raise RuntimeError("handler bug")
+
+    async def main():
+        workers = EnrichmentWorkers(queue, handler, on_failed=on_failed, concurrency=1)
+        workers.start()
+        await workers.submit("a", {})
+        assert await workers.wait_for("a", 5)
+        # A failing on_failed must not kill the worker
+        await workers.submit("b", {})
+        assert await workers.wait_for("b", 5)
+        await workers.stop()
+
+    asyncio.run(main())
+    assert failed == [("a", "attempt 2"), ("b", "attempt 2")]
+
+
+def test_wait_for_cleans_up_waiters(queue):
+    async def handler(report_id, payload, attempts):
+        pass
+
+    async def main():
+        workers = EnrichmentWorkers(queue, handler)
+        assert not await workers.wait_for("a", 0.01)
+        assert workers._waiters == {}
+
+        # Every waiter on a report is woken, and none is left behind
+        waits = [asyncio.create_task(workers.wait_for("b", 5)) for _ in range(3)]
+        await asyncio.sleep(0)
+        workers.notify("b")
+        assert await asyncio.gather(*waits) == [True, True, True]
+        assert workers._waiters == {}
+
+    asyncio.run(main())
+
+
+def test_wait_for_rechecks_after_registering(queue):
+    async def handler(report_id, payload, attempts):
+        pass
+
+    async def main():
+        workers = EnrichmentWorkers(queue, handler)
+
+        # The job finished between the caller's read and the wait: no notify will come
+        async def finished():
+            return True
+
+        async def unchanged():
+            return False
+
+        start = asyncio.get_running_loop().time()
+        assert await workers.wait_for("a", 5, finished)
+        assert asyncio.get_running_loop().time() - start < 1
+        assert not await workers.wait_for("a", 0.01, unchanged)
+        assert workers._waiters == {}
+
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import random
+
+from backend.keywords import KeywordMatcher, _number_50_to_999, _multiple_of_50
+
+
+def test_find_all_matches_substring_semantics():
+    keywords = ["fire", "fire engine", "engine", "gas", "gas leak", "leak", "crowd"]
+    matcher = KeywordMatcher(keywords)
+    text = "a fire engine arrived after the gas leak, small crowds"
+    assert matcher.find_all(text) == {k for k in keywords if k in text}
+
+
+def test_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher(["stampede", "stamp", "amped", "pede"])
+    assert matcher.find_all("stampede") == {"stampede", "stamp", "amped", "pede"}
+    assert matcher.find_all("stamp") == {"stamp"}
+    assert matcher.find_all("nothing here") == set()
+
+
+def test_random_texts_agree_with_naive_scan():
+    rng = random.Random(3)
+    alphabet = "abc "
+    keywords = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)}
+    matcher = KeywordMatcher(keywords)
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert matcher.find_all(text) == {k for k in keywords if k in text}
+
+
+def test_number_patterns_match_the_range_checks_they_replace():
+    rng = random.Random(5)
+    samples = [str(n) for n in range(0, 2000)] + ["x" + str(rng.randint(0, 10 ** 6)) + "y" for _ in range(500)]
+    for text in samples:
+        assert (_number_50_to_999.search(text) is not None) == any(str(i) in text for i in range(50, 1000))
+        assert (_multiple_of_50.search(text) is not None) == any(str(i) in text for i in range(50, 1000, 50))
+
+
+def test_scan_reports_words_and_numbers():
+    hits = KeywordMatcher(["crowd", "panic"]).scan("a crowd of 150 people")
+    assert hits.words == frozenset({"crowd"})
+    assert hits.has_number_50_to_999
+    assert hits.has_multiple_of_50
+    hits = KeywordMatcher(["crowd"]).scan("7 people")
+    assert not hits.has_number_50_to_999
+    assert not hits.has_multiple_of_50
@@ -0,0 +1,61 @@
+import time
+
+from backend.llm_cache import LLMCache, prompt_key
+
+
+def test_prompt_key_ignores_case_and_whitespace():
+    assert prompt_key("Classify  this\n incident") == prompt_key("  classify this incident ")
+    assert prompt_key("classify this incident") != prompt_key("classify that incident")
+
+
+def test_prompt_key_keeps_punctuation():
+    assert prompt_key("severity: 3") != prompt_key("severity 3")
+
+
+def test_get_returns_stored_response():
+    cache = LLMCache(max_size=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", "answer")
+    assert cache.get("a") == "answer"
+    assert cache.metrics()["hits"] == 1
+    assert cache.metrics()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_size=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats["evictions"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = LLMCache(max_size=4, ttl=10)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", "1")
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.metrics()["size"] == 0
+
+
+def test_sqlite_tier_survives_a_new_process(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LLMCache(max_size=4, ttl=60, db_path=path).set("a", "answer")
+    fresh = LLMCache(max_size=4, ttl=60, db_path=path)
+    assert fresh.get("a") == "answer"
+    assert fresh.stats["disk_hits"] == 1
+    # Promoted into memory on the disk hit
+    assert fresh.get("a") == "answer"
+    assert fresh.stats["hits"] == 1
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = LLMCache(max_size=4, ttl=60, db_path=str(tmp_path / "cache.db"))
+    cache.set("a", "answer")
+    cache.clear()
+    assert cache.get("a") is None
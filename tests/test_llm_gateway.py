@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from backend import llm_gateway as gateway_module
+from backend.llm_gateway import AdaptiveLimiter, CircuitBreaker, LLMGateway, LLMUnavailable, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(gateway_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(gateway_module.time, "sleep", sleep)
+    return now
+
+
+def test_token_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert all(bucket.acquire(0) for _ in range(3))
+    assert not bucket.acquire(0)
+    clock[0] += 0.5
+    assert bucket.acquire(0)
+    assert not bucket.acquire(0)
+    # Waiting is allowed when the next token arrives before the timeout
+    start = clock[0]
+    assert bucket.acquire(1)
+    assert clock[0] - start == pytest.approx(0.5)
+    # Refill never exceeds the burst size
+    clock[0] += 60
+    assert sum(bucket.acquire(0) for _ in range(5)) == 3
+
+
+def test_adaptive_limiter_aimd():
+    limiter = AdaptiveLimiter(maximum=8)
+    assert all(limiter.acquire(0) for _ in range(8))
+    assert not limiter.acquire(0)
+    limiter.release(False)
+    assert limiter.limit == 4
+    for _ in range(3):
+        limiter.release(False)
+    assert limiter.limit == 1
+    assert limiter.in_flight == 4
+    for _ in range(4):
+        limiter.release(True)
+    assert limiter.limit == 5
+    assert limiter.in_flight == 0
+    for _ in range(10):
+        limiter.acquire(0)
+        limiter.release(True)
+    assert limiter.limit == 8
+
+
+def test_circuit_breaker_opens_and_probes_once(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.trips == 1
+    assert not breaker.allow() and not breaker.healthy()
+
+    clock[0] += 30
+    assert breaker.healthy()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one probe at a time
+    assert not breaker.allow() and not breaker.healthy()
+    breaker.release_probe()
+    assert breaker.allow()
+
+    # A failed probe re-opens at once
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.trips == 2
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def gateway(**kwargs):
+    return LLMGateway(
+        bucket=kwargs.get("bucket", TokenBucket(rate=1000, burst=1000)),
+        limiter=kwargs.get("limiter", AdaptiveLimiter(maximum=2)),
+        breaker=kwargs.get("breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60)),
+        deadline=kwargs.get("deadline", 5)
+    )
+
+
+def test_gateway_call_success_and_failure():
+    llm = gateway()
+    assert llm.call(lambda a, b: a + b, 1, 2) == 3
+
+    def fail():
+        raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        llm.call(fail)
+    with pytest.raises(RuntimeError):
+        llm.call(fail)
+    # Two failures open the breaker, so the next call never reaches func
+    with pytest.raises(LLMUnavailable):
+        llm.call(lambda: pytest.fail("called while the breaker is open"))
+    metrics = llm.metrics()
+    assert metrics["successes"] == 1
+    assert metrics["failures"] == 2
+    assert metrics["short_circuited"] == 1
+    assert metrics["breaker_state"] == "open"
+
+
+def test_gateway_deadline_counts_as_failure_and_holds_the_slot():
+    release = threading.Event()
+    llm = gateway(limiter=AdaptiveLimiter(maximum=1))
+    with pytest.raises(LLMUnavailable):
+        llm.call(release.wait, deadline=0.05)
+    assert llm.metrics()["timeouts"] == 1
+    # The abandoned call still occupies the only slot until it returns
+    assert llm.limiter.in_flight == 1
+    release.set()
+    for _ in range(100):
+        if llm.limiter.in_flight == 0:
+            break
+        time.sleep(0.01)
+    assert llm.limiter.in_flight == 0
+
+
+def test_gateway_rate_limit_releases_the_probe(monkeypatch):
+    monkeypatch.setattr(gateway_module, "LLM_ACQUIRE_TIMEOUT", 0)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    llm = gateway(bucket=TokenBucket(rate=0.001, burst=0), breaker=breaker)
+    with pytest.raises(LLMUnavailable, match="rate limit"):
+        llm.call(lambda: None)
+    assert llm.metrics()["rate_limited"] == 1
+    # The probe was handed back, so the breaker still lets one call through
+    assert breaker.allow()
+
+
+def test_record_fallback_counts_per_agent(monkeypatch):
+    monkeypatch.setattr(gateway_module, "record_fallback", lambda agent, error: None)
+    llm = gateway()
+    llm.record_fallback("classification")
+    llm.record_fallback("classification", RuntimeError("x"))
+    assert llm.metrics()["fallbacks"] == {"classification": 2}
@@ -0,0 +1,110 @@
+import json
+import random
+
+import pytest
+
+from backend import local_classifier
+from backend.classification import Classification
+from backend.local_classifier import LocalClassifier, evaluate, features, load_examples, train
+
+FIRE = Classification("Fire", "high", 5)
+WATER = Classification("Waterlogging", "low", 2)
+
+
+def synthetic_examples(count=60, seed=3):
+    rng = random.Random(seed)
+    places = ["the market", "park street", "the station", "college road", "the bridge"]
+    examples = []
+    for i in range(count):
+        place = rng.choice(places)
+        if i % 2:
+            examples.append((f"Fire and thick smoke near {place}, flames in the building", "Fire", FIRE))
+        else:
+            examples.append((f"Knee deep water logging at {place} after rain", "Others", WATER))
+    return examples
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train(synthetic_examples(), epochs=150)
+
+
+def test_features_are_stable_and_include_the_category():
+    assert features("Fire near market", "Fire") == features("fire near MARKET", "fire")
+    assert features("Fire near market", "Fire") != features("Fire near market", "Others")
+    assert all(0 <= i < local_classifier.HASH_FEATURES for i in features("anything", ""))
+
+
+def test_confident_predictions_skip_the_llm(model):
+    predicted, confidence = model.predict("Fire and thick smoke near the station, flames in the building", "Fire")
+    assert predicted == FIRE
+    assert confidence >= 0.8
+    assert model.classify({"description": "Water logging on college road after rain", "category": "Others"}, threshold=0.8) == WATER
+
+
+def test_unconfident_predictions_return_none(model):
+    # Nothing like the training data
+    parsed = {"description": "Someone left a parcel at the gate", "category": "Crime"}
+    _, confidence = model.predict(parsed["description"], parsed["category"])
+    assert confidence < 0.8
+    assert model.classify(parsed, threshold=0.8) is None
+    assert model.classify(parsed, threshold=0.0) is not None
+    assert model.metrics()["predictions"] >= 3
+
+
+def test_save_load_round_trip(model, tmp_path):
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = LocalClassifier.load(path)
+    assert loaded.predict("Fire at the market", "Fire") == model.predict("Fire at the market", "Fire")
+
+
+def test_evaluate_reports_accuracy_and_coverage(model):
+    report = evaluate(model, synthetic_examples(20, seed=9), threshold=0.5)
+    assert report["examples"] == 20
+    assert report["exact_match"] == 1.0
+    assert report["coverage"] == 1.0
+
+
+def test_load_examples_relabels_failed_pipeline_records(tmp_path):
+    pytest.importorskip("google.generativeai")
+    from backend.agents import get_default_classification
+
+    records = [
+        {"description": "Fire in the market", "category": "Fire", "classification": "Error in classification"},
+        {"description": "Road flooded", "category": "Others", "type": "Waterlogging", "urgency": "low", "severity": 2},
+        {"description": "Crowd at the gate", "category": "Others", "classification": "Type: Crime\nUrgency: high\nSeverity: 4"},
+        {"category": "Others", "classification": "Type: Fire"}
+    ]
+    path = tmp_path / "reports.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in records))
+    examples = load_examples(str(path))
+    assert [description for description, _, _ in examples] == ["Fire in the market", "Road flooded", "Crowd at the gate"]
+    assert examples[0][2] == get_default_classification({"description": "Fire in the market", "category": "Fire"})
+    assert examples[0][2].type == "Fire"
+    assert examples[1][2] == WATER
+    assert examples[2][2] == Classification("Crime", "high", 4)
+
+
+def test_classification_agent_is_local_first(model, monkeypatch):
+    pytest.importorskip("google.generativeai")
+    from backend import agents
+
+    prompts = []
+
+    def generate_text(prompt, generation_config=None):
+        prompts.append(prompt)
+        return "Type: Crime\nUrgency: medium\nSeverity: 3"
+
+    monkeypatch.setattr(agents, "get_local_classifier", lambda: model)
+    monkeypatch.setattr(agents, "generate_text", generate_text)
+    monkeypatch.setattr(local_classifier, "LOCAL_CLASSIFIER_THRESHOLD", 0.8)
+
+    confident = {"description": "Fire and thick smoke near the market, flames in the building", "category": "Fire", "location": "Kolkata"}
+    assert agents.classification_agent(confident) == FIRE
+    assert prompts == []
+
+    # Nothing like the training data: the model defers to the LLM
+    unsure = {"description": "Someone left a parcel at the gate", "category": "Crime", "location": "Kolkata"}
+    assert agents.classification_agent(unsure) == Classification("Crime", "medium", 3)
+    assert len(prompts) == 1
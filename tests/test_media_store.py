@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from backend.media import StreamedFile
+from backend.media_store import MediaStore, UNKNOWN_MEDIA_TYPE
+
+
+def streamed(store, content):
+    os.makedirs(store.tmp_dir, exist_ok=True)
+    path = os.path.join(store.tmp_dir, hashlib.sha1(content + os.urandom(8)).hexdigest())
+    with open(path, "wb") as f:
+        f.write(content)
+    return StreamedFile("upload.bin", path, len(content), hashlib.sha256(content).hexdigest())
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MediaStore(str(tmp_path / "media"), str(tmp_path / "media.db"))
+
+
+def put(store, content, report_id):
+    return asyncio.run(store.put(streamed(store, content), report_id))
+
+
+def test_identical_uploads_are_stored_once(store):
+    first = put(store, b"same bytes", "r1")
+    second = put(store, b"same bytes", "r2")
+    assert first == second
+    assert first["mime"] == UNKNOWN_MEDIA_TYPE
+    metrics = store.metrics()
+    assert metrics["objects"] == 1
+    assert metrics["references"] == 2
+    assert metrics["deduplicated"] == 1
+
+
+def test_release_deletes_media_once_unreferenced(store):
+    entry = put(store, b"shared", "r1")
+    put(store, b"shared", "r2")
+    path = store.locate(entry["sha256"])[0]
+    store.release("r1")
+    assert os.path.exists(path)
+    store.release("r2")
+    assert not os.path.exists(path)
+    assert store.locate(entry["sha256"]) is None
+    assert store.metrics()["released"] == 1
+
+
+def test_failed_submit_releases_its_media(client, monkeypatch):
+    from backend import router
+    from backend.media_store import media_store
+
+    def fail(report_id, data):
+        raise RuntimeError("storage down")
+
+    monkeypatch.setattr(router.report_repository, "put", fail)
+    content = os.urandom(64)
+    before = media_store.metrics()
+    response = client.post(
+        "/report/",
+        data={"category": "Fire", "location": "Test (22.5726, 88.3639)", "description": "Released media test"},
+        files={"file": ("evidence.bin", content, "application/octet-stream")}
+    )
+    assert response.json() == {"error": "storage down"}
+    after = media_store.metrics()
+    assert after["references"] == before["references"]
+    assert after["objects"] == before["objects"]
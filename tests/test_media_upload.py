@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from backend import media
+from backend.media import MalformedForm, StreamingFormParser, UploadLimitMiddleware, UploadTooLarge, read_streaming_form
+
+BOUNDARY = "testboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart(fields=(), files=()):
+    """A multipart/form-data body from (name, value) fields and (name, filename, bytes) files"""
+    parts = []
+    for name, value in fields:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + value.encode() + b"\r\n")
+    for name, filename, content in files:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def parse(body, tmp_path, chunk=7, **limits):
+    parser = StreamingFormParser(CONTENT_TYPE, str(tmp_path), **limits)
+    try:
+        for start in range(0, len(body), chunk):
+            parser.write(body[start:start + chunk])
+        parser.finish()
+    except Exception:
+        parser.discard()
+        raise
+    return parser
+
+
+def test_fields_and_files_are_streamed_to_disk(tmp_path):
+    parser = parse(multipart([("category", "Fire"), ("description", "smoke")], [("file", "a.jpg", b"x" * 1000)]), tmp_path)
+    assert parser.fields == {"category": "Fire", "description": "smoke"}
+    [(name, upload)] = parser.files
+    assert (name, upload.filename, upload.size) == ("file", "a.jpg", 1000)
+    with open(upload.path, "rb") as f:
+        assert f.read() == b"x" * 1000
+    assert upload.sha256 == hashlib.sha256(b"x" * 1000).hexdigest()
+
+
+def test_filename_is_stripped_of_directories(tmp_path):
+    parser = parse(multipart(files=[("file", "../../etc/passwd", b"data")]), tmp_path)
+    assert parser.files[0][1].filename == "passwd"
+    assert os.path.dirname(parser.files[0][1].path) == str(tmp_path)
+
+
+def test_per_file_cap(tmp_path):
+    body = multipart(files=[("file", "big.bin", b"x" * 101)])
+    with pytest.raises(UploadTooLarge):
+        parse(body, tmp_path, max_file_bytes=100)
+    assert os.listdir(tmp_path) == []
+    assert parse(multipart(files=[("file", "ok.bin", b"x" * 100)]), tmp_path, max_file_bytes=100).files
+
+
+def test_request_cap_across_files(tmp_path):
+    body = multipart(files=[("file", "a.bin", b"x" * 60), ("file", "b.bin", b"y" * 60)])
+    with pytest.raises(UploadTooLarge, match="in total"):
+        parse(body, tmp_path, max_file_bytes=100, max_request_bytes=100)
+    assert os.listdir(tmp_path) == []
+
+
+def test_field_size_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "MAX_FORM_FIELD_BYTES", 10)
+    with pytest.raises(UploadTooLarge, match="description"):
+        parse(multipart([("description", "x" * 11)]), tmp_path)
+    assert parse(multipart([("description", "x" * 10)]), tmp_path).fields == {"description": "x" * 10}
+
+
+@pytest.mark.parametrize("content_type", [None, "application/json", "multipart/form-data", "text/plain; boundary=x"])
+def test_non_multipart_is_rejected(tmp_path, content_type):
+    with pytest.raises(MalformedForm):
+        StreamingFormParser(content_type, str(tmp_path))
+
+
+def test_body_ending_inside_a_file_is_malformed(tmp_path):
+    body = multipart(files=[("file", "a.bin", b"x" * 50)])
+    with pytest.raises(MalformedForm):
+        parse(body[:-30], tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_empty_file_input_is_dropped(tmp_path):
+    parser = parse(multipart([("category", "Fire")], [("file", "", b"")]), tmp_path)
+    assert parser.files == []
+    assert os.listdir(tmp_path) == []
+    # An empty file that does have a name is still an upload
+    assert len(parse(multipart(files=[("file", "empty.txt", b"")]), tmp_path).files) == 1
+
+
+class FakeRequest:
+    def __init__(self, body, chunk=16):
+        self.headers = {"content-type": CONTENT_TYPE}
+        self._chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+
+    async def stream(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def test_read_streaming_form_removes_partial_files_on_error(tmp_path):
+    body = multipart(files=[("file", "a.bin", b"x" * 50), ("file", "b.bin", b"y" * 500)])
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_streaming_form(FakeRequest(body), str(tmp_path), max_file_bytes=100))
+    assert os.listdir(tmp_path) == []
+
+    fields, files = asyncio.run(read_streaming_form(FakeRequest(body), str(tmp_path)))
+    assert [upload.size for _, upload in files] == [50, 500]
+
+
+def run_middleware(body_chunks, headers=(), max_bytes=100):
+    """Send a request through UploadLimitMiddleware; returns (status, body, bytes the app read)"""
+    read = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            read.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1}
+        for i, chunk in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/report/", "headers": list(headers)}
+    asyncio.run(UploadLimitMiddleware(app, max_bytes=max_bytes)(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, body, b"".join(read)
+
+
+def test_middleware_rejects_by_content_length():
+    status, body, read = run_middleware([b"x" * 10], headers=[(b"content-length", b"101")])
+    assert status == 413
+    assert b"exceeds 100 bytes" in body
+    assert read == b""
+
+
+def test_middleware_rejects_chunked_body_over_the_cap():
+    status, body, read = run_middleware([b"x" * 60, b"y" * 60, b"z" * 60])
+    assert status == 413
+    # The app saw the first chunk, then a disconnect; its own response was dropped
+    assert read == b"x" * 60
+    assert b"exceeds 100 bytes" in body
+    assert b"ok" not in body
+
+
+def test_middleware_passes_bodies_within_the_cap():
+    status, body, read = run_middleware([b"x" * 50, b"y" * 50], headers=[(b"content-length", b"100")])
+    assert (status, body, read) == (200, b"ok", b"x" * 50 + b"y" * 50)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from backend.prompt_registry import PROMPTS_PATH, REQUIRED_PROMPTS, PromptRegistry, PromptTemplate, prompt_registry
+
+
+def minimal(**overrides):
+    data = {
+        "version": 1,
+        "prompts": {name: {"variables": ["x"], "template": [name + " {x}"]} for name in REQUIRED_PROMPTS},
+        "suggestions": {
+            "categories": {"fire": ["Leave.", "Call 101."], "fire alarm": ["Never reached."], "others": ["Stay alert."]},
+            "defaults": {"fire": "Stay away.", "water": "Avoid standing water."},
+            "default_fallback": "Follow official guidance."
+        }
+    }
+    data.update(overrides)
+    return data
+
+
+def test_shipped_prompts_load_and_render_every_required_prompt():
+    with open(PROMPTS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    for name in REQUIRED_PROMPTS:
+        spec = data["prompts"][name]
+        values = {variable: f"<{variable}>" for variable in spec["variables"]}
+        assert prompt_registry.render(name, **values) == "Human: " + "\n".join(spec["template"]).format(**values)
+
+
+def test_template_keeps_literal_braces():
+    template = PromptTemplate("t", ['Answer as {{"type": "..."}}', "about {description}"], ["description"])
+    assert template.render(description="a fire") == 'Human: Answer as {"type": "..."}\nabout a fire'
+    with pytest.raises(KeyError):
+        template.render()
+
+
+def test_template_variables_must_match_declaration():
+    with pytest.raises(ValueError, match="declares"):
+        PromptTemplate("t", "about {descripton}", ["description"])
+    with pytest.raises(ValueError):
+        PromptTemplate("t", "no placeholders", ["description"])
+
+
+def test_unsupported_version_is_rejected():
+    with pytest.raises(ValueError, match="version"):
+        PromptRegistry(minimal(version=2))
+
+
+def test_missing_required_prompt_is_rejected():
+    data = minimal()
+    del data["prompts"]["feedback"]
+    with pytest.raises(ValueError, match="feedback"):
+        PromptRegistry(data)
+
+
+def test_category_suggestions_first_match_wins():
+    registry = PromptRegistry(minimal())
+    assert registry.category_suggestions("fire alarm") == "Leave. Call 101."
+    assert registry.category_suggestions("flood") == "Stay alert."
+
+
+def test_default_suggestion():
+    registry = PromptRegistry(minimal())
+    assert registry.default_suggestion("House FIRE") == "Stay away."
+    assert registry.default_suggestion("waterlogging") == "Avoid standing water."
+    assert registry.default_suggestion("crime") == "Follow official guidance."
+    assert registry.default_suggestion() == "Follow official guidance."
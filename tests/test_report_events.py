@@ -0,0 +1,37 @@
+import json
+
+
+def submit(client, description, location="Test street, Kolkata (22.5726, 88.3639)"):
+    response = client.post(
+        "/report/", data={"category": "Fire", "location": location, "description": description},
+        files={"file": ("evidence.txt", description.encode(), "text/plain")}
+    )
+    assert response.status_code == 200
+    return response.json()["report_id"]
+
+
+def events(client, report_id):
+    """(event, data) pairs of a report's SSE stream"""
+    text = client.get(f"/reports/{report_id}/events").text
+    pairs = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "event" in lines:
+            pairs.append((lines["event"], json.loads(lines["data"])))
+    return pairs
+
+
+def test_events_end_with_the_enrichment(client):
+    from backend import router
+
+    report_id = submit(client, "Fire in the market with thick smoke")
+    stream = events(client, report_id)
+    assert stream[-1][0] == "enrichment"
+    assert stream[-1][1]["id"] == report_id
+    assert stream[-1][1]["enrichment"] == "done"
+    assert all(name == "progress" for name, _ in stream[:-1])
+    assert router.enrichment_workers._waiters == {}
+
+
+def test_events_for_unknown_report(client):
+    assert events(client, "missing") == [("error", {"error": "Report not found"})]
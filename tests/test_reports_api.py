@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from backend.storage import updated_now
+
+
+def report(hour, **fields):
+    return {"timestamp": f"2024-01-01T{hour:02d}:00:00+00:00", "description": "test", "category": "Fire", **fields}
+
+
+@pytest.fixture
+def repository(client):
+    from backend import router
+
+    return router.report_repository
+
+
+def get(client, **params):
+    response = client.get("/reports/", params=params)
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()], response.headers.get("X-Next-Cursor")
+
+
+def ids(lines):
+    return [line["id"] for line in lines]
+
+
+def test_pages_follow_the_next_cursor_to_the_end(client, repository):
+    repository.put_many([(f"r{i}", report(i)) for i in range(5)])
+    pages, params = [], {"limit": 2}
+    while True:
+        lines, cursor = get(client, **params)
+        pages.append(ids(lines))
+        if not cursor:
+            break
+        assert cursor == lines[-1]["id"]
+        params["start_after"] = cursor
+    assert pages == [["r4", "r3"], ["r2", "r1"], ["r0"]]
+
+
+def test_full_last_page_has_no_cursor(client, repository):
+    repository.put_many([(f"r{i}", report(i)) for i in range(4)])
+    lines, cursor = get(client, limit=2, start_after="r2")
+    assert (ids(lines), cursor) == (["r1", "r0"], None)
+    lines, cursor = get(client, limit=4)
+    assert (len(lines), cursor) == (4, None)
+
+
+def test_unknown_cursor_and_bad_limits(client, repository):
+    assert client.get("/reports/", params={"start_after": "missing"}).status_code == 400
+    assert client.get("/reports/", params={"limit": 0}).status_code == 422
+    assert client.get("/reports/", params={"severity": 6}).status_code == 422
+
+
+def test_fields_projection(client, repository):
+    repository.put("a", report(1, status="Pending", location="Kolkata"))
+    lines, _ = get(client, fields="category, status")
+    assert lines == [{"category": "Fire", "status": "Pending", "id": "a"}]
+
+
+def test_filters(client, repository):
+    repository.put_many([
+        ("a", report(1, category="Fire", urgency="high", severity=4)),
+        ("b", report(2, category="Crime", urgency="high", severity=2)),
+        ("c", report(3, category="Fire", urgency="low", severity=2))
+    ])
+    assert ids(get(client, category="Fire")[0]) == ["c", "a"]
+    assert ids(get(client, urgency="HIGH")[0]) == ["b", "a"]
+    assert ids(get(client, severity=2)[0]) == ["c", "b"]
+    assert ids(get(client, category="Fire", severity=2)[0]) == ["c"]
+    assert ids(get(client, since="2024-01-01T02:00:00+00:00", until="2024-01-01T02:30:00+00:00")[0]) == ["b"]
+
+
+def test_updated_since(client, repository):
+    repository.put_many([("a", report(1)), ("b", report(2))])
+    cutoff = updated_now()
+    repository.update("a", {"status": "Resolved"})
+    lines, _ = get(client, updated_since=cutoff)
+    assert ids(lines) == ["a"]
+    assert lines[0]["status"] == "Resolved"
+    response = client.get("/reports/", params={"updated_since": cutoff, "since": "2024-01-01T00:00:00+00:00"})
+    assert response.status_code == 400
@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+def run_callers(flight, key, func):
+    """Call flight.do(key, func) from CALLERS threads; returns each thread's result or exception"""
+    outcomes = [None] * CALLERS
+
+    def call(i):
+        try:
+            outcomes[i] = flight.do(key, func)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return outcomes
+
+
+def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    executions = []
+
+    def func():
+        executions.append(1)
+        # Hold the call open until every other caller has joined it
+        wait_until(lambda: flight.stats["coalesced"] == CALLERS - 1)
+        return "answer"
+
+    assert run_callers(flight, "prompt", func) == ["answer"] * CALLERS
+    assert len(executions) == 1
+    assert flight.metrics() == {"executed": 1, "coalesced": CALLERS - 1, "in_flight": 0}
+
+
+def test_leader_error_reaches_every_follower():
+    flight = SingleFlight()
+    error = RuntimeError("quota exceeded")
+
+    def func():
+        wait_until(lambda: flight.stats["coalesced"] == CALLERS - 1)
+        raise error
+
+    assert run_callers(flight, "prompt", func) == [error] * CALLERS
+    assert flight.metrics()["in_flight"] == 0
+    # The key was released, so the next call runs again
+    assert flight.do("prompt", lambda: "retried") == "retried"
+    assert flight.stats["executed"] == 2
+
+
+def test_different_keys_do_not_share_calls():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats == {"executed": 2, "coalesced": 0}
+
+
+def test_generate_text_makes_one_gateway_call(monkeypatch):
+    pytest.importorskip("google.generativeai")
+    from backend import agents
+    from backend.llm_gateway import llm_gateway
+    from backend.singleflight import llm_singleflight
+
+    class SlowLLM:
+        calls = 0
+
+        def generate_content(self, prompt, generation_config=None):
+            SlowLLM.calls += 1
+            wait_until(lambda: llm_singleflight.stats["coalesced"] >= coalesced + CALLERS - 1)
+            return type("Response", (), {"text": " ok "})()
+
+    monkeypatch.setattr(agents, "llm", SlowLLM())
+    prompt = f"Human: singleflight test {uuid.uuid4()}"
+    coalesced = llm_singleflight.stats["coalesced"]
+    calls_before = llm_gateway.counters["calls"]
+
+    results = []
+
+    def call():
+        results.append(agents.generate_text(prompt))
+
+    threads = [threading.Thread(target=call) for _ in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert results == ["ok"] * CALLERS
+    assert SlowLLM.calls == 1
+    assert llm_gateway.counters["calls"] - calls_before == 1
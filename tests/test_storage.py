@@ -0,0 +1,168 @@
+import os
+import json
+import sqlite3
+import uuid
+
+import pytest
+
+from backend import storage
+from backend.storage import ReportRepository, SQLiteReportRepository, UnknownCursor, copy_reports, updated_now
+
+
+def firestore_repository():
+    """FirestoreReportRepository on the emulator; skipped unless FIRESTORE_EMULATOR_HOST is set"""
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        pytest.skip("FIRESTORE_EMULATOR_HOST is not set")
+    pytest.importorskip("firebase_admin")
+    from google.cloud import firestore
+
+    client = firestore.Client(project=f"test-{uuid.uuid4().hex[:8]}")
+    return storage.FirestoreReportRepository(db=client)
+
+
+@pytest.fixture(params=["sqlite", "firestore"])
+def repository(request, tmp_path):
+    if request.param == "firestore":
+        return firestore_repository()
+    return SQLiteReportRepository(str(tmp_path / "reports.db"))
+
+
+def report(timestamp, **fields):
+    return {"timestamp": timestamp, "description": "test", **fields}
+
+
+def ids(reports):
+    return [report_id for report_id, _ in reports]
+
+
+def test_put_get_update_increment(repository):
+    repository.put("a", report("2024-01-01T10:00:00+00:00", status="Pending", report_count=1))
+    data = repository.get("a")
+    assert data["status"] == "Pending"
+    first_write = data["updated_at"]
+
+    repository.update("a", {"status": "Resolved"})
+    repository.increment("a", "report_count")
+    repository.increment("a", "report_count", 2)
+    data = repository.get("a")
+    assert data["status"] == "Resolved"
+    assert data["report_count"] == 4
+    assert data["description"] == "test"
+    assert data["updated_at"] > first_write
+    assert repository.get("missing") is None
+
+
+def test_query_filters_and_order(repository):
+    repository.put_many([
+        ("a", report("2024-01-01T10:00:00+00:00", category="Fire", status="Pending", urgency="high", severity=4)),
+        ("b", report("2024-01-01T11:00:00+00:00", category="Fire", status="Resolved", urgency="low", severity=2)),
+        ("c", report("2024-01-01T12:00:00+00:00", category="Crime", status="Pending", urgency="high", severity=4))
+    ])
+    assert ids(repository.query()) == ["c", "b", "a"]
+    assert ids(repository.query(category="Fire")) == ["b", "a"]
+    assert ids(repository.query(status="Pending", urgency="high")) == ["c", "a"]
+    assert ids(repository.query(severity=2)) == ["b"]
+    assert ids(repository.query(since="2024-01-01T11:00:00+00:00")) == ["c", "b"]
+    assert ids(repository.query(until="2024-01-01T11:00:00+00:00")) == ["b", "a"]
+    assert repository.query(fields=["category"], limit=1) == [("c", {"category": "Crime"})]
+
+
+def test_query_pages_with_start_after(repository):
+    repository.put_many([(f"r{i}", report(f"2024-01-01T1{i}:00:00+00:00")) for i in range(5)])
+    pages, cursor = [], None
+    while True:
+        page = repository.query(start_after=cursor, limit=2)
+        if not page:
+            break
+        pages.append(ids(page))
+        cursor = page[-1][0]
+    assert pages == [["r4", "r3"], ["r2", "r1"], ["r0"]]
+    with pytest.raises(UnknownCursor):
+        repository.query(start_after="missing")
+
+
+def test_query_updated_since(repository):
+    repository.put_many([("a", report("2024-01-01T10:00:00+00:00")), ("b", report("2024-01-01T11:00:00+00:00"))])
+    cutoff = updated_now()
+    assert repository.query(updated_since=cutoff) == []
+    repository.update("a", {"status": "Resolved"})
+    repository.put("c", report("2024-01-01T09:00:00+00:00"))
+    # Most recently written first, whatever the report timestamps
+    assert ids(repository.query(updated_since=cutoff)) == ["c", "a"]
+    with pytest.raises(ValueError):
+        repository.query(since="2024-01-01T00:00:00+00:00", updated_since=cutoff)
+
+
+def test_geohash_prefix_with_since(repository):
+    repository.put_many([
+        ("near", report("2024-01-01T10:00:00+00:00", geohash="tunb6v0wu")),
+        ("old", report("2023-12-01T10:00:00+00:00", geohash="tunb6v1aa")),
+        ("other_cell", report("2024-01-01T10:00:00+00:00", geohash="tunb7aaaa")),
+        ("no_location", report("2024-01-01T10:00:00+00:00"))
+    ])
+    assert sorted(ids(repository.geohash_prefix("tunb6"))) == ["near", "old"]
+    assert ids(repository.geohash_prefix("tunb6", since="2024-01-01T00:00:00+00:00")) == ["near"]
+    assert sorted(ids(repository.geohash_prefix("tunb"))) == ["near", "old", "other_cell"]
+
+
+def test_cluster_members(repository):
+    repository.put_many([
+        ("primary", report("2024-01-01T10:00:00+00:00", cluster_id="primary", enrichment="pending")),
+        ("m1", report("2024-01-01T10:01:00+00:00", cluster_id="primary", enrichment="clustered")),
+        ("m2", report("2024-01-01T10:02:00+00:00", cluster_id="primary", enrichment="clustered")),
+        ("other", report("2024-01-01T10:03:00+00:00", cluster_id="elsewhere", enrichment="clustered"))
+    ])
+    assert sorted(repository.cluster_members("primary")) == ["m1", "m2"]
+    repository.update("m1", {"enrichment": "done"})
+    assert repository.cluster_members("primary") == ["m2"]
+    assert repository.cluster_members("primary", enrichment="pending") == ["primary"]
+
+
+def test_sqlite_update_of_missing_report_raises(tmp_path):
+    repository = SQLiteReportRepository(str(tmp_path / "reports.db"))
+    with pytest.raises(KeyError):
+        repository.update("missing", {"status": "Resolved"})
+    with pytest.raises(KeyError):
+        repository.increment("missing", "report_count")
+
+
+def test_sqlite_migrates_an_old_file(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """CREATE TABLE reports (
+            id TEXT PRIMARY KEY, timestamp TEXT NOT NULL DEFAULT '', category TEXT, status TEXT,
+            urgency TEXT, severity INTEGER, geohash TEXT, data TEXT NOT NULL
+        )"""
+    )
+    conn.execute("CREATE INDEX reports_geohash ON reports (geohash)")
+    data = report("2024-01-01T10:00:00+00:00", cluster_id="a", enrichment="clustered")
+    conn.execute("INSERT INTO reports (id, timestamp, data) VALUES ('a', ?, ?)", (data["timestamp"], json.dumps(data)))
+    conn.commit()
+    conn.close()
+
+    repository = SQLiteReportRepository(path)
+    assert repository.cluster_members("a") == ["a"]
+    indexes = {row[1] for row in repository._conn.execute("PRAGMA index_list(reports)")}
+    assert "reports_geohash" not in indexes
+    assert {"reports_geohash_time", "reports_cluster", "reports_updated"} <= indexes
+
+
+def test_copy_reports(tmp_path):
+    source = SQLiteReportRepository(str(tmp_path / "source.db"))
+    target = SQLiteReportRepository(str(tmp_path / "target.db"))
+    source.put_many([(f"r{i}", report(f"2024-01-01T1{i}:00:00+00:00")) for i in range(5)])
+    assert copy_reports(source, target, page_size=2) == 5
+    assert ids(target.query()) == ids(source.query())
+
+
+def test_repository_is_abstract():
+    with pytest.raises(TypeError):
+        ReportRepository()
+
+    class Incomplete(ReportRepository):
+        def put(self, report_id, data):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
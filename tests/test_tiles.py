@@ -0,0 +1,74 @@
+import pytest
+
+from backend.tiles import TileCache, bucket_cutoff, build_tile, tile_bounds, tile_for, time_bucket
+
+KOLKATA = (22.5726, 88.3639)
+
+
+def test_tile_bounds_of_the_whole_world():
+    min_lat, min_lng, max_lat, max_lng = tile_bounds(0, 0, 0)
+    assert (min_lng, max_lng) == (-180.0, 180.0)
+    assert min_lat == pytest.approx(-85.0511, abs=1e-4)
+    assert max_lat == pytest.approx(85.0511, abs=1e-4)
+
+
+@pytest.mark.parametrize("z", [3, 8, 12, 16, 20])
+def test_tile_for_and_tile_bounds_round_trip(z):
+    x, y = tile_for(*KOLKATA, z)
+    min_lat, min_lng, max_lat, max_lng = tile_bounds(z, x, y)
+    assert min_lat <= KOLKATA[0] < max_lat
+    assert min_lng <= KOLKATA[1] < max_lng
+
+
+def test_tile_for_clamps_to_the_map():
+    assert tile_for(89.9, 179.999, 4) == (15, 0)
+    assert tile_for(-89.9, -180.0, 4) == (0, 15)
+
+
+def test_bucket_cutoff_is_ist_wall_clock():
+    bucket = time_bucket(1704067200)  # 2024-01-01T00:00:00Z
+    assert bucket_cutoff(bucket, 2) == "2024-01-01T03:30:00+00:00"
+
+
+def report(lat, lng, timestamp="2024-01-01T10:00:00+00:00", **fields):
+    return {"lat": lat, "lng": lng, "timestamp": timestamp, "category": "Fire", **fields}
+
+
+def test_build_tile_filters_reports():
+    z = 12
+    bounds = tile_bounds(z, *tile_for(*KOLKATA, z))
+    reports = [
+        ("inside", report(*KOLKATA)),
+        ("primary", report(*KOLKATA, cluster_id="primary")),
+        ("member", report(*KOLKATA, cluster_id="primary")),
+        ("old", report(*KOLKATA, timestamp="2023-12-31T10:00:00+00:00")),
+        ("outside", report(KOLKATA[0] + 1, KOLKATA[1])),
+        ("no_location", {"timestamp": "2024-01-01T10:00:00+00:00"})
+    ]
+    tile = build_tile(reports, bounds, "2024-01-01T00:00:00+00:00")
+    assert tile["type"] == "FeatureCollection"
+    assert [f["id"] for f in tile["features"]] == ["inside", "primary"]
+    feature = tile["features"][0]
+    assert feature["geometry"]["coordinates"] == [KOLKATA[1], KOLKATA[0]]
+    assert feature["properties"]["category"] == "Fire"
+    assert feature["properties"]["report_count"] == 1
+
+
+def test_tile_cache_lru_and_point_invalidation():
+    cache = TileCache(max_size=3)
+    here = (12, *tile_for(*KOLKATA, 12))
+    parent = (11, *tile_for(*KOLKATA, 11))
+    elsewhere = (12, *tile_for(KOLKATA[0] + 1, KOLKATA[1], 12))
+    cache.set(here + (24, 1), "a")
+    cache.set(parent + (24, 1), "b")
+    cache.set(elsewhere + (24, 1), "c")
+    assert cache.get(here + (24, 1)) == "a"
+    cache.set(here + (6, 1), "d")
+    # parent was least recently used
+    assert cache.get(parent + (24, 1)) is None
+
+    cache.invalidate_point(*KOLKATA)
+    assert cache.get(here + (24, 1)) is None
+    assert cache.get(here + (6, 1)) is None
+    assert cache.get(elsewhere + (24, 1)) == "c"
+    assert cache.metrics() == {"hits": 2, "misses": 3, "invalidations": 2, "size": 1}